@@ -0,0 +1,85 @@
+"""
+Benchmark: sequential vs concurrent Place Details fetching.
+
+Starts a local fake Places server that answers /place/details/json after a
+fixed delay, points RestaurantSelection at it and times
+get_all_restaurant_details() for several worker limits.
+
+    python benchmarks/bench_details_fetch.py --places 25 --latency 0.08
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from express_gastronomic_route.Services.restaurant_selection import RestaurantSelection
+
+
+def make_handler(latency):
+    class FakePlacesHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            place_id = query.get("place_id", [""])[0]
+            time.sleep(latency)
+            body = json.dumps({
+                "status": "OK",
+                "result": {
+                    "name": f"Restaurant {place_id}",
+                    "formatted_address": f"Calle {place_id}, Málaga",
+                    "rating": 4.5,
+                    "user_ratings_total": 120,
+                },
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakePlacesHandler
+
+
+class FakePlacesServer(ThreadingHTTPServer):
+    # The default listen backlog (5) drops bursts of concurrent connections
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--places", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.08, help="server delay per request (s)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    server = FakePlacesServer(("127.0.0.1", 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    selector = RestaurantSelection(api_key="BENCH")
+    selector.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    found = [{"place_id": f"P{i}"} for i in range(args.places)]
+
+    print(f"{args.places} places, {args.latency * 1000:.0f} ms simulated latency")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        details = selector.get_all_restaurant_details(found, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        assert [d["name"] for d in details] == [f"Restaurant P{i}" for i in range(args.places)]
+        baseline = baseline or elapsed
+        print(f"workers={workers:>3}  {elapsed:7.3f} s  speedup x{baseline / elapsed:5.2f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark: PDF generation throughput (documents per second) laying out
+the cover page for every document vs starting from a cached copy of the
+static part of the cover (title, styling, pooled cover photo).
+
+The template path is a prototype kept here, not in GastronomyPDF: copying
+an fpdf 1.7 document means copying its internal attribute layout, and the
+gain measured on real route PDFs (about 1.0-1.1x with three restaurant
+pages, where fpdf's page compression at output dominates) does not pay
+for that. Both modes are checked to produce the same document.
+
+    python benchmarks/bench_pdf_template.py --docs 200 --restaurants 3
+"""
+import argparse
+import copy
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from PIL import Image
+
+from express_gastronomic_route.Services.pdf_generators import GastronomyPDF
+
+CREATION_DATE = re.compile(rb"/CreationDate \(D:\d+\)")
+
+
+def clone_fpdf(pdf):
+    """Two-level copy of an FPDF document: its dicts and lists, not font or image data."""
+    clone = copy.copy(pdf)
+    for name, value in vars(pdf).items():
+        if isinstance(value, dict):
+            value = {k: copy.copy(v) if isinstance(v, (dict, list)) else v for k, v in value.items()}
+        elif isinstance(value, list):
+            value = list(value)
+        setattr(clone, name, value)
+    if pdf.current_font in pdf.fonts.values():
+        key = next(k for k, font in pdf.fonts.items() if font is pdf.current_font)
+        clone.current_font = clone.fonts[key]
+    return clone
+
+
+class TemplatedPDF(GastronomyPDF):
+    """GastronomyPDF whose cover starts from a cached copy of its static part."""
+
+    templates = {}
+
+    def cover_static(self):
+        # Same layout as the first half of GastronomyPDF.portada
+        self.pdf.add_page()
+        self.pdf.ln(15)
+        self.pdf.set_font("Arial", 'B', 26)
+        self.pdf.set_text_color(0, 90, 158)
+        self.pdf.cell(0, 20, self.safe_latin1(self.title), ln=True, align='C')
+        self.pdf.set_text_color(0, 0, 0)
+        self.pdf.set_font("Arial", '', 14)
+        self.pdf.ln(10)
+        self.pdf.ln(20)
+        self.add_cover_image()
+        self.pdf.ln(20)
+
+    def portada(self, maps_url=None):
+        template = self.templates.get(self.title)
+        if template is None:
+            self.cover_static()
+            self.templates[self.title] = clone_fpdf(self.pdf)
+        else:
+            self.pdf = clone_fpdf(template)
+        if maps_url:
+            self.pdf.set_font("Arial", 'B', 14)
+            self.pdf.set_text_color(0, 0, 0)
+            self.pdf.cell(0, 10, "Optimized Walking Route", ln=True, align='C')
+            self.pdf.set_font("Arial", 'U', 12)
+            self.pdf.set_text_color(0, 0, 255)
+            self.pdf.cell(0, 10, "Link to the route", ln=True, align='C', link=maps_url)
+        self.pdf.set_text_color(0, 0, 0)
+        self.pdf.ln(15)
+        self.pdf.set_font("Arial", '', 14)
+        self.pdf.cell(0, 10, f"Generation Date: {time.strftime('%d/%m/%Y')}", ln=True, align='C')
+
+
+def make_restaurants(n):
+    return [
+        {
+            "name": f"Restaurant {i}",
+            "address": f"Calle Larios {i}, Málaga",
+            "phone_number": "+34 952 000 000",
+            "price_level": 2,
+            "website": "https://example.com",
+            "llm_description": "Traditional Andalusian cooking with fresh fish from the bay. " * 4,
+            "reviews": [{"author_name": "Ana", "rating": 5, "text": "Great espetos and friendly staff."}] * 2,
+            "opening_hours": ["Monday: 13:00–16:00, 20:00–23:30"] * 7,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def render(restaurants, use_template, city):
+    cls = TemplatedPDF if use_template else GastronomyPDF
+    pdf = cls(title=f"Gastronomic Route: {city}")
+    return pdf.render(restaurants, city=city, maps_url="https://www.google.com/maps/dir/")
+
+
+def bench(restaurants, docs, use_template, cities):
+    start = time.perf_counter()
+    for i in range(docs):
+        render(restaurants, use_template, cities[i % len(cities)])
+    return docs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--restaurants", type=int, default=3)
+    parser.add_argument("--cities", type=int, default=3)
+    parser.add_argument("--photo-size", type=int, nargs=2, default=[3000, 2000])
+    args = parser.parse_args()
+
+    if not os.getenv("PHOTO_DIR"):
+        photo_dir = tempfile.mkdtemp(prefix="bench_pdf_")
+        Image.effect_noise(tuple(args.photo_size), 40).convert("RGB").save(
+            os.path.join(photo_dir, "malagaPortada.jpg"), quality=92)
+        os.environ["PHOTO_DIR"] = photo_dir
+
+    restaurants = make_restaurants(args.restaurants)
+    cities = [f"City {i}" for i in range(args.cities)]
+    for _ in range(2):  # the second templated render copies the cached cover
+        plain = CREATION_DATE.sub(b"", render(restaurants, False, cities[0]))
+        templated = CREATION_DATE.sub(b"", render(restaurants, True, cities[0]))
+        assert plain == templated
+
+    per_doc = bench(restaurants, args.docs, False, cities)
+    template = bench(restaurants, args.docs, True, cities)
+    print(f"{'mode':>10} {'docs/s':>10}")
+    print(f"{'per-doc':>10} {per_doc:>10.1f}")
+    print(f"{'template':>10} {template:>10.1f}  x{template / per_doc:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: loop-and-sort ranking vs the NumPy top-N path of
+TopRestaurantsExtractor, from 10^3 to 10^6 candidates.
+
+Every timed call builds its own extractor, so the vectorized columns
+include converting the candidates and building the feature table:
+"dicts" starts from Places dicts, "records" from Restaurant records.
+"rerank" is a further rank() on an extractor whose features are built.
+
+    python benchmarks/bench_ranking.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from express_gastronomic_route.Services.RestaurantInfoTop import TopRestaurantsExtractor
+from express_gastronomic_route.Services.models import Restaurant
+
+
+def legacy_rank(restaurants, n):
+    """The ranking steps of get_top_3 before vectorization."""
+    all_scores = []
+    for r in restaurants:
+        score = TopRestaurantsExtractor.compute_score(r.get("rating"), r.get("user_ratings_total"))
+        all_scores.append((score, r))
+    all_scores = [r for r in all_scores if r[0] >= 0]
+    if not all_scores:
+        return []
+    min_score = min(s for s, _ in all_scores)
+    max_score = max(s for s, _ in all_scores)
+    if max_score == min_score:
+        norm = lambda s: 10.0
+    else:
+        norm = lambda s: 10 * (s - min_score) / (max_score - min_score)
+    ranked = [(norm(score), r) for score, r in all_scores]
+    ranked.sort(reverse=True, key=lambda x: x[0])
+    return [(r, score) for score, r in ranked[:n]]
+
+
+def make_candidates(size, seed=0):
+    rng = random.Random(seed)
+    candidates = []
+    for i in range(size):
+        missing = rng.random() < 0.03
+        candidates.append({
+            "name": f"R{i}",
+            "rating": None if missing else round(rng.uniform(1, 5), 1),
+            "user_ratings_total": int(rng.paretovariate(1.2) * 10),
+        })
+    return candidates
+
+
+def best_of(func, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--n", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'candidates':>10}  {'legacy':>9}  {'dicts':>15}  {'records':>15}  {'rerank':>15}")
+    for size in args.sizes:
+        candidates = make_candidates(size)
+        records = [Restaurant.from_dict(c) for c in candidates]
+        legacy_t, legacy = best_of(lambda: legacy_rank(candidates, args.n), args.repeat)
+        dicts_t, fast = best_of(lambda: TopRestaurantsExtractor(candidates).rank(args.n), args.repeat)
+        records_t, _ = best_of(lambda: TopRestaurantsExtractor(records).rank(args.n), args.repeat)
+        extractor = TopRestaurantsExtractor(records)
+        extractor.rank(args.n)
+        rerank_t, _ = best_of(lambda: extractor.rank(args.n), args.repeat)
+        assert [(r["name"], s) for r, s in legacy] == [(r["name"], s) for r, s in fast]
+        cells = [f"{t:8.4f}s x{legacy_t / t:5.2f}" for t in (dicts_t, records_t, rerank_t)]
+        print(f"{size:>10}  {legacy_t:8.4f}s  " + "  ".join(cells))
+
+if __name__ == "__main__":
+    main()
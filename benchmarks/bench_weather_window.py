@@ -0,0 +1,93 @@
+"""
+Benchmark: filter_temp_range + get_best_day_to_go_out as they were (two
+passes, strptime on every entry) vs WeatherAPI.plan_window over forecasts
+that carry parsed dates, for batches of multi-city forecasts.
+
+    python benchmarks/bench_weather_window.py --cities 100 1000 10000 --days 16
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from express_gastronomic_route.Services.weather_service import WeatherAPI
+
+
+def legacy_filter(forecast, start_date, end_date):
+    fmt = "%d/%m/%Y"
+    start = datetime.strptime(start_date, fmt)
+    end = datetime.strptime(end_date, fmt)
+    return [day for day in forecast if start <= datetime.strptime(day['date'], fmt) <= end]
+
+
+def legacy_best(forecast, start_date, end_date):
+    start_timestamp = int(datetime.strptime(start_date, '%d/%m/%Y').timestamp())
+    end_timestamp = int(datetime.strptime(end_date, '%d/%m/%Y').timestamp())
+    filtered = [
+        day for day in forecast
+        if start_timestamp <= int(datetime.strptime(day['date'], '%d/%m/%Y').timestamp()) <= end_timestamp
+    ]
+    if not filtered:
+        return None
+    best = min(filtered, key=lambda d: (d['rain_probability'], abs(d['temperature_avg'] - 25), d['wind_speed']))
+    return best['date']
+
+
+def make_forecasts(cities, days, rng):
+    first = date(2025, 6, 1)
+    forecasts = []
+    for _ in range(cities):
+        forecast = []
+        for offset in range(days):
+            day = first + timedelta(days=offset)
+            forecast.append({
+                "date": day.strftime("%d/%m/%Y"),
+                "day": day,
+                "temperature_avg": rng.uniform(5, 38),
+                "wind_speed": rng.uniform(0, 12),
+                "rain_probability": rng.choice([0, 0, 0, 0.2, 0.5, 1.3]),
+            })
+        forecasts.append(forecast)
+    return forecasts
+
+
+def bench(func, forecasts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for forecast in forecasts:
+            func(forecast)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--days", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    api = WeatherAPI("BENCH")
+    start_date, end_date = "03/06/2025", "12/06/2025"
+    rng = random.Random(42)
+    print(f"{'cities':>8} {'legacy':>10} {'plan_window':>12}  speedup")
+    for cities in args.cities:
+        forecasts = make_forecasts(cities, args.days, rng)
+        for forecast in forecasts[:50]:
+            plan = api.plan_window(forecast, start_date, end_date)
+            assert plan["temperature_range"] == legacy_filter(forecast, start_date, end_date)
+            assert plan["best_day"]["best_date"] == legacy_best(forecast, start_date, end_date)
+
+        legacy = bench(lambda f: (legacy_filter(f, start_date, end_date), legacy_best(f, start_date, end_date)),
+                       forecasts, args.repeat)
+        single = bench(lambda f: api.plan_window(f, start_date, end_date), forecasts, args.repeat)
+        print(f"{cities:>8} {legacy:>9.4f}s {single:>11.4f}s  x{legacy / single:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,271 @@
 import os
+import re
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dotenv import load_dotenv
-import requests
+
+from .http_client import get_http_client
+from .prompt import SYSTEM_PROFILE
 
 load_dotenv()
 
+DEFAULT_MODEL = "microsoft/phi-4-mini-instruct"
+
+# Pulls the "Description:" section out of the model answer
+DESCRIPTION_RE = re.compile(
+    r"Description:\s*[\(\[]*(.*?)[\)\]]*\s*(?:\n+Reviews:|\n+Weekly opening hours:|\Z)",
+    re.IGNORECASE | re.DOTALL
+)
+# Section markers of a batched answer ("### Restaurant 2")
+BATCH_SECTION_RE = re.compile(r"^\s*#{1,4}\s*Restaurant\s+(\d+)\s*:?\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+# Restaurant keys used by the app (route, caches) that the model does not need
+PROMPT_EXCLUDED_FIELDS = frozenset({"location"})
+
+
+def prompt_payload(restaurant):
+    """The restaurant as shown to the model, as indented JSON."""
+    fields = {key: value for key, value in restaurant.items() if key not in PROMPT_EXCLUDED_FIELDS}
+    return json.dumps(fields, ensure_ascii=False, indent=2)
+
+
+# Request keys that do not change the completion content
+UNCACHED_KEYS = frozenset({"stream", "user"})
+
+
+def completion_cache_key(data):
+    """Stable hash of model, messages and sampling params of a request."""
+    relevant = {key: value for key, value in data.items() if key not in UNCACHED_KEYS}
+    canonical = json.dumps(relevant, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return "chat:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def extract_description(text):
+    """Description section of a model answer, or the whole answer if absent."""
+    match = DESCRIPTION_RE.search(text)
+    return match.group(1).strip() if match else text.strip()
+
+
+class DescriptionStream:
+    """
+    Incremental counterpart of extract_description for streamed answers.
+    feed() returns the description visible so far (empty until the
+    "Description:" header arrives); result() gives the final extraction.
+    """
+    START_RE = re.compile(r"Description:", re.IGNORECASE)
+    END_RE = re.compile(r"\n+(?:Reviews:|Weekly opening hours:)", re.IGNORECASE)
+
+    def __init__(self):
+        self.text = ""
+        self._start = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        return self.current()
+
+    def current(self):
+        if self._start is None:
+            match = self.START_RE.search(self.text)
+            if match is None:
+                return ""
+            self._start = match.end()
+        body = self.text[self._start:]
+        end = self.END_RE.search(body)
+        if end:
+            body = body[:end.start()]
+        return body.strip().lstrip("([").rstrip(")]").strip()
+
+    def result(self):
+        return extract_description(self.text)
+
 
 class LLMAPI:
     BASE_URL = os.getenv('BASE_URL_LLM')
-    
-    def __init__(self):
-        pass
-    
+
+    def __init__(self, http=None, model=DEFAULT_MODEL, temperature=0.2, max_parallel=3, cache=None):
+        # Pooled HTTP client with timeouts and retries
+        self.http = http or get_http_client("llm")
+        # Optional MemoryCache/TieredCache of chat completions
+        self.cache = cache
+        self.model = model
+        self.temperature = temperature
+        # Upper bound on concurrent description requests
+        self.max_parallel = max_parallel
+
     def get_models(self):
-        response = requests.get(f"{self.BASE_URL}/models")
-        return response.json()
-    
-    def post_chat_completion(self, data):
-        response = requests.post(f"{self.BASE_URL}/chat/completions", json=data)
+        response = self.http.get(f"{self.BASE_URL}/models")
         return response.json()
-    
+
+    def post_chat_completion(self, data, use_cache=True):
+        """
+        POST /chat/completions. Identical requests are answered from the
+        cache (if configured) unless use_cache=False.
+        """
+        key = completion_cache_key(data) if self.cache is not None and use_cache else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        response = self.http.post(f"{self.BASE_URL}/chat/completions", json=data)
+        result = response.json()
+        # Only successful completions are worth replaying
+        if key is not None and isinstance(result, dict) and result.get("choices"):
+            self.cache.set(key, result)
+        return result
+
+    def stream_chat_completion(self, data, use_cache=True):
+        """
+        POST /chat/completions with stream=True and yield content deltas as
+        the server-sent events arrive. Cached answers are yielded in one
+        piece; completed streams are stored in the cache like regular calls.
+        A reply without deltas (an error status, or a server that ignored
+        stream=True) is read like post_chat_completion's and yielded whole.
+        """
+        key = completion_cache_key(data) if self.cache is not None and use_cache else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield self.completion_text(cached)
+                return
+        chunks = []
+        body = []
+        response = self.http.post(f"{self.BASE_URL}/chat/completions", json={**data, "stream": True}, stream=True)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or line.startswith(":"):
+                    continue
+                if not line.startswith("data:"):
+                    body.append(line)
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                try:
+                    choice = json.loads(payload)["choices"][0]
+                except (ValueError, KeyError, IndexError, TypeError):
+                    body.append(payload)
+                    continue
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+        finally:
+            response.close()
+        if not chunks:
+            try:
+                result = json.loads("\n".join(body))
+            except ValueError:
+                result = "\n".join(body)
+            if key is not None and isinstance(result, dict) and result.get("choices"):
+                self.cache.set(key, result)
+            text = self.completion_text(result)
+            if text:
+                yield text
+            return
+        if key is not None:
+            self.cache.set(key, {"choices": [{"message": {"role": "assistant", "content": "".join(chunks)}}]})
+
+    def cache_stats(self):
+        return self.cache.stats.as_dict() if self.cache is not None else {}
+
     def post_completion(self, data):
-        response = requests.post(f"{self.BASE_URL}/completions", json=data)
-        return response.json()
\ No newline at end of file
+        response = self.http.post(f"{self.BASE_URL}/completions", json=data)
+        return response.json()
+
+    @staticmethod
+    def completion_text(response):
+        try:
+            return response["choices"][0]["message"]["content"]
+        except Exception:
+            return str(response)
+
+    def _chat_request(self, user_content):
+        return {
+            "model": self.model,
+            "messages": [SYSTEM_PROFILE, {"role": "user", "content": user_content}],
+            "temperature": self.temperature
+        }
+
+    def _chat(self, user_content, use_cache=True):
+        data = self._chat_request(user_content)
+        return self.completion_text(self.post_chat_completion(data, use_cache=use_cache))
+
+    def describe_restaurant(self, restaurant, use_cache=True, on_update=None):
+        """
+        One completion per restaurant; returns the extracted description.
+        With `on_update` the answer is streamed and on_update(text) receives
+        the partial description every time it grows.
+        """
+        content = prompt_payload(restaurant)
+        if on_update is None:
+            return extract_description(self._chat(content, use_cache=use_cache))
+        stream = DescriptionStream()
+        shown = ""
+        for delta in self.stream_chat_completion(self._chat_request(content), use_cache=use_cache):
+            partial_text = stream.feed(delta)
+            if partial_text != shown:
+                shown = partial_text
+                on_update(partial_text)
+        return stream.result()
+
+    def describe_restaurants(self, restaurants, max_parallel=None, batched=False, use_cache=True,
+                             on_update=None):
+        """
+        Descriptions for several restaurants, in input order.
+        By default one request per restaurant is sent concurrently (at most
+        `max_parallel` at a time). With batched=True a single completion is
+        asked for all of them; restaurants missing from that answer fall back
+        to individual requests. `on_update(index, text)` switches the
+        individual requests to streaming and reports partial descriptions.
+        """
+        restaurants = list(restaurants)
+        if not restaurants:
+            return []
+        descriptions = [None] * len(restaurants)
+
+        def describe(idx):
+            callback = partial(on_update, idx) if on_update is not None else None
+            return self.describe_restaurant(restaurants[idx], use_cache=use_cache, on_update=callback)
+
+        if batched and len(restaurants) > 1:
+            for idx, description in self._describe_batch(restaurants, use_cache).items():
+                descriptions[idx] = description
+                if on_update is not None:
+                    on_update(idx, description)
+        missing = [i for i, description in enumerate(descriptions) if description is None]
+        workers = min(max_parallel or self.max_parallel or 1, len(missing))
+        if workers <= 1:
+            answers = [describe(i) for i in missing]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                answers = list(executor.map(describe, missing))
+        for i, answer in zip(missing, answers):
+            descriptions[i] = answer
+        return descriptions
+
+    def _describe_batch(self, restaurants, use_cache=True):
+        """Ask for every description in one completion; returns {index: description}."""
+        parts = [
+            f"Write your usual answer for each of the {len(restaurants)} restaurants below. "
+            "Start each answer with a line '### Restaurant <number>' using the same numbering."
+        ]
+        for idx, restaurant in enumerate(restaurants, 1):
+            parts.append(f"### Restaurant {idx}\n{prompt_payload(restaurant)}")
+        answer = self._chat("\n\n".join(parts), use_cache=use_cache)
+        return self.split_batch_answer(answer, len(restaurants))
+
+    @staticmethod
+    def split_batch_answer(text, count):
+        """Map each '### Restaurant k' section of a batched answer to index k-1."""
+        markers = list(BATCH_SECTION_RE.finditer(text))
+        found = {}
+        for marker, following in zip(markers, markers[1:] + [None]):
+            idx = int(marker.group(1)) - 1
+            end = following.start() if following else len(text)
+            section = text[marker.end():end].strip()
+            if 0 <= idx < count and section and idx not in found:
+                found[idx] = extract_description(section)
+        return found
@@ -1,9 +1,39 @@
 import math
-import re
+
+import numpy as np
+
+from .models import Restaurant
+from .opening_hours import OpeningSchedule, format_lines
+from .scoring import DEFAULT_STRATEGY, FeatureTable, popularity_scores
 
 class TopRestaurantsExtractor:
-    def __init__(self, restaurants_json):
-        self.restaurants = restaurants_json
+    def __init__(self, restaurants_json, strategy=None, origin=None, food_type=None):
+        # Restaurant records pass through; Places dicts are converted once here
+        self.restaurants = [Restaurant.from_dict(r) for r in restaurants_json]
+        self.strategy = strategy or DEFAULT_STRATEGY
+        # Used by the proximity/food_match features
+        self.origin = origin
+        self.food_type = food_type
+        self._features = None
+        self._schedules = None
+
+    @property
+    def features(self):
+        """FeatureTable of the restaurants, built on first use and reused."""
+        if self._features is None:
+            self._features = FeatureTable.from_restaurants(self.restaurants, self.origin, self.food_type)
+        return self._features
+
+    @property
+    def schedules(self):
+        """OpeningSchedule (or None if unknown) per restaurant, parsed once."""
+        if self._schedules is None:
+            self._schedules = [OpeningSchedule.from_place(r) for r in self.restaurants]
+        return self._schedules
+
+    def open_mask(self, day):
+        """False for restaurants known to be closed all day on `day`."""
+        return np.array([s is None or s.is_open_on(day) for s in self.schedules], dtype=bool)
 
     @staticmethod
     def compute_score(rating, num_reviews):
@@ -11,88 +41,85 @@ class TopRestaurantsExtractor:
             return -1
         return rating * math.log10(num_reviews + 1)
 
+    @staticmethod
+    def score_array(ratings, num_reviews):
+        """Vectorized compute_score over float arrays (NaN = missing -> -1)."""
+        scores = popularity_scores(ratings, num_reviews)
+        return np.where(np.isnan(scores), -1.0, scores)
+
+    @staticmethod
+    def top_n_indices(scores, n):
+        """
+        Indices of the n highest scores, best first, ties in original order
+        (same result as a stable descending sort), via partial selection.
+        """
+        m = len(scores)
+        if n <= 0 or m == 0:
+            return np.empty(0, dtype=np.intp)
+        if n < m:
+            kth = scores[np.argpartition(-scores, n - 1)[:n]].min()
+            candidates = np.flatnonzero(scores >= kth)
+        else:
+            candidates = np.arange(m)
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order][:n]
+
+    def rank(self, n=3, strategy=None, open_on=None):
+        """
+        (restaurant, normalized 0-10 score) pairs of the n best restaurants
+        under `strategy` (defaults to self.strategy). Switching strategies
+        reuses the cached feature table. With `open_on` (a date) restaurants
+        closed that day are left out.
+        """
+        scores = (strategy or self.strategy).score(self.features)
+        # Explicit mask: with negative weights a valid score can be below 0
+        mask = self.features.valid
+        if open_on is not None and len(scores):
+            mask = mask & self.open_mask(open_on)
+        valid_idx = np.flatnonzero(mask)
+        if not len(valid_idx):
+            return []
+        scores = scores[valid_idx]
+        # Normalize the scores to a 0-10 scale (avoid division by zero)
+        min_score, max_score = scores.min(), scores.max()
+        if max_score == min_score:
+            norm = np.full(len(scores), 10.0)
+        else:
+            norm = 10 * (scores - min_score) / (max_score - min_score)
+        return [
+            (self.restaurants[valid_idx[i]], float(norm[i]))
+            for i in self.top_n_indices(norm, n).tolist()
+        ]
+
     def format_opening_hours(self,hours_list):
-        formatted = []
-        for h in hours_list:
-            clean = (h.replace('\u2009', ' ')
-                    .replace('\u2013', '-')
-                    .replace('\u2014', '-')
-                    .replace('–', '-')
-                    .replace('—', '-')
-                    .replace('‑', '-')
-                    .replace('\u202f', ' '))
-            match = re.match(r"^(\w+):\s*([0-9]{1,2}:[0-9]{2}\s*[APMapm]{2})\s*[-–—]?\s*([0-9]{1,2}:[0-9]{2}\s*[APMapm]{2})", clean.replace(" ", ""))
-            if match:
-                day = match.group(1)
-                open_hour = match.group(2)
-                close_hour = match.group(3)
-                open_hour = re.sub(r'([0-9])([APMapm]{2})$', r'\1 \2', open_hour)
-                close_hour = re.sub(r'([0-9])([APMapm]{2})$', r'\1 \2', close_hour)
-                formatted.append(f"- {day}: {open_hour} - {close_hour}")
-            else:
-                temp = re.sub(r'(\d{1,2}:\d{2})([APMapm]{2})', r'\1 \2', clean)
-                temp = temp.replace("AM-", "AM - ").replace("PM-", "PM - ")
-                formatted.append(f"- {temp.strip()}")
-        return formatted
+        return format_lines(hours_list)
 
 
-    def get_top_3(self, n=3):
+    def get_top_3(self, n=3, strategy=None, open_on=None):
         desired_fields = [
             'name', 'formatted_address', 'formatted_phone_number', 'website',
             'opening_hours', 'current_opening_hours', 'rating', 'user_ratings_total',
             'reviews', 'price_level', 'wheelchair_accessible_entrance', 'delivery',
             'dine_in', 'takeout', 'reservable'
         ]
-    # 1. Calculate all original scores
-        all_scores = []
-        for r in self.restaurants:
-            rating = r.get("rating")
-            num_reviews = r.get("user_ratings_total")
-            score = self.compute_score(rating, num_reviews)
-            all_scores.append((score, r))
-        # Filter only valid entries
-        all_scores = [r for r in all_scores if r[0] >= 0]
-        if not all_scores:
-            return []
-        # 2. Normalize the scores to a 0-10 scale
-        min_score = min(s for s, _ in all_scores)
-        max_score = max(s for s, _ in all_scores)
-        # Avoid division by zero
-        if max_score == min_score:
-            norm = lambda s: 10.0
-        else:
-            norm = lambda s: 10 * (s - min_score) / (max_score - min_score)
-        # 3. Apply normalization and sort
-        ranked = []
-        for score, r in all_scores:
-            score_norm = norm(score)
-            ranked.append((score_norm, r))
-        ranked.sort(reverse=True, key=lambda x: x[0])
-        top_n = ranked[:n]
+        top_n = self.rank(n, strategy, open_on)
         minimal = []
-        for score, r in top_n:
+        for r, score in top_n:
             info = {
-                "name": r.get("name"),
-                "address": r.get("formatted_address"),
-                "phone_number": r.get("formatted_phone_number"),
+                "name": r.name,
+                "address": r.formatted_address,
+                "phone_number": r.formatted_phone_number,
                 "wheelchair_accessible_entrance": r.get("wheelchair_accessible_entrance", False),
                 "takeout": r.get("takeout", False),
                 "price_level": r.get("price_level", -1),
-                "website": r.get("website"),
+                "website": r.website,
                 "delivery": r.get("delivery", False),
                 "reservable": r.get("reservable", False),
+                "location": r.location,
                 
                 "score": round(score, 2), 
-                "opening_hours": self.format_opening_hours(r.get("opening_hours", {}).get("weekday_text", [])),
-                "reviews": [
-                    {
-                        "author_name": rev.get("author_name"),
-                        "rating": rev.get("rating"),
-                        "text": rev.get("text"),
-                        "time": rev.get("time"),
-                    }
-                    for rev in sorted(r.get("reviews", []), key=lambda x: x.get("time", 0), reverse=True)[:2]
-                ]
+                "opening_hours": self.format_opening_hours((r.opening_hours or {}).get("weekday_text", [])),
+                "reviews": [rev.summary() for rev in r.latest_reviews(2)]
             }
             minimal.append(info)
         return minimal
@@ -4,4 +4,15 @@ from .weather_service import WeatherAPI
 from .pdf_generators import GastronomyPDF
 from .route_optimizer import RouteOptimizer
 from .prompt import SYSTEM_PROFILE
-from .restaurant_selection import RestaurantSelection
\ No newline at end of file
+from .restaurant_selection import RestaurantSelection
+from .cache import MemoryCache, SQLiteCache, TieredCache, GeocodeCache
+from .http_client import HttpClient, get_http_client, http_stats
+from .pipeline import Pipeline, StageEvent, dispatch_events
+from .route_planner import RoutePlanner
+from .scoring import FeatureTable, ScoringStrategy, STRATEGIES
+from .models import Restaurant, Review
+from .persistence import JsonlSink
+from .spatial_index import SpatialIndex
+from .snapshot import CitySnapshot, SnapshotSelector
+from .pdf_resources import ResourcePool, get_resource_pool
+from .pdf_worker import PdfWorkerPool
@@ -0,0 +1,323 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+class CacheStats:
+    """Hit/miss/eviction counters shared by every cache tier."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+def _expiry(ttl):
+    return time.time() + ttl if ttl else None
+
+
+def json_size(value):
+    """Approximate footprint of a JSON-serializable value, in bytes."""
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+class MemoryCache:
+    """
+    Thread-safe in-memory LRU cache.
+    Entries expire after `ttl` seconds (None = never) and the least recently
+    used entries are evicted once `max_entries` or `max_bytes` (measured with
+    `sizeof`, JSON size by default) is exceeded.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None, max_bytes=None, sizeof=json_size):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self.stats = CacheStats()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """Return (value, expires_at) or None if missing/expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self.total_bytes -= size
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return value, expires_at
+
+    def set(self, key, value, ttl=None):
+        self.set_entry(key, value, _expiry(ttl or self.ttl))
+
+    def set_entry(self, key, value, expires_at):
+        size = self.sizeof(value) if self.max_bytes else 0
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[2]
+            if self.max_bytes and size > self.max_bytes:
+                # Larger than the whole cache: never stored
+                return
+            self._data[key] = (value, expires_at, size)
+            self.total_bytes += size
+            while self._data and (
+                (self.max_entries and len(self._data) > self.max_entries)
+                or (self.max_bytes and self.total_bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.stats.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.time())
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Persistent cache backed by a single SQLite table.
+    Values are stored as JSON; the least recently accessed rows are evicted
+    once `max_entries` is exceeded. New rows are tallied instead of counting
+    the table on every write; the table is only counted when the tally
+    passes the cap, and eviction then goes `evict_batch` rows below it so
+    the following writes need no count at all.
+    """
+
+    def __init__(self, path, table="cache", max_entries=None, ttl=None, evict_batch=None):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evict_batch = (max_entries or 0) // 20 if evict_batch is None else evict_batch
+        self.stats = CacheStats()
+        # Rows in the table as seen by this connection (None = not counted yet)
+        self._count = None
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)"
+            )
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """Return (value, expires_at) or None if missing/expired."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        self.stats.hits += 1
+        return json.loads(value), expires_at
+
+    def set(self, key, value, ttl=None):
+        self.set_entry(key, value, _expiry(ttl or self.ttl))
+
+    def set_entry(self, key, value, expires_at):
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock, self._conn:
+            new_row = self.max_entries and self._conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone() is None
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, time.time()),
+            )
+            if new_row:
+                self._evict()
+
+    def _evict(self):
+        if self._count is not None:
+            self._count += 1
+            if self._count <= self.max_entries:
+                return
+        # Exact count, which also sees rows written by other connections
+        self._count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return
+        excess = min(self._count, excess + self.evict_batch)
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+            (excess,),
+        )
+        self._count -= excess
+        self.stats.evictions += excess
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._count = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and (row[0] is None or row[0] > time.time())
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    Memory tier in front of a persistent tier.
+    Disk hits are promoted to memory keeping their original expiry.
+    """
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+        self.stats = CacheStats()
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        entry = self.memory.get_entry(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                self.memory.set_entry(key, *entry)
+        if entry is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return entry
+
+    def set(self, key, value, ttl=None):
+        self.set_entry(key, value, _expiry(ttl or self.memory.ttl))
+
+    def set_entry(self, key, value, expires_at):
+        self.memory.set_entry(key, value, expires_at)
+        if self.disk is not None:
+            self.disk.set_entry(key, value, expires_at)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def __contains__(self, key):
+        return key in self.memory or (self.disk is not None and key in self.disk)
+
+    def __len__(self):
+        return len(self.disk) if self.disk is not None else len(self.memory)
+
+
+def normalize_address(address):
+    """Case-, accent- and whitespace-insensitive key for an address."""
+    text = unicodedata.normalize("NFKD", address.strip().lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.replace(",", " ").split())
+
+
+class GeocodeCache:
+    """
+    Address -> (lat, lng) cache shared by RestaurantSelection and RouteOptimizer.
+    Keys are normalized addresses; pass `path` to persist results in SQLite.
+    """
+
+    def __init__(self, max_entries=4096, path=None, ttl=30 * 24 * 3600):
+        disk = SQLiteCache(path, table="geocode", ttl=ttl) if path else None
+        self.cache = TieredCache(MemoryCache(max_entries=max_entries, ttl=ttl), disk)
+
+    @property
+    def stats(self):
+        return self.cache.stats
+
+    def get(self, address):
+        coords = self.cache.get(normalize_address(address))
+        return tuple(coords) if coords is not None else None
+
+    def set(self, address, lat, lng):
+        self.cache.set(normalize_address(address), [lat, lng])
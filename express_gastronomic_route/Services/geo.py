@@ -0,0 +1,36 @@
+import math
+
+EARTH_RADIUS_M = 6371008.8
+
+# Average speeds (m/s) used to turn straight-line distances into durations
+TRAVEL_SPEEDS = {
+    "walking": 1.3,
+    "bicycling": 4.2,
+    "transit": 5.5,
+    "driving": 8.3,
+}
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance in meters between two (lat, lng) points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def estimate_duration_s(distance_m, mode="walking"):
+    """Rough travel time for a straight-line distance."""
+    return distance_m / TRAVEL_SPEEDS.get(mode, TRAVEL_SPEEDS["walking"])
+
+
+def haversine_m_array(lats, lngs, lat0, lng0):
+    """Vectorized haversine_m from arrays of points to one (lat0, lng0)."""
+    import numpy as np
+    phi1 = np.radians(lats)
+    phi2 = math.radians(lat0)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng0) - np.radians(lngs)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * math.cos(phi2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
@@ -0,0 +1,186 @@
+import bisect
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Methods that are safe to send again after the server may have received them
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Statuses meaning the request was turned away before being processed; the
+# only ones other methods are retried on (a 502/504 from a proxy can hide a
+# completion that is still running)
+REJECTED_STATUSES = frozenset({429, 503})
+
+# (connect, read) timeouts in seconds per service
+SERVICE_TIMEOUTS = {
+    "places": (3.05, 10),
+    "weather": (3.05, 10),
+    "llm": (3.05, 180),
+    "status": (3.05, 5),
+    "default": (3.05, 30),
+}
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, float("inf"))
+
+
+class HttpMetrics:
+    """Request, retry and latency counters of one HttpClient."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.latency_counts = [0] * len(LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.requests += 1
+            self.latency_total += seconds
+            self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self):
+        histogram = {
+            f"le_{bound:g}": count for bound, count in zip(LATENCY_BUCKETS, self.latency_counts)
+        }
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "latency_avg": self.latency_total / self.requests if self.requests else 0.0,
+            "latency_histogram": histogram,
+        }
+
+
+class HttpClient:
+    """
+    requests.Session wrapper with keep-alive pooling, default timeouts and
+    jittered exponential backoff on connection errors, 429 and 5xx (only
+    429 and 503 for non-idempotent methods such as POST).
+    """
+
+    def __init__(self, service="default", timeout=None, max_retries=3, backoff_factor=0.5,
+                 backoff_max=10.0, pool_maxsize=16, session=None):
+        self.service = service
+        self.timeout = timeout or SERVICE_TIMEOUTS.get(service, SERVICE_TIMEOUTS["default"])
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.metrics = HttpMetrics()
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def _retry_delay(self, response, attempt):
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(self.backoff_max, float(retry_after))
+        return self.backoff(attempt)
+
+    @staticmethod
+    def can_retry_error(method, error):
+        """
+        Read timeouts mean the request reached the server, so non-idempotent
+        methods (e.g. an LLM completion POST) are not sent again; failures to
+        connect never reached it and are always retried.
+        """
+        return method.upper() in IDEMPOTENT_METHODS or not isinstance(error, requests.ReadTimeout)
+
+    @staticmethod
+    def can_retry_status(method, status):
+        """Idempotent methods retry every RETRY_STATUSES; others only REJECTED_STATUSES."""
+        if method.upper() in IDEMPOTENT_METHODS:
+            return status in RETRY_STATUSES
+        return status in REJECTED_STATUSES
+
+    def request(self, method, url, retry=True, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        attempts = self.max_retries + 1 if retry else 1
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.metrics.observe(time.perf_counter() - start)
+                if last_attempt or not self.can_retry_error(method, e):
+                    self.metrics.incr("errors")
+                    raise
+                self.metrics.incr("retries")
+                time.sleep(self.backoff(attempt))
+                continue
+            self.metrics.observe(time.perf_counter() - start)
+            if self.can_retry_status(method, response.status_code) and not last_attempt:
+                self.metrics.incr("retries")
+                delay = self._retry_delay(response, attempt)
+                response.close()
+                time.sleep(delay)
+                continue
+            if response.status_code >= 400:
+                self.metrics.incr("errors")
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def connection_stats(self):
+        """New vs reused connections across this session's urllib3 pools."""
+        opened = served = 0
+        for adapter in set(self.session.adapters.values()):
+            poolmanager = getattr(adapter, "poolmanager", None)
+            if poolmanager is None:
+                continue
+            for key in list(poolmanager.pools.keys()):
+                pool = poolmanager.pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    served += pool.num_requests
+        return {"connections_opened": opened, "connections_reused": max(served - opened, 0)}
+
+    def stats(self):
+        return {**self.metrics.as_dict(), **self.connection_stats()}
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(service="default"):
+    """Process-wide HttpClient for `service`, created on first use."""
+    with _clients_lock:
+        client = _clients.get(service)
+        if client is None:
+            client = _clients[service] = HttpClient(service)
+        return client
+
+
+def http_stats():
+    """Metrics of every shared client, keyed by service."""
+    with _clients_lock:
+        clients = dict(_clients)
+    return {service: client.stats() for service, client in clients.items()}
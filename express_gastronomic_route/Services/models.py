@@ -0,0 +1,187 @@
+_MISSING = object()
+
+
+def to_jsonable(value):
+    """`default` hook for json/orjson: records are written as their payload dict."""
+    if isinstance(value, (Restaurant, Review)):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class Review:
+    """One Places review. Fields not modelled here are kept in `extra`."""
+    __slots__ = ("author_name", "rating", "text", "time", "extra")
+
+    FIELDS = ("author_name", "rating", "text", "time")
+
+    def __init__(self, author_name=None, rating=None, text=None, time=None, extra=None):
+        self.author_name = author_name
+        self.rating = rating
+        self.text = text
+        self.time = time
+        self.extra = extra
+
+    def __repr__(self):
+        return f"Review({self.author_name!r}, rating={self.rating!r}, time={self.time!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Review) and self.to_dict() == other.to_dict()
+
+    @classmethod
+    def from_dict(cls, data):
+        fields, extra = _split_fields(data, cls.FIELDS)
+        return cls(extra=extra or None, **fields)
+
+    def to_dict(self):
+        return _join_fields(self, self.FIELDS)
+
+    def summary(self):
+        """The review as shown in the app and the PDF."""
+        return {"author_name": self.author_name, "rating": self.rating, "text": self.text, "time": self.time}
+
+
+class Restaurant:
+    """
+    Compact record of a Places details payload.
+
+    Modelled fields live in slots; the coordinates are stored as two floats
+    and reviews stay as raw dicts until first accessed. Everything else is
+    kept in `extra` so to_dict() returns the original payload. Read access
+    (`r["name"]`, `in`, get(), == a dict) behaves like that payload, so
+    records can replace the details dicts throughout the candidate pool.
+    """
+    __slots__ = (
+        "place_id", "name", "formatted_address", "formatted_phone_number", "website",
+        "lat", "lng", "rating", "user_ratings_total", "price_level",
+        "opening_hours", "current_opening_hours", "wheelchair_accessible_entrance",
+        "delivery", "dine_in", "takeout", "reservable",
+        "extra", "_raw_reviews", "_reviews", "_latest",
+    )
+
+    FIELDS = (
+        "place_id", "name", "formatted_address", "formatted_phone_number", "website",
+        "rating", "user_ratings_total", "price_level",
+        "opening_hours", "current_opening_hours", "wheelchair_accessible_entrance",
+        "delivery", "dine_in", "takeout", "reservable",
+    )
+
+    def __init__(self, name=None, lat=None, lng=None, reviews=None, extra=None, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, fields.pop(field, None))
+        if fields:
+            raise TypeError(f"Unknown Restaurant fields: {sorted(fields)}")
+        self.name = name
+        self.lat = lat
+        self.lng = lng
+        self.extra = extra
+        self._raw_reviews = reviews
+        self._reviews = None
+        self._latest = None
+
+    def __repr__(self):
+        return f"Restaurant({self.name!r}, rating={self.rating!r}, reviews={self.user_ratings_total!r})"
+
+    def __eq__(self, other):
+        if isinstance(other, Restaurant):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from a Places details dict; Restaurant instances pass through."""
+        if isinstance(data, cls):
+            return data
+        fields, extra = _split_fields(data, cls.FIELDS)
+        geometry = data.get("geometry")
+        location = (geometry or {}).get("location") or {}
+        if geometry is not None and geometry == {"location": {"lat": location.get("lat"), "lng": location.get("lng")}} \
+                and location.get("lat") is not None:
+            extra.pop("geometry")
+            fields["lat"], fields["lng"] = location["lat"], location["lng"]
+        reviews = extra.pop("reviews") if extra.get("reviews") is not None else None
+        return cls(reviews=reviews, extra=extra or None, **fields)
+
+    def to_dict(self):
+        """The Places dict this record was built from."""
+        data = _join_fields(self, self.FIELDS)
+        if self.lat is not None:
+            data["geometry"] = {"location": {"lat": self.lat, "lng": self.lng}}
+        if self._reviews is not None:
+            data["reviews"] = [review.to_dict() for review in self._reviews]
+        elif self._raw_reviews is not None:
+            data["reviews"] = self._raw_reviews
+        return data
+
+    def get(self, key, default=None):
+        """dict-style access to the original payload keys."""
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif key == "geometry":
+            if self.lat is not None:
+                return {"location": {"lat": self.lat, "lng": self.lng}}
+        elif key == "reviews":
+            if self._raw_reviews is not None or self._reviews is not None:
+                return [review.to_dict() for review in self.reviews]
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        return default
+
+    @property
+    def location(self):
+        """(lat, lng), also when the geometry is kept whole in `extra`."""
+        if self.lat is not None:
+            return self.lat, self.lng
+        loc = ((self.extra or {}).get("geometry") or {}).get("location") or {}
+        if loc.get("lat") is None or loc.get("lng") is None:
+            return None
+        return loc["lat"], loc["lng"]
+
+    @property
+    def reviews(self):
+        """Review objects in payload order, built on first access."""
+        if self._reviews is None:
+            self._reviews = [Review.from_dict(review) for review in self._raw_reviews or []]
+            self._raw_reviews = None
+        return self._reviews
+
+    def latest_reviews(self, k=2):
+        """The k most recent reviews; sorted once, then reused."""
+        if self._latest is None:
+            self._latest = sorted(self.reviews, key=lambda review: review.time or 0, reverse=True)
+        return self._latest[:k]
+
+
+def _split_fields(data, fields):
+    """(known fields, everything else). Explicit None values go to extra to survive to_dict."""
+    known = {}
+    extra = {}
+    for key, value in data.items():
+        if key in fields and value is not None:
+            known[key] = value
+        else:
+            extra[key] = value
+    return known, extra
+
+
+def _join_fields(record, fields):
+    data = {}
+    for field in fields:
+        value = getattr(record, field)
+        if value is not None:
+            data[field] = value
+    if record.extra:
+        data.update(record.extra)
+    return data
@@ -0,0 +1,213 @@
+import bisect
+import re
+from datetime import date, datetime
+
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+
+# Day names as used in weekday_text, Monday first (datetime.weekday() order)
+DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+DAY_INDEX = {name: i for i, name in enumerate(DAY_NAMES)}
+DAY_INDEX.update({name[:3]: i for i, name in enumerate(DAY_NAMES)})
+
+# Thin/narrow spaces and every dash variant Google uses, mapped to ASCII
+_CLEAN_TABLE = str.maketrans({
+    "\u2009": " ",
+    "\u202f": " ",
+    "\u2013": "-",
+    "\u2014": "-",
+    "\u2011": "-",
+})
+# "Mon:09:00AM-05:00PM" once spaces are removed
+_DISPLAY_RE = re.compile(
+    r"^(\w+):\s*([0-9]{1,2}:[0-9]{2}\s*[APMapm]{2})\s*[-–—]?\s*([0-9]{1,2}:[0-9]{2}\s*[APMapm]{2})"
+)
+_MERIDIEM_END_RE = re.compile(r"([0-9])([APMapm]{2})$")
+_MERIDIEM_RE = re.compile(r"(\d{1,2}:\d{2})([APMapm]{2})")
+
+_LINE_RE = re.compile(r"^\s*([A-Za-z]+)\s*:\s*(.*)$")
+_RANGE_RE = re.compile(
+    r"(\d{1,2}):(\d{2})\s*([AaPp])?\.?\s*[Mm]?\.?\s*-\s*(\d{1,2}):(\d{2})\s*([AaPp])?\.?\s*[Mm]?\.?"
+)
+
+
+def clean_text(text):
+    return text.translate(_CLEAN_TABLE)
+
+
+def format_lines(hours_list):
+    """Display lines for weekday_text ("- Mon: 09:00 AM - 05:00 PM")."""
+    formatted = []
+    for h in hours_list:
+        clean = clean_text(h)
+        match = _DISPLAY_RE.match(clean.replace(" ", ""))
+        if match:
+            open_hour = _MERIDIEM_END_RE.sub(r"\1 \2", match.group(2))
+            close_hour = _MERIDIEM_END_RE.sub(r"\1 \2", match.group(3))
+            formatted.append(f"- {match.group(1)}: {open_hour} - {close_hour}")
+        else:
+            temp = _MERIDIEM_RE.sub(r"\1 \2", clean)
+            temp = temp.replace("AM-", "AM - ").replace("PM-", "PM - ")
+            formatted.append(f"- {temp.strip()}")
+    return formatted
+
+
+def _to_minutes(hour, minute, meridiem):
+    hour = int(hour) % 24
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+    return hour * 60 + int(minute)
+
+
+def week_minute(when):
+    """Minutes since Monday 00:00 for a datetime, or (weekday, minute-of-day)."""
+    if isinstance(when, datetime):
+        return when.weekday() * DAY_MINUTES + when.hour * 60 + when.minute
+    weekday, minute = when
+    return weekday * DAY_MINUTES + minute
+
+
+def _merge(intervals):
+    """Sort, split at the week boundary and merge overlapping intervals."""
+    pieces = []
+    for start, end in intervals:
+        if end <= start:
+            continue
+        length = end - start
+        if length >= WEEK_MINUTES:
+            return [(0, WEEK_MINUTES)]
+        start %= WEEK_MINUTES
+        end = start + length
+        if end > WEEK_MINUTES:
+            pieces.append((start, WEEK_MINUTES))
+            pieces.append((0, end - WEEK_MINUTES))
+        else:
+            pieces.append((start, end))
+    merged = []
+    for start, end in sorted(pieces):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class OpeningSchedule:
+    """
+    Weekly opening hours as sorted, non-overlapping [start, end) intervals
+    in minutes since Monday 00:00. Lookups are a bisect over the starts.
+    """
+
+    def __init__(self, intervals):
+        self.intervals = tuple(_merge(intervals))
+        self._starts = [start for start, _ in self.intervals]
+
+    def __repr__(self):
+        return f"OpeningSchedule({list(self.intervals)!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, OpeningSchedule) and self.intervals == other.intervals
+
+    @classmethod
+    def from_periods(cls, periods):
+        """Places `periods` (day 0 = Sunday, time "HHMM")."""
+        intervals = []
+        for period in periods:
+            open_ = period.get("open") or {}
+            close = period.get("close")
+            if "day" not in open_:
+                continue
+            start = ((open_["day"] - 1) % 7) * DAY_MINUTES + _to_minutes(open_["time"][:2], open_["time"][2:], None)
+            if close is None:
+                # A single open period without close means open 24/7
+                return cls([(0, WEEK_MINUTES)])
+            end = ((close["day"] - 1) % 7) * DAY_MINUTES + _to_minutes(close["time"][:2], close["time"][2:], None)
+            if end <= start:
+                end += WEEK_MINUTES
+            intervals.append((start, end))
+        return cls(intervals)
+
+    @classmethod
+    def from_weekday_text(cls, lines):
+        """Parse weekday_text lines such as "Monday: 9:00 AM – 2:00 PM, 7:00 – 11:00 PM"."""
+        intervals = []
+        for line in lines:
+            match = _LINE_RE.match(clean_text(line))
+            if not match:
+                continue
+            day = DAY_INDEX.get(match.group(1).lower())
+            if day is None:
+                continue
+            body = match.group(2)
+            base = day * DAY_MINUTES
+            if "24 hours" in body.lower():
+                intervals.append((base, base + DAY_MINUTES))
+                continue
+            for h1, m1, mer1, h2, m2, mer2 in _RANGE_RE.findall(body):
+                # "7:00 – 11:00 PM": the opening time takes the closing meridiem
+                start = _to_minutes(h1, m1, mer1 or mer2)
+                end = _to_minutes(h2, m2, mer2 or mer1)
+                if mer2 and not mer1 and start > end:
+                    start = _to_minutes(h1, m1, "a")
+                if end <= start:
+                    end += DAY_MINUTES
+                intervals.append((base + start, base + end))
+        return cls(intervals)
+
+    @classmethod
+    def from_place(cls, place):
+        """Schedule of a Places details dict, or None when it has no hours."""
+        for field in ("opening_hours", "current_opening_hours"):
+            hours = place.get(field) or {}
+            if hours.get("periods"):
+                return cls.from_periods(hours["periods"])
+            lines = hours.get("weekday_text")
+            if lines:
+                schedule = cls.from_weekday_text(lines)
+                # Unparseable text (other locales) is unknown, not "always closed"
+                if schedule.intervals or any("closed" in line.lower() for line in lines):
+                    return schedule
+        return None
+
+    def is_open_at(self, when):
+        """Open at a datetime or (weekday, minute-of-day)?"""
+        minute = week_minute(when) % WEEK_MINUTES
+        i = bisect.bisect_right(self._starts, minute) - 1
+        return i >= 0 and minute < self.intervals[i][1]
+
+    def _overlaps(self, start, end):
+        i = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        for open_start, open_end in self.intervals[i:]:
+            if open_start >= end:
+                break
+            if open_end > start:
+                return True
+        return False
+
+    def _covers(self, start, end):
+        i = bisect.bisect_right(self._starts, start) - 1
+        return i >= 0 and end <= self.intervals[i][1]
+
+    def is_open_during(self, start, end, fully=False):
+        """
+        Open at some point between `start` and `end` (datetimes or
+        (weekday, minute) pairs), or for the whole window if fully=True.
+        """
+        begin = week_minute(start)
+        length = week_minute(end) - begin
+        if isinstance(start, datetime) and isinstance(end, datetime):
+            length = int((end - start).total_seconds() // 60)
+        if length <= 0:
+            return self.is_open_at(start)
+        begin %= WEEK_MINUTES
+        windows = [(begin, min(begin + length, WEEK_MINUTES))]
+        if begin + length > WEEK_MINUTES:
+            windows.append((0, min(begin + length - WEEK_MINUTES, WEEK_MINUTES)))
+        if fully:
+            return all(self._covers(s, e) for s, e in windows)
+        return any(self._overlaps(s, e) for s, e in windows)
+
+    def is_open_on(self, day):
+        """Open at any time on a date (or weekday number, Monday = 0)."""
+        weekday = day.weekday() if isinstance(day, date) else day
+        return self.is_open_during((weekday, 0), (weekday, DAY_MINUTES))
@@ -3,18 +3,31 @@ from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+from .pdf_resources import get_resource_pool
+
 load_dotenv()
 
 photo_dir = os.getenv("PHOTO_DIR")
 
+COVER_IMAGE = "malagaPortada.jpg"
+COVER_WIDTH_MM = 150
+
+
+def cover_image_path():
+    """Cover photo path, reading PHOTO_DIR when it is needed rather than at import."""
+    directory = os.getenv("PHOTO_DIR") or photo_dir
+    return os.path.join(directory, COVER_IMAGE) if directory else None
+
 
 class GastronomyPDF:
-    def __init__(self, filename=None, title="Ruta Gastronómica"):
+    def __init__(self, filename=None, title="Ruta Gastronómica", resources=None):
         if not filename:
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"ruta_gastronomica_{ts}.pdf"
         self.filename = filename
         self.title = title
+        # Prepared images shared by every PDF of the process
+        self.resources = resources or get_resource_pool()
         self.pdf = FPDF()
         self.pdf.set_auto_page_break(True, margin=18)
 
@@ -61,6 +74,17 @@ class GastronomyPDF:
         return sections
 
 
+    def add_cover_image(self):
+        path = cover_image_path()
+        if not path:
+            print("PHOTO_DIR is not set; the cover has no photo.")
+            return
+        try:
+            self.pdf.image(self.resources.image(path, COVER_WIDTH_MM), x=30, w=COVER_WIDTH_MM)
+        except RuntimeError as e:
+            # fpdf reports unreadable images as RuntimeError; the PDF is still useful without it
+            print(f"Cover image skipped: {e}")
+
     def portada(self, maps_url=None):
         self.pdf.add_page()
         self.pdf.ln(15)
@@ -71,7 +95,7 @@ class GastronomyPDF:
         self.pdf.set_font("Arial", '', 14)
         self.pdf.ln(10)
         self.pdf.ln(20)
-        self.pdf.image(os.path.join(photo_dir, "malagaPortada.jpg"), x=30, w=150)
+        self.add_cover_image()
         self.pdf.ln(20)
         if maps_url:
             self.pdf.set_font("Arial", 'B', 14)
@@ -209,11 +233,33 @@ class GastronomyPDF:
             )
 
 
-    def generate(self, restaurants, forecast=None, best_day=None, city="Málaga",maps_url=None):
+    def build(self, restaurants, forecast=None, best_day=None, city="Málaga", maps_url=None):
+        """Lay out every page; nothing is written yet."""
         self.portada(maps_url)
         for idx, rest in enumerate(restaurants, 1):
             self.add_restaurant(rest, idx)
         if forecast:
             self.add_weather_summary(forecast, best_day, city)
+
+    def to_bytes(self):
+        """The laid-out document as PDF bytes."""
+        data = self.pdf.output(dest='S')
+        # fpdf 1.x returns a latin-1 str, fpdf2 a bytearray
+        return data.encode('latin-1') if isinstance(data, str) else bytes(data)
+
+    def render(self, restaurants, forecast=None, best_day=None, city="Málaga", maps_url=None, path=None):
+        """
+        Build the PDF in memory and return its bytes. With `path` the same
+        bytes are also written to that file.
+        """
+        self.build(restaurants, forecast=forecast, best_day=best_day, city=city, maps_url=maps_url)
+        data = self.to_bytes()
+        if path:
+            with open(path, "wb") as f:
+                f.write(data)
+        return data
+
+    def generate(self, restaurants, forecast=None, best_day=None, city="Málaga",maps_url=None):
+        self.build(restaurants, forecast=forecast, best_day=best_day, city=city, maps_url=maps_url)
         self.pdf.output(self.filename)
         
@@ -0,0 +1,118 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+try:
+    from PIL import Image
+except ImportError:  # images are then embedded as they are
+    Image = None
+
+MM_PER_INCH = 25.4
+
+
+class ResourcePool:
+    """
+    Process-wide cache of prepared PDF resources.
+
+    Images are decoded once, downscaled to the size they are placed at
+    (`dpi` pixels per inch of printed width), recompressed as JPEG and kept
+    as small files that fpdf can embed. The pool holds at most `max_bytes`
+    of prepared images; the least recently used are deleted beyond that.
+    Images that cannot be decoded, or that preparing would not shrink, are
+    remembered as the original file so they are not prepared again.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, dpi=150, quality=80, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self.quality = quality
+        self.cache_dir = cache_dir
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _directory(self):
+        if self.cache_dir is None:
+            self.cache_dir = tempfile.mkdtemp(prefix="gastronomy_pdf_")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return self.cache_dir
+
+    def image(self, path, width_mm):
+        """Path of `path` prepared for a `width_mm` wide placement."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, width_mm, self.dpi, self.quality)
+        with self._lock:
+            entry = self._images.get(key)
+            if entry is not None and os.path.exists(entry[0]):
+                self._images.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        data = self._prepare(path, width_mm)
+        if data is None or len(data) >= stat.st_size or len(data) > self.max_bytes:
+            # Not decodable, or preparing did not make it smaller: use the original
+            prepared, data = path, b""
+        else:
+            name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + ".jpg"
+            prepared = os.path.join(self._directory(), name)
+            with open(prepared, "wb") as f:
+                f.write(data)
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            self._images[key] = (prepared, len(data))
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes and len(self._images) > 1:
+                _, (old_path, size) = self._images.popitem(last=False)
+                if not size:
+                    continue  # an original file, not ours to delete
+                self.total_bytes -= size
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+        return prepared
+
+    def _prepare(self, path, width_mm):
+        if Image is None:
+            return None
+        try:
+            with Image.open(path) as img:
+                img = img.convert("RGB")
+                max_width = max(1, int(round(width_mm / MM_PER_INCH * self.dpi)))
+                if img.width > max_width:
+                    height = max(1, int(round(img.height * max_width / img.width)))
+                    img = img.resize((max_width, height), Image.LANCZOS)
+                buffer = io.BytesIO()
+                img.save(buffer, format="JPEG", quality=self.quality, optimize=True)
+                return buffer.getvalue()
+        except Exception as e:
+            print(f"Could not prepare image {path}: {e}")
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {"images": len(self._images), "bytes": self.total_bytes, "hits": self.hits,
+                    "misses": self.misses}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_resource_pool():
+    """Process-wide ResourcePool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ResourcePool()
+        return _pool
@@ -0,0 +1,157 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from .pdf_generators import GastronomyPDF
+
+
+def render_pdf_document(restaurants, forecast=None, best_day=None, city="Málaga", maps_url=None,
+                        title="Ruta Gastronómica", path=None):
+    """Render one route PDF and return its bytes (also written to `path` if given)."""
+    pdfgen = GastronomyPDF(filename=path, title=title)
+    return pdfgen.render(restaurants, forecast=forecast, best_day=best_day, city=city, maps_url=maps_url, path=path)
+
+
+def _run_job(job, submitted_at):
+    # Runs in a worker process; wall-clock times so they compare across processes
+    started = time.time()
+    data = render_pdf_document(**job)
+    return data, started - submitted_at, time.time() - started
+
+
+class PdfJob:
+    """Handle of a PDF rendered by a PdfWorkerPool."""
+
+    def __init__(self, future, file_name=None, job=None):
+        self.future = future
+        self.file_name = file_name
+        self.job = job
+        self.queue_wait = None
+        self.render_time = None
+        self._fallback = None
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """
+        PDF bytes; waits for the worker if needed and re-raises its error.
+        If the worker process died, the PDF is rendered here instead, once.
+        """
+        try:
+            data, self.queue_wait, self.render_time = self.future.result(timeout)
+        except BrokenProcessPool:
+            if self.job is None:
+                raise
+            if self._fallback is None:
+                print("PDF worker died; rendering the PDF inline.")
+                self._fallback = render_pdf_document(**self.job)
+            return self._fallback
+        return data
+
+
+class PdfWorkerPool:
+    """
+    Renders route PDFs in a small process pool, off the request thread.
+
+    FPDF layout and compression are CPU-bound pure Python, so worker
+    processes keep them from competing with the app for the GIL. At most
+    `max_queue` jobs may be waiting or running; submit() returns None
+    beyond that so the caller can render inline instead of piling up work.
+    Workers are started with `spawn` by default, which is safe in the
+    threaded Streamlit server. If a worker dies the executor is broken for
+    good, so it is dropped and the next submit() starts a new one.
+    """
+
+    def __init__(self, max_workers=2, max_queue=8, mp_context="spawn"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.mp_context = mp_context
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.render_time_total = 0.0
+        self.render_time_max = 0.0
+        self._futures = set()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            context = multiprocessing.get_context(self.mp_context) if self.mp_context else None
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        return self._executor
+
+    def submit(self, file_name=None, **job):
+        """
+        Queue a render_pdf_document(**job) call. Returns a PdfJob, or None
+        when max_queue jobs are already pending or the pool is broken, so
+        the caller renders inline.
+        """
+        with self._lock:
+            # A future is done as soon as its result is set, before callbacks run
+            self._futures = {f for f in self._futures if not f.done()}
+            if len(self._futures) >= self.max_queue:
+                self.rejected += 1
+                return None
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_run_job, job, time.time())
+            except BrokenProcessPool as e:
+                print(f"PDF worker pool is broken, restarting it: {e}")
+                self.failed += 1
+                self._executor = None
+                future = None
+            else:
+                self._futures.add(future)
+                self.submitted += 1
+        if future is None:
+            executor.shutdown(wait=False)
+            return None
+        future.add_done_callback(partial(self._record, executor))
+        return PdfJob(future, file_name=file_name, job=job)
+
+    def _record(self, executor, future):
+        error = None if future.cancelled() else future.exception()
+        broken = isinstance(error, BrokenProcessPool)
+        with self._lock:
+            if broken and self._executor is executor:
+                self._executor = None
+            if future.cancelled() or error is not None:
+                self.failed += 1
+            else:
+                _, queue_wait, render_time = future.result()
+                self.completed += 1
+                self.queue_wait_total += queue_wait
+                self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+                self.render_time_total += render_time
+                self.render_time_max = max(self.render_time_max, render_time)
+        if broken:
+            executor.shutdown(wait=False)
+
+    def stats(self):
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "pending": sum(1 for f in self._futures if not f.done()),
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "queue_wait_avg": self.queue_wait_total / done,
+                "queue_wait_max": self.queue_wait_max,
+                "render_time_avg": self.render_time_total / done,
+                "render_time_max": self.render_time_max,
+            }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
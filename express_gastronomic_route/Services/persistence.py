@@ -0,0 +1,106 @@
+import gzip
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+from .models import to_jsonable
+
+try:
+    import orjson
+except ImportError:  # optional, faster encoder
+    orjson = None
+
+
+def dumps_line(record, use_orjson=True):
+    """Compact one-line JSON encoding of a record, as bytes (Restaurant records included)."""
+    if use_orjson and orjson is not None:
+        return orjson.dumps(record, default=to_jsonable, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=to_jsonable) + "\n").encode("utf-8")
+
+
+class JsonlSink:
+    """
+    Background writer for search results.
+
+    submit() only enqueues the record, so callers never wait for disk I/O.
+    A daemon thread appends each record as one compact JSON line to a daily
+    file (`<prefix>_YYYYMMDD.jsonl`, or `.jsonl.gz` with compress=True). The
+    queue is bounded: when the writer falls behind, new records are dropped
+    and counted instead of blocking the request.
+    """
+
+    def __init__(self, directory, prefix="restaurant_details", compress=False, max_queue=64, use_orjson=True):
+        self.directory = directory
+        self.prefix = prefix
+        self.compress = compress
+        self.use_orjson = use_orjson
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._worker, name=f"{prefix}-sink", daemon=True)
+        self._thread.start()
+
+    def path_for(self, day):
+        ext = ".jsonl.gz" if self.compress else ".jsonl"
+        return os.path.join(self.directory, f"{self.prefix}_{day:%Y%m%d}{ext}")
+
+    def submit(self, record):
+        """Queue a record for writing; returns False if it was dropped."""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _write(self, record):
+        line = dumps_line(record, self.use_orjson)
+        path = self.path_for(datetime.now())
+        # Appended gzip members still form one valid .gz file
+        opener = gzip.open if self.compress else open
+        with opener(path, "ab") as f:
+            f.write(line)
+
+    def _worker(self):
+        while True:
+            record = self._queue.get()
+            try:
+                if record is None:
+                    return
+                self._write(record)
+                self.written += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Error saving details: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "errors": self.errors,
+                "queued": self._queue.qsize()}
+
+
+def read_jsonl(path):
+    """Records of a (possibly gzipped) sink file, in write order."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
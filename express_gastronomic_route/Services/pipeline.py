@@ -0,0 +1,171 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+class StageEvent:
+    """
+    Outcome of one pipeline stage, yielded as soon as the stage finishes.
+    Partial events carry intermediate progress reported by a running stage.
+    """
+
+    def __init__(self, name, result=None, error=None, elapsed=0.0, skipped=False, partial=False):
+        self.name = name
+        self.result = result
+        self.error = error
+        self.elapsed = elapsed
+        self.skipped = skipped
+        self.partial = partial
+
+    @property
+    def ok(self):
+        return self.error is None and not self.skipped
+
+    def __repr__(self):
+        if self.partial:
+            return f"StageEvent({self.name!r}, partial)"
+        state = "ok" if self.ok else ("skipped" if self.skipped else f"error={self.error!r}")
+        return f"StageEvent({self.name!r}, {state}, {self.elapsed:.3f}s)"
+
+
+class Pipeline:
+    """
+    Runs named stages as a dependency DAG on a thread pool.
+    Each stage function receives the results of its dependencies as keyword
+    arguments named after them; stages whose dependencies are met run
+    concurrently, so wall-clock time follows the critical path. Stages added
+    with progress=True also get a `progress(payload)` callback whose payloads
+    are yielded as partial events.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.stages = {}
+        self.results = {}
+        self.timings = {}
+        self._progress_stages = set()
+
+    def add_stage(self, name, func, deps=(), progress=False):
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self.stages[name] = (func, tuple(deps))
+        if progress:
+            self._progress_stages.add(name)
+        return self
+
+    def _validate(self):
+        for name, (_, deps) in self.stages.items():
+            missing = [dep for dep in deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {name!r} depends on unknown stages: {missing}")
+        # Kahn's algorithm: every stage must be reachable without cycles
+        indegree = {name: len(deps) for name, (_, deps) in self.stages.items()}
+        ready = [name for name, degree in indegree.items() if degree == 0]
+        seen = 0
+        while ready:
+            current = ready.pop()
+            seen += 1
+            for name, (_, deps) in self.stages.items():
+                if current in deps:
+                    indegree[name] -= 1
+                    if indegree[name] == 0:
+                        ready.append(name)
+        if seen != len(self.stages):
+            raise ValueError("Pipeline stages contain a dependency cycle")
+
+    def _dependents(self, failed):
+        """All stages that transitively depend on `failed`."""
+        found = set()
+        frontier = [failed]
+        while frontier:
+            current = frontier.pop()
+            for name, (_, deps) in self.stages.items():
+                if current in deps and name not in found:
+                    found.add(name)
+                    frontier.append(name)
+        return found
+
+    def iter_run(self):
+        """
+        Execute the DAG, yielding a StageEvent per stage in completion order.
+        Stages depending on a failed stage are reported as skipped.
+        """
+        self._validate()
+        self.results = {}
+        self.timings = {}
+        pending = dict(self.stages)
+        finished = queue.Queue()
+
+        def run_stage(name, func, kwargs):
+            start = time.perf_counter()
+            try:
+                result, error = func(**kwargs), None
+            except Exception as e:
+                result, error = None, e
+            finished.put(StageEvent(name, result, error, time.perf_counter() - start))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = 0
+            while pending or running:
+                for name, (func, deps) in list(pending.items()):
+                    if all(dep in self.results for dep in deps):
+                        del pending[name]
+                        kwargs = {dep: self.results[dep] for dep in deps}
+                        if name in self._progress_stages:
+                            kwargs["progress"] = partial(self._report, finished, name)
+                        executor.submit(run_stage, name, func, kwargs)
+                        running += 1
+                if not running:
+                    break
+                event = finished.get()
+                if event.partial:
+                    yield event
+                    continue
+                running -= 1
+                self.timings[event.name] = event.elapsed
+                if event.error is None:
+                    self.results[event.name] = event.result
+                yield event
+                if event.error is not None:
+                    for name in sorted(self._dependents(event.name)):
+                        if pending.pop(name, None) is not None:
+                            yield StageEvent(name, skipped=True)
+
+    @staticmethod
+    def _report(finished, name, payload):
+        finished.put(StageEvent(name, result=payload, partial=True))
+
+    def run(self):
+        """Execute the whole DAG and return {stage: result}; re-raises the first error."""
+        for event in self.iter_run():
+            if event.partial:
+                continue
+            if event.error is not None:
+                raise event.error
+        return self.results
+
+
+def dispatch_events(events, on_result, on_partial=None, on_error=None):
+    """
+    Hand pipeline events to callbacks and collect the finished results.
+    Partial events only reach on_partial and skipped stages are ignored, so
+    on_result sees each stage's final result once. Returns (results, failed).
+    """
+    results = {}
+    failed = False
+    for event in events:
+        if event.skipped:
+            continue
+        if event.partial:
+            if on_partial is not None:
+                on_partial(event)
+            continue
+        if event.error is not None:
+            failed = True
+            if on_error is not None:
+                on_error(event)
+            continue
+        results[event.name] = event.result
+        on_result(event)
+    return results, failed
@@ -1,11 +1,44 @@
 import os
-import requests
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dotenv import load_dotenv
 from datetime import datetime
 
+from .geo import haversine_m
+from .http_client import get_http_client
+from .models import Restaurant, to_jsonable
+from .spatial_index import result_location
+
 class RestaurantSelection:
-    def __init__(self, api_key=None):
+    BASE_URL = "https://maps.googleapis.com/maps/api"
+    # Seconds before a next_page_token becomes valid, and how often to retry it
+    PAGE_TOKEN_DELAY = 2.0
+    PAGE_TOKEN_RETRIES = 3
+    # Results per Nearby Search page, and the range of a rankby=distance search
+    PAGE_SIZE = 20
+    MAX_PAGES = 3
+    RANKBY_DISTANCE_MAX_M = 50000
+
+    # Place Details fields kept in the output, grouped by how fast they go stale
+    DETAILS_FIELD_SETS = {
+        'basic': ['name', 'formatted_address', 'geometry', 'wheelchair_accessible_entrance'],
+        'contact': ['formatted_phone_number', 'website', 'opening_hours'],
+        'atmosphere': [
+            'current_opening_hours', 'rating', 'user_ratings_total', 'reviews',
+            'price_level', 'delivery', 'dine_in', 'takeout', 'reservable'
+        ],
+    }
+    # Cache TTL (seconds) per field set
+    DETAILS_TTL = {
+        'basic': 30 * 24 * 3600,
+        'contact': 7 * 24 * 3600,
+        'atmosphere': 24 * 3600,
+    }
+
+    def __init__(self, api_key=None, max_workers=8, details_cache=None, geocode_cache=None, http=None,
+                 spatial_index=None):
         # Load API key from .env if not provided
         if not api_key:
             load_dotenv()
@@ -13,17 +46,33 @@ class RestaurantSelection:
         if not api_key:
             raise ValueError("Google API key not set.")
         self.api_key = api_key
+        # Upper bound on concurrent Place Details requests (1 = sequential)
+        self.max_workers = max_workers
+        # Optional MemoryCache/SQLiteCache/TieredCache for Place Details
+        self.details_cache = details_cache
+        # Optional GeocodeCache, usually shared with RouteOptimizer
+        self.geocode_cache = geocode_cache
+        # Pooled HTTP client with timeouts and retries
+        self.http = http or get_http_client("places")
+        # Optional SpatialIndex answering searches in areas already covered
+        self.spatial_index = spatial_index
 
     def get_coordinates(self, address):
         """Geocode an address to get latitude and longitude."""
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
+        if self.geocode_cache is not None:
+            cached = self.geocode_cache.get(address)
+            if cached is not None:
+                return cached
+        url = f"{self.BASE_URL}/geocode/json"
         params = {'address': address, 'key': self.api_key}
         try:
-            resp = requests.get(url, params=params)
+            resp = self.http.get(url, params=params)
             resp.raise_for_status()
             data = resp.json()
             if data['status'] == 'OK':
                 loc = data['results'][0]['geometry']['location']
+                if self.geocode_cache is not None:
+                    self.geocode_cache.set(address, loc['lat'], loc['lng'])
                 return loc['lat'], loc['lng']
             print(f"Geocoding error: {data['status']}")
             return None, None
@@ -31,8 +80,7 @@ class RestaurantSelection:
             print(f"Geocoding request error: {e}")
             return None, None
 
-    def search_restaurants(self, latitude, longitude, radius=5000, food_type=None, max_results=25):
-        url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+    def _nearby_params(self, latitude, longitude, radius=5000, food_type=None):
         params = {
             'location': f"{latitude},{longitude}",
             'type': 'restaurant',
@@ -49,18 +97,69 @@ class RestaurantSelection:
         # Remove invalid parameter combinations
         if params.get('rankby') == 'distance' and 'radius' in params:
             del params['radius']
+        return params
+
+    def _from_index(self, latitude, longitude, radius, food_type, limit):
+        """Results served by the spatial index, or None if the area is not covered."""
+        index = self.spatial_index
+        if index is None:
+            return None
+        if food_type:
+            if not index.is_covered(latitude, longitude, radius, food_type):
+                return None
+            return [item for item, _ in index.within(latitude, longitude, radius, food_type)][:limit]
+        nearest = index.nearest(latitude, longitude, limit)
+        # Fewer than `limit` known places is only complete if the whole search range was covered
+        needed = nearest[-1][1] if len(nearest) == limit else self.RANKBY_DISTANCE_MAX_M
+        if not nearest or not index.is_covered(latitude, longitude, needed):
+            return None
+        return [item for item, _ in nearest]
+
+    def _is_complete(self, pages, last_page, token):
+        """
+        Did a query return every match? Google stops handing out tokens after
+        MAX_PAGES pages, so only a short last page without a token is proof.
+        """
+        return not token and pages < self.MAX_PAGES and len(last_page) < self.PAGE_SIZE
+
+    def _add_to_index(self, latitude, longitude, radius, food_type, results, complete):
+        """Index live results and record the circle they are known to cover."""
+        index = self.spatial_index
+        if index is None:
+            return
+        index.add(results, food_type)
+        if food_type:
+            # Keyword queries rank by prominence: only a complete answer covers the radius
+            if complete:
+                index.mark_covered(latitude, longitude, radius, food_type)
+        elif complete:
+            index.mark_covered(latitude, longitude, self.RANKBY_DISTANCE_MAX_M)
+        elif results:
+            # rankby=distance: everything closer than the farthest result was returned
+            farthest = max(haversine_m(latitude, longitude, *result_location(item))
+                           for item in results if result_location(item))
+            index.mark_covered(latitude, longitude, farthest)
+
+    def search_restaurants(self, latitude, longitude, radius=5000, food_type=None, max_results=25):
+        cached = self._from_index(latitude, longitude, radius, food_type, min(max_results, self.PAGE_SIZE))
+        if cached is not None:
+            return cached
+        url = f"{self.BASE_URL}/place/nearbysearch/json"
+        params = self._nearby_params(latitude, longitude, radius, food_type)
 
         try:
-            resp = requests.get(url, params=params)
+            resp = self.http.get(url, params=params)
             resp.raise_for_status()
             data = resp.json()
             if data['status'] == 'OK':
+                self._add_to_index(latitude, longitude, radius, food_type, data['results'],
+                                   complete=self._is_complete(1, data['results'], data.get('next_page_token')))
                 results = data['results'][:max_results]
                 # If filtering by food_type, sort results by proximity
                 if food_type:
                     def dist(item):
-                        loc = item['geometry']['location']
-                        return (loc['lat'] - latitude)**2 + (loc['lng'] - longitude)**2
+                        location = result_location(item)
+                        return haversine_m(latitude, longitude, *location) if location else float("inf")
                     results = sorted(results, key=dist)
                 return results
             print(f"Restaurant search error: {data['status']}")
@@ -69,15 +168,103 @@ class RestaurantSelection:
             print(f"Restaurant search request error: {e}")
             return []
 
-    def get_restaurant_details(self, place_id):
+    def search_all_pages(self, latitude, longitude, radius=5000, food_type=None, max_pages=3):
+        """
+        One Nearby Search query following next_page_token (up to max_pages,
+        Google serves at most 3 pages of 20). A fresh token is only valid
+        after a short delay, so this sleeps in the calling thread.
+        """
+        cached = self._from_index(latitude, longitude, radius, food_type, self.PAGE_SIZE * max_pages)
+        if cached is not None:
+            return cached
+        url = f"{self.BASE_URL}/place/nearbysearch/json"
+        params = self._nearby_params(latitude, longitude, radius, food_type)
+        results = []
+        pages = 0
+        retries = 0
+        complete = False
+        while pages < max_pages:
+            try:
+                resp = self.http.get(url, params=params)
+                resp.raise_for_status()
+                data = resp.json()
+            except Exception as e:
+                print(f"Restaurant search request error: {e}")
+                break
+            status = data.get('status')
+            if status == 'INVALID_REQUEST' and 'pagetoken' in params and retries < self.PAGE_TOKEN_RETRIES:
+                # Token not active yet
+                retries += 1
+                time.sleep(self.PAGE_TOKEN_DELAY)
+                continue
+            if status not in ('OK', 'ZERO_RESULTS'):
+                print(f"Restaurant search error: {status}")
+                break
+            page = data.get('results', [])
+            results.extend(page)
+            pages += 1
+            token = data.get('next_page_token')
+            if not token:
+                complete = self._is_complete(pages, page, token)
+                break
+            if pages >= max_pages:
+                # More pages exist but were not asked for: no need to wait for the token
+                break
+            params = {'pagetoken': token, 'key': self.api_key}
+            retries = 0
+            time.sleep(self.PAGE_TOKEN_DELAY)
+        if pages:
+            self._add_to_index(latitude, longitude, radius, food_type, results, complete)
+        return results
+
+    def harvest_restaurants(self, latitude, longitude, keywords=(None,), radii=(5000,), max_pages=3,
+                            max_results=None):
+        """
+        Candidate pool from several Nearby Search queries (every keyword x
+        radius, all pages), run concurrently and merged in query order with
+        duplicate place_ids dropped.
+        """
+        queries = []
+        for keyword in keywords or (None,):
+            # rankby=distance queries take no radius: one per keyword is enough
+            for radius in (radii if keyword else radii[:1]) or (5000,):
+                if (keyword, radius) not in queries:
+                    queries.append((keyword, radius))
+
+        def run(query):
+            keyword, radius = query
+            return self.search_all_pages(latitude, longitude, radius=radius, food_type=keyword,
+                                         max_pages=max_pages)
+
+        workers = max(1, min(self.max_workers or 1, len(queries)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pages = list(executor.map(run, queries))
+        merged = []
+        seen = set()
+        for results in pages:
+            for item in results:
+                place_id = item.get('place_id')
+                if place_id in seen:
+                    continue
+                if place_id is not None:
+                    seen.add(place_id)
+                merged.append(item)
+        return merged[:max_results] if max_results else merged
+
+    def get_restaurant_details(self, place_id, language='en', use_cache=True):
         """Get all details about a restaurant using its place_id."""
-        url = "https://maps.googleapis.com/maps/api/place/details/json"
-        params = {'place_id': place_id, 'key': self.api_key, 'language': 'en'}
+        if use_cache:
+            cached = self.get_cached_details(place_id, language)
+            if cached is not None:
+                return cached
+        url = f"{self.BASE_URL}/place/details/json"
+        params = {'place_id': place_id, 'key': self.api_key, 'language': language}
         try:
-            resp = requests.get(url, params=params)
+            resp = self.http.get(url, params=params)
             resp.raise_for_status()
             data = resp.json()
             if data['status'] == 'OK':
+                self.cache_details(place_id, data['result'], language)
                 return data['result']
             print(f"Details error: {data['status']}")
             return None
@@ -85,25 +272,77 @@ class RestaurantSelection:
             print(f"Details request error: {e}")
             return None
 
-    def get_all_restaurant_details(self, restaurants):
+    @staticmethod
+    def _details_key(place_id, language, field_set):
+        return f"details:{language}:{place_id}:{field_set}"
+
+    def get_cached_details(self, place_id, language='en'):
+        """
+        Rebuild the desired fields of a place from the cache.
+        Returns None unless every field set is cached and fresh.
+        """
+        if self.details_cache is None:
+            return None
+        details = {}
+        for field_set in self.DETAILS_FIELD_SETS:
+            part = self.details_cache.get(self._details_key(place_id, language, field_set))
+            if part is None:
+                return None
+            details.update(part)
+        return details
+
+    def cache_details(self, place_id, details, language='en'):
+        """Store each field set of a Place Details result with its own TTL."""
+        if self.details_cache is None:
+            return
+        for field_set, fields in self.DETAILS_FIELD_SETS.items():
+            part = {field: details.get(field) for field in fields if field in details}
+            self.details_cache.set(
+                self._details_key(place_id, language, field_set),
+                part,
+                ttl=self.DETAILS_TTL.get(field_set),
+            )
+
+    def get_all_restaurant_details(self, restaurants, max_workers=None, with_place_id=False, use_cache=True):
         """
         For a list of search results, fetch detailed info for each.
-        Only the desired fields are retained in the output.
+        Places with fresh cached details are served from the cache (unless
+        use_cache=False); the rest are requested concurrently on up to
+        `max_workers` threads (defaults to self.max_workers). The output keeps
+        the order of the search results and only the desired fields are
+        retained, plus 'place_id' when with_place_id=True. Each place is
+        returned as a Restaurant record, built once here.
         """
         desired_fields = [
-            'name', 'formatted_address', 'formatted_phone_number', 'website',
-            'opening_hours', 'current_opening_hours', 'rating', 'user_ratings_total',
-            'reviews', 'price_level', 'wheelchair_accessible_entrance', 'delivery',
-            'dine_in', 'takeout', 'reservable'
+            field for fields in self.DETAILS_FIELD_SETS.values() for field in fields
         ]
+        restaurants = [rest for rest in restaurants if rest.get('place_id')]
+        place_ids = [rest['place_id'] for rest in restaurants]
+        if use_cache:
+            all_details = [self.get_cached_details(place_id) for place_id in place_ids]
+        else:
+            all_details = [None] * len(place_ids)
+        cold = [i for i, details in enumerate(all_details) if details is None]
+        fetch = partial(self.get_restaurant_details, use_cache=False)
+        workers = min(max_workers or self.max_workers or 1, len(cold))
+        if workers <= 1:
+            fetched = [fetch(place_ids[i]) for i in cold]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # map() yields results in submission order, not completion order
+                fetched = list(executor.map(fetch, [place_ids[i] for i in cold]))
+        for i, details in zip(cold, fetched):
+            all_details[i] = details
         details_list = []
-        for rest in restaurants:
-            place_id = rest.get('place_id')
-            if place_id:
-                details = self.get_restaurant_details(place_id)
-                if details:
-                    filtered = {field: details.get(field) for field in desired_fields if field in details}
-                    details_list.append(filtered)
+        for rest, details in zip(restaurants, all_details):
+            if details:
+                filtered = {field: details.get(field) for field in desired_fields if field in details}
+                # Search results already carry the location; reuse it downstream
+                if 'geometry' not in filtered and 'geometry' in rest:
+                    filtered['geometry'] = rest['geometry']
+                if with_place_id:
+                    filtered['place_id'] = rest['place_id']
+                details_list.append(Restaurant.from_dict(filtered))
         return details_list
 
     def save_details_to_json(self, details, filename):
@@ -116,22 +355,35 @@ class RestaurantSelection:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename_with_time = f"{base}_{timestamp}{ext}"
             with open(filename_with_time, "w", encoding="utf-8") as f:
-                json.dump(details, f, ensure_ascii=False, indent=2)
+                json.dump(details, f, ensure_ascii=False, indent=2, default=to_jsonable)
             print(f"\nDetails successfully saved to {filename_with_time}")
             return filename_with_time
         except Exception as e:
             print(f"Error saving file: {e}")
             return None
 
-    def fetch_and_save(self, address, food_type=None, out_file="restaurants.json"):
+    def fetch(self, address, food_type=None, keywords=None, radii=None, max_pages=1, max_results=None):
         """
-        High-level method: geocode address, search for restaurants,
-        get details, and save to file in one go.
+        Geocode the address, search for restaurants and return their details.
+        Extra `keywords`, several `radii` or max_pages > 1 switch to
+        harvest_restaurants for a larger candidate pool.
         """
         lat, lng = self.get_coordinates(address)
         if lat is None or lng is None:
             raise Exception("Could not geocode the address.")
-        found = self.search_restaurants(lat, lng, food_type=food_type)
-        detailed = self.get_all_restaurant_details(found)
+        if keywords or radii or max_pages > 1:
+            queries = [food_type or None] + [k for k in keywords or () if k != food_type]
+            found = self.harvest_restaurants(lat, lng, keywords=queries, radii=radii or (5000,),
+                                             max_pages=max_pages, max_results=max_results)
+        else:
+            found = self.search_restaurants(lat, lng, food_type=food_type)
+        return self.get_all_restaurant_details(found)
+
+    def fetch_and_save(self, address, food_type=None, out_file="restaurants.json"):
+        """
+        High-level method: geocode address, search for restaurants,
+        get details, and save to file in one go.
+        """
+        detailed = self.fetch(address, food_type=food_type)
         saved_file = self.save_details_to_json(detailed, out_file)
         return detailed, saved_file
@@ -5,29 +5,169 @@ import urllib.parse
 import folium
 import webbrowser
 
+from .cache import MemoryCache
+from .geo import estimate_duration_s, haversine_m
+from .route_solver import solve_tour
+
+# Distance Matrix API limits per request
+MAX_MATRIX_ORIGINS = 25
+MAX_MATRIX_DESTINATIONS = 25
+MAX_MATRIX_ELEMENTS = 100
+
 class RouteOptimizer:
-    def __init__(self, api_key, mode="walking"):
+    def __init__(self, api_key, mode="walking", geocode_cache=None, use_directions=True,
+                 distance_cache=None, matrix_source="haversine"):
         self.gmaps = googlemaps.Client(key=api_key)
         self.mode = mode
+        # Optional GeocodeCache, usually shared with RestaurantSelection
+        self.geocode_cache = geocode_cache
+        # Stops are ordered locally; Directions only provides the street polyline
+        self.use_directions = use_directions
+        # Pairwise [distance_m, duration_s] from the Distance Matrix API, keyed by rounded coordinates and mode
+        self.distance_cache = distance_cache if distance_cache is not None else MemoryCache(max_entries=50000)
+        # "haversine" estimates missing pairs locally, "api" asks the Distance Matrix API
+        self.matrix_source = matrix_source
+        self.matrix_requests = 0
 
     def geocode(self, address):
+        if self.geocode_cache is not None:
+            cached = self.geocode_cache.get(address)
+            if cached is not None:
+                return cached
         results = self.gmaps.geocode(address)
         if not results:
             raise ValueError(f"Failed to geocode the address: {address}")
         loc = results[0]['geometry']['location']
+        if self.geocode_cache is not None:
+            self.geocode_cache.set(address, loc['lat'], loc['lng'])
         return loc['lat'], loc['lng']
 
-    def optimize_route(self, start, restaurants):
-        origin_coord = self.geocode(start)
-        coords = [self.geocode(p['address']) for p in restaurants]
-        waypoints = [f"{lat},{lng}" for lat, lng in coords]
+    @staticmethod
+    def known_location(restaurant):
+        """Coordinates already present in a restaurant dict, if any."""
+        location = restaurant.get('location')
+        if location:
+            return tuple(location)
+        loc = (restaurant.get('geometry') or {}).get('location')
+        if loc:
+            return loc['lat'], loc['lng']
+        return None
+
+    def _pair_key(self, a, b):
+        # ~1 m rounding; only Distance Matrix API values are stored under it
+        return f"api:{self.mode}:{a[0]:.5f},{a[1]:.5f}>{b[0]:.5f},{b[1]:.5f}"
+
+    def _estimate(self, a, b):
+        d = haversine_m(a[0], a[1], b[0], b[1])
+        return d, estimate_duration_s(d, self.mode)
+
+    def travel_matrix(self, points):
+        """
+        (distances_m, durations_s) matrices between (lat, lng) points.
+        With matrix_source="api" cached pairs are reused and only the missing
+        ones are fetched, in as few requests as possible. Estimates (the
+        "haversine" source, or pairs the API did not return) are cheaper to
+        recompute than to look up, so they are never cached; a failed request
+        therefore never hides real walking times behind estimates.
+        """
+        n = len(points)
+        distances = [[0.0] * n for _ in range(n)]
+        durations = [[0.0] * n for _ in range(n)]
+        missing = []
+        for i in range(n):
+            for j in range(n):
+                if i == j or points[i] == points[j]:
+                    continue
+                if self.matrix_source != "api":
+                    distances[i][j], durations[i][j] = self._estimate(points[i], points[j])
+                    continue
+                cached = self.distance_cache.get(self._pair_key(points[i], points[j]))
+                if cached is None:
+                    missing.append((i, j))
+                else:
+                    distances[i][j], durations[i][j] = cached
+        fetched = self._fetch_pairs(points, missing) if missing else {}
+        for i, j in missing:
+            pair = fetched.get((i, j))
+            if pair is None:
+                pair = self._estimate(points[i], points[j])
+            else:
+                self.distance_cache.set(self._pair_key(points[i], points[j]), list(pair))
+            distances[i][j], durations[i][j] = pair
+        return distances, durations
+
+    def _fetch_pairs(self, points, missing):
+        """Distance Matrix requests covering the missing (i, j) pairs, within API limits."""
+        origins = sorted({i for i, _ in missing})
+        destinations = sorted({j for _, j in missing})
+        wanted = set(missing)
+        dest_step = min(MAX_MATRIX_DESTINATIONS, MAX_MATRIX_ELEMENTS, len(destinations))
+        origin_step = max(1, min(MAX_MATRIX_ORIGINS, MAX_MATRIX_ELEMENTS // dest_step))
+        fetched = {}
+        for d0 in range(0, len(destinations), dest_step):
+            dest_block = destinations[d0:d0 + dest_step]
+            for o0 in range(0, len(origins), origin_step):
+                origin_block = origins[o0:o0 + origin_step]
+                if not any((i, j) in wanted for i in origin_block for j in dest_block):
+                    continue
+                try:
+                    result = self.gmaps.distance_matrix(
+                        origins=[points[i] for i in origin_block],
+                        destinations=[points[j] for j in dest_block],
+                        mode=self.mode
+                    )
+                    self.matrix_requests += 1
+                except Exception as e:
+                    print(f"Distance Matrix request error: {e}")
+                    continue
+                for i, row in zip(origin_block, result.get('rows', [])):
+                    for j, element in zip(dest_block, row.get('elements', [])):
+                        if i != j and element.get('status') == 'OK':
+                            fetched[(i, j)] = (element['distance']['value'], element['duration']['value'])
+                            if (i, j) not in wanted:
+                                # Free extra pair from the block: keep it for next time
+                                self.distance_cache.set(self._pair_key(points[i], points[j]), list(fetched[(i, j)]))
+        return fetched
+
+    def matrix_stats(self):
+        stats = self.distance_cache.stats.as_dict()
+        stats["api_requests"] = self.matrix_requests
+        return stats
+
+    def optimize_order(self, origin_coord, coords):
+        """Visiting order (indices into coords) of the quickest round trip from origin_coord."""
+        _, durations = self.travel_matrix([tuple(origin_coord)] + [tuple(c) for c in coords])
+        tour = solve_tour(durations)
+        return [i - 1 for i in tour[1:]]
+
+    def optimize_route(self, start, restaurants, origin_coord=None, with_polyline=None, with_order=False):
+        """
+        Order the restaurants into a round trip from `start`.
+        Pass `origin_coord` when the start is already geocoded; restaurants
+        carrying a 'location' (or Places 'geometry') are not geocoded again.
+        The order is solved locally; the Directions API is only called for
+        the street polyline (with_polyline, defaults to use_directions),
+        otherwise route_coords joins the stops with straight segments.
+        Returns (origin_coord, coords in input order, route_coords), plus the
+        solved visiting order (indices into restaurants) with with_order=True.
+        """
+        if origin_coord is None:
+            origin_coord = self.geocode(start)
+        coords = [self.known_location(p) or self.geocode(p['address']) for p in restaurants]
+        order = self.optimize_order(origin_coord, coords)
+        ordered = [coords[i] for i in order]
+        if with_polyline is None:
+            with_polyline = self.use_directions
+        if not with_polyline or not ordered:
+            route_coords = [origin_coord] + ordered + [origin_coord]
+            return (origin_coord, coords, route_coords, order) if with_order else (origin_coord, coords, route_coords)
 
         directions_result = self.gmaps.directions(
             origin=origin_coord,
             destination=origin_coord,
             mode=self.mode,
-            waypoints=waypoints,
-            optimize_waypoints=True,
+            waypoints=[f"{lat},{lng}" for lat, lng in ordered],
+            optimize_waypoints=False,
             departure_time=datetime.now()
         )
         if not directions_result:
@@ -37,7 +177,7 @@ class RouteOptimizer:
         overview = directions_result[0]['overview_polyline']['points']
         decoded = convert.decode_polyline(overview)
         route_coords = [(p['lat'], p['lng']) for p in decoded]
-        return origin_coord, coords, route_coords
+        return (origin_coord, coords, route_coords, order) if with_order else (origin_coord, coords, route_coords)
 
     def plot_route(self, origin_coord, coords, restaurants, route_coords, html_file="optimal_route.html"):
         m = folium.Map(location=origin_coord, zoom_start=14)
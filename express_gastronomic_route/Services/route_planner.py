@@ -0,0 +1,170 @@
+import os
+import uuid
+from datetime import datetime
+
+from .RestaurantInfoTop import TopRestaurantsExtractor
+from .cache import normalize_address
+from .pdf_worker import render_pdf_document
+from .pipeline import Pipeline
+from .scoring import STRATEGIES
+
+
+class RoutePlanner:
+    """
+    Builds the "search restaurants and plan route" flow as a Pipeline.
+
+    Stage graph:
+        restaurants -> top -> descriptions -+
+                           \\-> route -------+-> pdf
+        weather ----------------------------+
+    """
+
+    def __init__(self, selector, optimizer, weather, llm, pdf_dir=".", max_workers=4,
+                 llm_batched=False, stream_descriptions=True, sink=None, search_options=None, save_pdf=False,
+                 pdf_pool=None):
+        self.selector = selector
+        self.optimizer = optimizer
+        self.weather = weather
+        self.llm = llm
+        self.pdf_dir = pdf_dir
+        self.max_workers = max_workers
+        # Ask for all descriptions in a single completion instead of one each
+        self.llm_batched = llm_batched
+        # Stream partial descriptions to the caller as they are generated
+        self.stream_descriptions = stream_descriptions
+        # Optional JsonlSink that keeps a background copy of every search
+        self.sink = sink
+        # Extra RestaurantSelection.fetch arguments (keywords, radii, max_pages)
+        self.search_options = search_options or {}
+        # Also keep a copy of every PDF in pdf_dir
+        self.save_pdf = save_pdf
+        # Optional PdfWorkerPool; the pdf stage then returns a PdfJob instead of bytes
+        self.pdf_pool = pdf_pool
+
+    @staticmethod
+    def plan_key(address, city, start_date, end_date, food_type=None, strategy="popularity", open_on_best_day=False):
+        """
+        Hashable key of everything a route plan depends on, so identical
+        requests (up to case, accents and spacing) can share one stored plan.
+        """
+        return (
+            normalize_address(address),
+            normalize_address(city),
+            start_date,
+            end_date,
+            normalize_address(food_type) if food_type else None,
+            strategy if isinstance(strategy, str) else strategy.name,
+            bool(open_on_best_day),
+        )
+
+    def build_pipeline(self, address, city, start_date, end_date, food_type=None, n=3, strategy="popularity",
+                       open_on_best_day=False):
+        """
+        start_date/end_date are 'DD/MM/YYYY' strings; `strategy` is a
+        ScoringStrategy or a key of scoring.STRATEGIES. With open_on_best_day
+        the ranking waits for the weather stage and drops restaurants closed
+        on the best weather day.
+        """
+        if isinstance(strategy, str):
+            strategy = STRATEGIES[strategy]
+        pipeline = Pipeline(max_workers=self.max_workers)
+
+        def restaurants():
+            restaurant_list = self.selector.fetch(address=address, food_type=food_type or None, **self.search_options)
+            if self.sink is not None:
+                self.sink.submit({
+                    "saved_at": datetime.now().isoformat(timespec="seconds"),
+                    "address": address,
+                    "food_type": food_type,
+                    "restaurants": restaurant_list,
+                })
+            return {"count": len(restaurant_list), "restaurants": restaurant_list}
+
+        def top(restaurants, weather=None):
+            lista = restaurants["restaurants"]
+            # Served from the geocode cache filled by fetch
+            origin = self.selector.get_coordinates(address)
+            extractor = TopRestaurantsExtractor(
+                lista,
+                strategy=strategy,
+                origin=origin if None not in origin else None,
+                food_type=food_type,
+            )
+            best_day = (weather or {}).get("best_day")
+            open_on = best_day["day"] if best_day else None
+            return extractor.get_top_3(n=n, open_on=open_on)
+
+        def descriptions(top, progress):
+            # Partial descriptions are reported as (index, text)
+            on_update = (lambda idx, text: progress((idx, text))) if self.stream_descriptions else None
+            return self.describe_restaurants(top, on_update=on_update)
+
+        def route(top):
+            # Served from the geocode cache filled by fetch
+            origin_coord = self.selector.get_coordinates(address)
+            origin_coord, coords, route_coords, order = self.optimizer.optimize_route(
+                start=address,
+                restaurants=top,
+                origin_coord=origin_coord if None not in origin_coord else None,
+                with_order=True,
+            )
+            # Link the stops in the solved visiting order
+            maps_url = self.optimizer.get_google_maps_url(address, [top[i] for i in order])
+            return {
+                "order": order,
+                "origin_coord": origin_coord,
+                "coords": coords,
+                "route_coords": route_coords,
+                "maps_url": maps_url,
+            }
+
+        def weather():
+            forecast = self.weather.get_weather_forecast(city)
+            return {"forecast": forecast, **self.weather.plan_window(forecast, start_date, end_date)}
+
+        def pdf(top, descriptions, route, weather):
+            return self.render_pdf(city, top, route["maps_url"], weather)
+
+        pipeline.add_stage("restaurants", restaurants)
+        pipeline.add_stage("top", top, deps=["restaurants", "weather"] if open_on_best_day else ["restaurants"])
+        pipeline.add_stage("descriptions", descriptions, deps=["top"], progress=True)
+        pipeline.add_stage("route", route, deps=["top"])
+        pipeline.add_stage("weather", weather)
+        pipeline.add_stage("pdf", pdf, deps=["top", "descriptions", "route", "weather"])
+        return pipeline
+
+    def describe_restaurants(self, top, on_update=None):
+        """Ask the LLM for a description of each restaurant (stored as 'llm_description')."""
+        for rest in top:
+            rest['best_day'] = None
+        descriptions = self.llm.describe_restaurants(top, batched=self.llm_batched, on_update=on_update)
+        for rest, descripcion in zip(top, descriptions):
+            rest["llm_description"] = descripcion
+        return descriptions
+
+    def render_pdf(self, city, top, maps_url, weather):
+        """
+        Render the PDF in memory; a copy is written to pdf_dir only with save_pdf=True.
+        With a pdf_pool the result holds a PdfJob under "job" instead of the bytes
+        under "data", unless the pool is full and the PDF is rendered here.
+        """
+        file_name = f"gastronomic_route_{city.replace(' ', '_')}.pdf"
+        path = None
+        if self.save_pdf:
+            # Unique per request so concurrent users never share a file
+            stamp = f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}"
+            path = os.path.join(self.pdf_dir, f"gastronomic_route_{city.replace(' ', '_')}_{stamp}.pdf")
+        job = {
+            "restaurants": top,
+            "forecast": weather["temperature_range"],
+            "best_day": weather["best_day"],
+            "city": city,
+            "maps_url": maps_url,
+            "title": f"Gastronomic Route: {city}",
+            "path": path,
+        }
+        if self.pdf_pool is not None:
+            handle = self.pdf_pool.submit(file_name=file_name, **job)
+            if handle is not None:
+                return {"file_name": file_name, "job": handle}
+        return {"file_name": file_name, "data": render_pdf_document(**job)}
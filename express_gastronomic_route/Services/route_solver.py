@@ -0,0 +1,131 @@
+from .geo import haversine_m
+
+# Largest number of stops (excluding the start) solved exactly with Held-Karp
+HELD_KARP_MAX_STOPS = 10
+
+
+def distance_matrix(points):
+    """Pairwise haversine distances (meters) between (lat, lng) points."""
+    n = len(points)
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            d = haversine_m(points[i][0], points[i][1], points[j][0], points[j][1])
+            matrix[i][j] = matrix[j][i] = d
+    return matrix
+
+
+def tour_length(matrix, tour):
+    """Cost of the closed tour (returns to tour[0])."""
+    return sum(matrix[a][b] for a, b in zip(tour, tour[1:] + tour[:1]))
+
+
+def held_karp(matrix):
+    """
+    Exact round trip from node 0 through every other node (Held-Karp DP,
+    O(n^2 2^n)). Returns the visiting order starting with 0.
+    """
+    n = len(matrix) - 1
+    if n <= 0:
+        return [0]
+    inf = float("inf")
+    size = 1 << n
+    cost = [[inf] * n for _ in range(size)]
+    parent = [[-1] * n for _ in range(size)]
+    for j in range(n):
+        cost[1 << j][j] = matrix[0][j + 1]
+    for mask in range(1, size):
+        row = cost[mask]
+        for j in range(n):
+            current = row[j]
+            if current == inf or not mask & (1 << j):
+                continue
+            from_j = matrix[j + 1]
+            for k in range(n):
+                if mask & (1 << k):
+                    continue
+                nxt = mask | (1 << k)
+                candidate = current + from_j[k + 1]
+                if candidate < cost[nxt][k]:
+                    cost[nxt][k] = candidate
+                    parent[nxt][k] = j
+    full = size - 1
+    last = min(range(n), key=lambda j: cost[full][j] + matrix[j + 1][0])
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last + 1)
+        mask, last = mask ^ (1 << last), parent[mask][last]
+    return [0] + order[::-1]
+
+
+def nearest_neighbour(matrix):
+    """Greedy tour from node 0, always moving to the closest unvisited node."""
+    unvisited = set(range(1, len(matrix)))
+    tour = [0]
+    while unvisited:
+        here = matrix[tour[-1]]
+        nxt = min(unvisited, key=lambda j: (here[j], j))
+        unvisited.remove(nxt)
+        tour.append(nxt)
+    return tour
+
+
+def two_opt(matrix, tour):
+    """Reverse tour segments while that shortens the tour; node 0 stays first."""
+    best = list(tour)
+    best_len = tour_length(matrix, best)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(best) - 1):
+            for k in range(i + 1, len(best)):
+                candidate = best[:i] + best[i:k + 1][::-1] + best[k + 1:]
+                candidate_len = tour_length(matrix, candidate)
+                if candidate_len < best_len - 1e-9:
+                    best, best_len, improved = candidate, candidate_len, True
+    return best
+
+
+def or_opt(matrix, tour, max_segment=3):
+    """Move segments of up to `max_segment` nodes elsewhere while that helps."""
+    best = list(tour)
+    best_len = tour_length(matrix, best)
+    improved = True
+    while improved:
+        improved = False
+        for seg_len in range(1, max_segment + 1):
+            for i in range(1, len(best) - seg_len + 1):
+                segment = best[i:i + seg_len]
+                rest = best[:i] + best[i + seg_len:]
+                for j in range(1, len(rest) + 1):
+                    if j == i:
+                        continue
+                    for piece in (segment, segment[::-1]):
+                        candidate = rest[:j] + piece + rest[j:]
+                        candidate_len = tour_length(matrix, candidate)
+                        if candidate_len < best_len - 1e-9:
+                            best, best_len, improved = candidate, candidate_len, True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return best
+
+
+def solve_tour(matrix, exact_limit=HELD_KARP_MAX_STOPS):
+    """
+    Round trip from node 0 through all nodes: exact for up to `exact_limit`
+    stops, nearest neighbour + 2-opt/Or-opt beyond that.
+    """
+    if len(matrix) - 1 <= exact_limit:
+        return held_karp(matrix)
+    tour = nearest_neighbour(matrix)
+    while True:
+        length = tour_length(matrix, tour)
+        tour = or_opt(matrix, two_opt(matrix, tour))
+        if tour_length(matrix, tour) >= length - 1e-9:
+            return tour
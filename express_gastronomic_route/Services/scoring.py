@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+
+from .geo import haversine_m_array
+from .models import Restaurant
+
+# Feature columns available to scoring strategies:
+#   popularity     rating * log10(user_ratings_total + 1)  (0 to ~25)
+#   rating         Google rating (1-5)
+#   proximity      1 / (1 + km from the start address)      (0-1)
+#   affordability  (4 - price_level) / 4                    (0-1)
+#   open_now       1 if open now, else 0
+#   food_match     1 if the food type appears in name or reviews
+#   wheelchair     1 if wheelchair accessible entrance
+FEATURES = (
+    "popularity", "rating", "proximity", "affordability", "open_now", "food_match", "wheelchair",
+)
+
+
+def popularity_scores(ratings, num_reviews):
+    """
+    rating * log10(num_reviews + 1) over float arrays, NaN where either is
+    missing. log10 uses math.log10 once per distinct count so the values are
+    bit-identical to TopRestaurantsExtractor.compute_score.
+    """
+    scores = np.full(len(ratings), np.nan)
+    valid = ~(np.isnan(ratings) | np.isnan(num_reviews))
+    if valid.any():
+        counts, inverse = np.unique(num_reviews[valid], return_inverse=True)
+        logs = np.array([math.log10(c + 1) for c in counts.tolist()])
+        scores[valid] = ratings[valid] * logs[inverse.reshape(-1)]
+    return scores
+
+
+def _flag(value):
+    if value is None:
+        return np.nan
+    return 1.0 if value else 0.0
+
+
+class FeatureTable:
+    """
+    Columnar features of a restaurant list, extracted once from the Places
+    dicts so any number of scoring strategies can run over NumPy arrays.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.size = len(next(iter(columns.values()))) if columns else 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def valid(self):
+        """Rows the ranking may return: rating and review count are known."""
+        return ~np.isnan(self.columns["popularity"])
+
+    @classmethod
+    def from_restaurants(cls, restaurants, origin=None, food_type=None):
+        """Features of Restaurant records (Places dicts are converted first)."""
+        ratings, totals, prices, lats, lngs = [], [], [], [], []
+        open_now, food_match, wheelchair = [], [], []
+        keyword = food_type.strip().lower() if food_type else None
+        for r in map(Restaurant.from_dict, restaurants):
+            ratings.append(r.rating)
+            totals.append(r.user_ratings_total)
+            prices.append(r.price_level)
+            lat, lng = r.location or (None, None)
+            lats.append(lat)
+            lngs.append(lng)
+            hours = r.current_opening_hours or r.opening_hours or {}
+            open_now.append(_flag(hours.get("open_now")))
+            wheelchair.append(_flag(r.wheelchair_accessible_entrance))
+            if keyword:
+                texts = [r.name or ""] + [rev.text or "" for rev in r.reviews]
+                food_match.append(1.0 if any(keyword in text.lower() for text in texts) else 0.0)
+            else:
+                food_match.append(np.nan)
+
+        ratings = np.array(ratings, dtype=float)
+        prices = np.array(prices, dtype=float)
+        if origin is not None and len(lats):
+            distance_km = haversine_m_array(
+                np.array(lats, dtype=float), np.array(lngs, dtype=float), origin[0], origin[1]
+            ) / 1000
+        else:
+            distance_km = np.full(len(ratings), np.nan)
+        return cls({
+            "popularity": popularity_scores(ratings, np.array(totals, dtype=float)),
+            "rating": ratings,
+            "proximity": 1 / (1 + distance_km),
+            "affordability": (4 - prices) / 4,
+            "open_now": np.array(open_now, dtype=float),
+            "food_match": np.array(food_match, dtype=float),
+            "wheelchair": np.array(wheelchair, dtype=float),
+        })
+
+
+class ScoringStrategy:
+    """
+    Weighted sum of FeatureTable columns. Missing feature values count as
+    `fill`; rows without rating or review count are never ranked.
+    """
+
+    def __init__(self, weights, fill=0.0, name=None):
+        unknown = set(weights) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown scoring features: {sorted(unknown)}")
+        self.weights = dict(weights)
+        self.fill = fill
+        self.name = name or "+".join(f"{w:g}*{f}" for f, w in self.weights.items())
+
+    def score(self, table):
+        """Scores for every row; invalid rows get -1."""
+        total = np.zeros(len(table))
+        for feature, weight in self.weights.items():
+            if weight:
+                total += weight * np.nan_to_num(table[feature], nan=self.fill)
+        return np.where(table.valid, total, -1.0)
+
+
+DEFAULT_STRATEGY = ScoringStrategy({"popularity": 1.0}, name="popularity")
+
+STRATEGIES = {
+    "popularity": DEFAULT_STRATEGY,
+    "nearby": ScoringStrategy({"popularity": 1.0, "proximity": 10.0}, name="nearby"),
+    "budget": ScoringStrategy({"popularity": 1.0, "affordability": 8.0}, name="budget"),
+    "open now": ScoringStrategy({"popularity": 1.0, "open_now": 8.0}, name="open now"),
+    "food type": ScoringStrategy({"popularity": 1.0, "food_match": 8.0}, name="food type"),
+    "accessible": ScoringStrategy({"popularity": 1.0, "wheelchair": 8.0}, name="accessible"),
+}
@@ -0,0 +1,271 @@
+"""
+Offline city snapshots.
+
+A snapshot is a directory `<root>/<city>/<version>/` holding:
+    manifest.json   city, start address, build time, column index
+    details.jsonl   one compact Places details record per line
+    *.npy           columns (coordinates, fetch times, details line offsets)
+
+Columns are plain .npy files, loaded with mmap so opening a snapshot only
+maps them; details are parsed one line at a time on demand. Only the
+columns the nearest-place lookup and refresh need are stored: scores,
+opening hours and distances are computed by the planner for the few
+candidates it ranks. The manifest is written last, so a directory
+without one is an unfinished build.
+
+    python -m express_gastronomic_route.Services.snapshot build "Málaga" --address "Calle Larios"
+    python -m express_gastronomic_route.Services.snapshot refresh "Málaga" --max-age-days 7
+"""
+import argparse
+import json
+import mmap
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from .cache import normalize_address
+from .geo import haversine_m_array
+from .models import Restaurant
+from .persistence import dumps_line
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+DETAILS = "details.jsonl"
+
+
+def city_slug(city):
+    return normalize_address(city).replace(" ", "_")
+
+
+def _location(record):
+    loc = (record.get("geometry") or {}).get("location") or {}
+    return loc.get("lat", np.nan), loc.get("lng", np.nan)
+
+
+def build_columns(details, fetched_at):
+    """Columnar arrays for a list of details records (same order)."""
+    locations = [_location(r) for r in details]
+    return {
+        "lat": np.array([lat for lat, _ in locations], dtype=float),
+        "lng": np.array([lng for _, lng in locations], dtype=float),
+        "fetched_at": np.array(fetched_at, dtype=float),
+    }
+
+
+def write_snapshot(root, city, address, origin, details, fetched_at=None):
+    """Write a new snapshot version and return its directory."""
+    now = time.time()
+    if fetched_at is None:
+        fetched_at = [now] * len(details)
+    version = datetime.fromtimestamp(now).strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(root, city_slug(city), version)
+    os.makedirs(path)
+    offsets = [0]
+    with open(os.path.join(path, DETAILS), "wb") as f:
+        for record in details:
+            f.write(dumps_line(record))
+            offsets.append(f.tell())
+    columns = build_columns(details, fetched_at)
+    columns["details_offsets"] = np.array(offsets, dtype=np.int64)
+    index = {}
+    for name, values in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), values)
+        index[name] = {"file": f"{name}.npy", "dtype": str(values.dtype), "shape": list(values.shape)}
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "city": city,
+        "address": address,
+        "origin": list(origin) if origin else None,
+        "created_at": now,
+        "count": len(details),
+        "columns": index,
+        "details": DETAILS,
+    }
+    with open(os.path.join(path, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return path
+
+
+class CitySnapshot:
+    """Read-only view of one snapshot version."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {self.manifest.get('format_version')}")
+        self.columns = {
+            name: np.load(os.path.join(path, meta["file"]), mmap_mode="r")
+            for name, meta in self.manifest["columns"].items()
+        }
+        self._details_file = open(os.path.join(path, self.manifest["details"]), "rb")
+        size = os.fstat(self._details_file.fileno()).st_size
+        self._details = mmap.mmap(self._details_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    @classmethod
+    def latest(cls, root, city):
+        """Newest complete snapshot of a city, or None."""
+        city_dir = os.path.join(root, city_slug(city))
+        if not os.path.isdir(city_dir):
+            return None
+        for version in sorted(os.listdir(city_dir), reverse=True):
+            if os.path.exists(os.path.join(city_dir, version, MANIFEST)):
+                return cls(os.path.join(city_dir, version))
+        return None
+
+    def __len__(self):
+        return self.manifest["count"]
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def city(self):
+        return self.manifest["city"]
+
+    @property
+    def address(self):
+        return self.manifest["address"]
+
+    @property
+    def origin(self):
+        origin = self.manifest.get("origin")
+        return tuple(origin) if origin else None
+
+    def restaurant(self, i):
+        """Details record of place i, parsed from its line."""
+        offsets = self.columns["details_offsets"]
+        return json.loads(self._details[int(offsets[i]):int(offsets[i + 1])])
+
+    def restaurants(self, indices=None):
+        indices = range(len(self)) if indices is None else indices
+        return [self.restaurant(i) for i in indices]
+
+    def nearest(self, lat, lng, k):
+        """Indices of the k places closest to (lat, lng), nearest first."""
+        if not len(self):
+            return []
+        distances = haversine_m_array(self.columns["lat"], self.columns["lng"], lat, lng)
+        distances = np.where(np.isnan(distances), np.inf, distances)
+        k = min(k, len(distances))
+        candidates = np.argpartition(distances, k - 1)[:k]
+        return candidates[np.lexsort((candidates, distances[candidates]))].tolist()
+
+    def stale(self, max_age, now=None):
+        """Indices of places whose details are older than max_age seconds."""
+        now = time.time() if now is None else now
+        return np.flatnonzero(now - np.asarray(self.columns["fetched_at"]) > max_age).tolist()
+
+    def close(self):
+        if not isinstance(self._details, bytes):
+            self._details.close()
+        self._details_file.close()
+
+
+class SnapshotSelector:
+    """
+    Stand-in for RestaurantSelection in RoutePlanner that answers fetch()
+    from a CitySnapshot. Addresses other than the snapshot's start address
+    are geocoded with `geocoder` (usually the live RestaurantSelection).
+    """
+
+    def __init__(self, snapshot, geocoder=None, max_results=60):
+        self.snapshot = snapshot
+        self.geocoder = geocoder
+        self.max_results = max_results
+
+    def get_coordinates(self, address):
+        if self.snapshot.origin and normalize_address(address) == normalize_address(self.snapshot.address or ""):
+            return self.snapshot.origin
+        if self.geocoder is not None:
+            return self.geocoder.get_coordinates(address)
+        return None, None
+
+    def fetch(self, address, food_type=None, **search_options):
+        """Restaurant records of the snapshot places nearest to the address."""
+        lat, lng = self.get_coordinates(address)
+        if lat is None or lng is None:
+            raise Exception("Could not geocode the address.")
+        # Scan a wider neighbourhood when filtering by food type
+        limit = self.max_results * (4 if food_type else 1)
+        found = [Restaurant.from_dict({k: v for k, v in r.items() if k != "place_id"})
+                 for r in self.snapshot.restaurants(self.snapshot.nearest(lat, lng, limit))]
+        if food_type:
+            keyword = food_type.strip().lower()
+            found = [
+                r for r in found
+                if any(keyword in (text or "").lower() for text in [r.name] + [rev.text for rev in r.reviews])
+            ]
+        return found[:self.max_results]
+
+
+def build_snapshot(selector, city, address, root, keywords=None, radii=None, max_pages=3):
+    """Harvest a city's restaurants through `selector` and write a snapshot."""
+    lat, lng = selector.get_coordinates(address)
+    if lat is None or lng is None:
+        raise Exception("Could not geocode the address.")
+    found = selector.harvest_restaurants(lat, lng, keywords=[None] + list(keywords or []),
+                                         radii=radii or (5000,), max_pages=max_pages)
+    details = selector.get_all_restaurant_details(found, with_place_id=True)
+    return write_snapshot(root, city, address, (lat, lng), details)
+
+
+def refresh_snapshot(selector, snapshot, root, max_age, now=None):
+    """
+    Write a new version where only places older than max_age seconds are
+    fetched again; fresh places are copied over as they are.
+    """
+    now = time.time() if now is None else now
+    stale = snapshot.stale(max_age, now)
+    details = snapshot.restaurants()
+    fetched_at = np.array(snapshot["fetched_at"], dtype=float)
+    if stale:
+        refreshed = selector.get_all_restaurant_details(
+            [{"place_id": details[i]["place_id"], "geometry": details[i].get("geometry")} for i in stale],
+            with_place_id=True, use_cache=False,
+        )
+        by_id = {record["place_id"]: record for record in refreshed}
+        for i in stale:
+            record = by_id.get(details[i]["place_id"])
+            if record is not None:
+                details[i] = record
+                fetched_at[i] = now
+    return write_snapshot(root, snapshot.city, snapshot.address, snapshot.origin, details, fetched_at.tolist())
+
+
+def main(argv=None):
+    from .restaurant_selection import RestaurantSelection
+
+    parser = argparse.ArgumentParser(description="Build or refresh offline city snapshots.")
+    parser.add_argument("command", choices=["build", "refresh", "info"])
+    parser.add_argument("city")
+    parser.add_argument("--address", help="Start address (build only, defaults to the city)")
+    parser.add_argument("--root", default=os.getenv("SNAPSHOT_DIR", "snapshots"))
+    parser.add_argument("--keywords", nargs="*", default=[])
+    parser.add_argument("--radii", nargs="*", type=int, default=[5000])
+    parser.add_argument("--max-pages", type=int, default=3)
+    parser.add_argument("--max-age-days", type=float, default=7)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        path = build_snapshot(RestaurantSelection(), args.city, args.address or args.city, args.root,
+                              keywords=args.keywords, radii=args.radii, max_pages=args.max_pages)
+        print(f"Snapshot written to {path}")
+        return
+    snapshot = CitySnapshot.latest(args.root, args.city)
+    if snapshot is None:
+        print(f"No snapshot for {args.city} in {args.root}")
+        return
+    if args.command == "info":
+        stale = snapshot.stale(args.max_age_days * 24 * 3600)
+        print(f"{snapshot.path}: {len(snapshot)} places, {len(stale)} older than {args.max_age_days:g} days")
+        return
+    path = refresh_snapshot(RestaurantSelection(), snapshot, args.root, args.max_age_days * 24 * 3600)
+    print(f"Snapshot written to {path}")
+
+
+if __name__ == "__main__":
+    main()
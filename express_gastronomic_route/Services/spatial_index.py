@@ -0,0 +1,206 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from .geo import EARTH_RADIUS_M, haversine_m
+
+# Metres per degree of latitude
+METERS_PER_DEG = math.pi * EARTH_RADIUS_M / 180
+
+
+def result_location(item):
+    loc = (item.get("geometry") or {}).get("location") or {}
+    if loc.get("lat") is None or loc.get("lng") is None:
+        return None
+    return loc["lat"], loc["lng"]
+
+
+class SpatialIndex:
+    """
+    In-process index of Nearby Search results on a lat/lng grid.
+
+    Results are bucketed into cells of `cell_deg` degrees and remembered
+    with the keyword of the query that returned them (None for the plain
+    rankby=distance search). Each live query also records the circle it
+    fully covered, so later queries inside a covered circle can be answered
+    without calling the API.
+
+    Places and circles expire after `ttl` seconds, so closed or new places
+    are picked up by a live search again. Beyond `max_places` the places
+    indexed longest ago are dropped, together with every circle that may
+    have relied on them.
+    """
+
+    def __init__(self, cell_deg=0.01, ttl=None, max_places=None):
+        self.cell_deg = cell_deg
+        self.ttl = ttl
+        self.max_places = max_places
+        self._cells = {}
+        # place_id -> (item, location, generation, added_at), oldest first
+        self._places = OrderedDict()
+        self._keywords = {}
+        # keyword -> [(lat, lng, radius_m, generation, added_at)]
+        self._coverage = {}
+        # Every add() is one generation; circles of a generation rely on its places
+        self._generation = 0
+        self._evicted_generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._places)
+
+    def _cell(self, lat, lng):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lng / self.cell_deg))
+
+    @staticmethod
+    def _keyword(keyword):
+        return keyword.strip().lower() if keyword else None
+
+    def _expired(self, added_at, now):
+        return self.ttl is not None and now - added_at >= self.ttl
+
+    def _remove(self, place_id):
+        item, location, generation, _ = self._places.pop(place_id)
+        self._cells[self._cell(*location)].discard(place_id)
+        self._keywords.pop(place_id, None)
+        return generation
+
+    def _prune(self, now):
+        """Drop expired places, then the oldest beyond max_places, and circles that relied on them."""
+        while self._places:
+            place_id, (_, _, _, added_at) = next(iter(self._places.items()))
+            if not self._expired(added_at, now) and (self.max_places is None or len(self._places) <= self.max_places):
+                break
+            generation = self._remove(place_id)
+            if not self._expired(added_at, now):
+                # Evicted while still fresh: newer circles may have counted on it
+                self._evicted_generation = max(self._evicted_generation, generation)
+        for keyword, circles in list(self._coverage.items()):
+            circles[:] = [c for c in circles if c[3] > self._evicted_generation and not self._expired(c[4], now)]
+            if not circles:
+                del self._coverage[keyword]
+
+    def add(self, results, keyword=None):
+        """Index search results (dicts with place_id and geometry)."""
+        keyword = self._keyword(keyword)
+        now = time.time()
+        with self._lock:
+            self._generation += 1
+            for item in results:
+                place_id = item.get("place_id")
+                location = result_location(item)
+                if place_id is None or location is None:
+                    continue
+                keywords = {keyword}
+                if place_id in self._places:
+                    if not self._expired(self._places[place_id][3], now):
+                        keywords |= self._keywords.get(place_id, set())
+                    self._remove(place_id)
+                self._places[place_id] = (item, location, self._generation, now)
+                self._cells.setdefault(self._cell(*location), set()).add(place_id)
+                self._keywords[place_id] = keywords
+            self._prune(now)
+
+    def mark_covered(self, lat, lng, radius_m, keyword=None):
+        """Record that every `keyword` result within radius_m of (lat, lng) is indexed."""
+        with self._lock:
+            if self._evicted_generation and self._generation <= self._evicted_generation:
+                # Part of the last results was already evicted
+                return
+            self._coverage.setdefault(self._keyword(keyword), []).append(
+                (lat, lng, radius_m, self._generation, time.time()))
+
+    def is_covered(self, lat, lng, radius_m, keyword=None):
+        """True when the query circle lies inside one live coverage circle."""
+        now = time.time()
+        with self._lock:
+            circles = [c for c in self._coverage.get(self._keyword(keyword), ()) if not self._expired(c[4], now)]
+        return any(haversine_m(lat, lng, clat, clng) + radius_m <= cradius for clat, clng, cradius, _, _ in circles)
+
+    def _matches(self, place_id, keyword, now):
+        if self._expired(self._places[place_id][3], now):
+            return False
+        return keyword is None or keyword in self._keywords.get(place_id, ())
+
+    def _ring(self, center, ring):
+        """Cells at Chebyshev distance `ring` from the center cell."""
+        ci, cj = center
+        if ring == 0:
+            yield center
+            return
+        for dj in range(-ring, ring + 1):
+            yield ci - ring, cj + dj
+            yield ci + ring, cj + dj
+        for di in range(-ring + 1, ring):
+            yield ci + di, cj - ring
+            yield ci + di, cj + ring
+
+    def _ring_lower_bound(self, lat, ring):
+        """Minimum distance (m) to any point in ring `ring` or beyond."""
+        if ring <= 1:
+            return 0.0
+        edge_lat = min(89.9, abs(lat) + ring * self.cell_deg)
+        cell_m = self.cell_deg * METERS_PER_DEG * math.cos(math.radians(edge_lat))
+        return (ring - 1) * cell_m
+
+    def within(self, lat, lng, radius_m, keyword=None):
+        """Indexed results within radius_m, nearest first, as (result, distance_m)."""
+        keyword = self._keyword(keyword)
+        dlat = radius_m / METERS_PER_DEG
+        dlng = radius_m / (METERS_PER_DEG * max(math.cos(math.radians(min(89.9, abs(lat) + dlat))), 1e-6))
+        i0, j0 = self._cell(lat - dlat, lng - dlng)
+        i1, j1 = self._cell(lat + dlat, lng + dlng)
+        found = []
+        now = time.time()
+        with self._lock:
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    for place_id in self._cells.get((i, j), ()):
+                        if not self._matches(place_id, keyword, now):
+                            continue
+                        item, (plat, plng), _, _ = self._places[place_id]
+                        distance = haversine_m(lat, lng, plat, plng)
+                        if distance <= radius_m:
+                            found.append((distance, place_id, item))
+        found.sort(key=lambda entry: (entry[0], entry[1]))
+        return [(item, distance) for distance, _, item in found]
+
+    def nearest(self, lat, lng, k, keyword=None, max_radius_m=None):
+        """The k nearest indexed results, as (result, distance_m), nearest first."""
+        keyword = self._keyword(keyword)
+        center = self._cell(lat, lng)
+        best = []
+        now = time.time()
+        with self._lock:
+            if not self._places:
+                return []
+            rows = [i for i, _ in self._cells]
+            cols = [j for _, j in self._cells]
+            max_ring = max(abs(center[0] - min(rows)), abs(center[0] - max(rows)),
+                           abs(center[1] - min(cols)), abs(center[1] - max(cols)))
+            for ring in range(max_ring + 1):
+                bound = self._ring_lower_bound(lat, ring)
+                if len(best) >= k and bound > best[k - 1][0]:
+                    break
+                if max_radius_m is not None and bound > max_radius_m:
+                    break
+                for cell in self._ring(center, ring):
+                    for place_id in self._cells.get(cell, ()):
+                        if not self._matches(place_id, keyword, now):
+                            continue
+                        item, (plat, plng), _, _ = self._places[place_id]
+                        distance = haversine_m(lat, lng, plat, plng)
+                        if max_radius_m is None or distance <= max_radius_m:
+                            best.append((distance, place_id, item))
+                best.sort(key=lambda entry: (entry[0], entry[1]))
+        return [(item, distance) for distance, _, item in best[:k]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "places": len(self._places),
+                "cells": sum(1 for ids in self._cells.values() if ids),
+                "coverage_circles": sum(len(circles) for circles in self._coverage.values()),
+                "generation": self._generation,
+            }
@@ -1,21 +1,76 @@
 import os
+import threading
+import time
+from concurrent.futures import Future
 from dotenv import load_dotenv
 import requests
 from datetime import datetime
 
+from .cache import MemoryCache, normalize_address
+from .http_client import get_http_client
+
 load_dotenv()
 
 api_key = os.getenv("API_WEATHER_KEY") 
 
+# OpenWeatherMap refreshes its forecasts about every 3 hours
+FORECAST_UPDATE_INTERVAL = 3 * 3600
+
+
+def next_update(now, interval=FORECAST_UPDATE_INTERVAL):
+    """Epoch of the next provider update after `now` (updates on UTC multiples of interval)."""
+    return (int(now // interval) + 1) * interval
+
+
+DATE_FORMAT = '%d/%m/%Y'
+
+
+def parse_date(text):
+    return datetime.strptime(text, DATE_FORMAT).date()
+
+
+def forecast_day(day):
+    """Date of a forecast entry; entries without 'day' are parsed from 'date'."""
+    parsed = day.get('day')
+    return parsed if parsed is not None else parse_date(day['date'])
+
+
+def parse_window(start_date, end_date):
+    """(start, end) dates from 'DD/MM/YYYY' strings, or None if malformed."""
+    try:
+        return parse_date(start_date), parse_date(end_date)
+    except ValueError:
+        print("Error: Invalid date format. Use 'DD/MM/YYYY'.")
+        return None
+
+
+def default_comfort(day):
+    """Least rain, then temperature closest to 25 ºC, then least wind."""
+    return day['rain_probability'], abs(day['temperature_avg'] - 25), day['wind_speed']
+
+
 class WeatherAPI:
-    def __init__(self, api_key):
+    def __init__(self, api_key, http=None, cache=None, update_interval=FORECAST_UPDATE_INTERVAL):
         self.api_key = api_key
+        # Pooled HTTP client with timeouts and retries
+        self.http = http or get_http_client("weather")
+        # Forecasts by city and day; entries expire at the next provider update
+        self.cache = cache if cache is not None else MemoryCache(max_entries=256)
+        self.update_interval = update_interval
+        # Forecast requests in progress, shared by concurrent callers
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    @staticmethod
+    def forecast_key(city, day=None):
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        return f"forecast:{normalize_address(city)}:{day}"
 
     def get_weather_info(self, city):
         url = "http://api.openweathermap.org/data/2.5/weather"
         params = {'q': city, 'appid': self.api_key, 'units': 'metric'}
         try:
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params)
             response.raise_for_status()
             data = response.json()
             return data
@@ -23,18 +78,52 @@ class WeatherAPI:
             print(f"Request error: {e}")
             return None
 
-    def get_weather_forecast(self, city):
+    def get_weather_forecast(self, city, use_cache=True):
+        """
+        Daily forecast for a city. Answers are cached until the provider's
+        next update, and concurrent calls for the same city share a single
+        request.
+        """
+        if not use_cache:
+            return self.fetch_weather_forecast(city)
+        key = self.forecast_key(city)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            forecast = self.fetch_weather_forecast(city)
+            if forecast is not None:
+                self.cache.set_entry(key, forecast, next_update(time.time(), self.update_interval))
+            future.set_result(forecast)
+            return forecast
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def fetch_weather_forecast(self, city):
         url = "http://api.openweathermap.org/data/2.5/forecast/daily"
         params = {'q': city, 'appid': self.api_key, 'cnt': 10, 'units': 'metric'}
         try:
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params)
             response.raise_for_status()
             data = response.json()
             forecast = []
             for day in data['list']:
-                date_corrected = datetime.fromtimestamp(day['dt']).strftime('%d/%m/%Y')
+                day_date = datetime.fromtimestamp(day['dt']).date()
                 day_forecast = {
-                    'date': date_corrected,
+                    # 'date' is for display; comparisons use the parsed 'day'
+                    'date': day_date.strftime('%d/%m/%Y'),
+                    'day': day_date,
                     'temperature_avg': day['temp']['day'],
                     'wind_speed': day['speed'],
                     'rain_probability': day.get('rain', 0)
@@ -46,49 +135,53 @@ class WeatherAPI:
             return None
 
     def get_best_day_to_go_out(self, forecast, start_date, end_date):
-        try:
-            start_timestamp = int(datetime.strptime(start_date, '%d/%m/%Y').timestamp())
-            end_timestamp = int(datetime.strptime(end_date, '%d/%m/%Y').timestamp())
-        except ValueError:
-            print("Error: Invalid date format. Use 'DD/MM/YYYY'.")
+        window = parse_window(start_date, end_date)
+        if window is None:
             return None
-
-        filtered_forecast = [
-            day for day in forecast
-            if start_timestamp <= int(datetime.strptime(day['date'], '%d/%m/%Y').timestamp()) <= end_timestamp
-        ]
-
-        if not filtered_forecast:
+        best = self._scan(forecast, *window, default_comfort)[1]
+        if best is None:
             print("No forecast data available for the provided date range.")
-            return None
+        return best
 
-        best_day = min(
-            filtered_forecast,
-            key=lambda day: (
-                day['rain_probability'],
-                abs(day['temperature_avg'] - 25),
-                day['wind_speed']
-            )
-        )
-
-        return {
-            'best_date': best_day['date'],
-            'best_temperature_avg': best_day['temperature_avg'],
-            'best_wind_speed': best_day['wind_speed'],
-            'best_rain_probability': best_day['rain_probability']
-        }
-        
-            
     def filter_temp_range(self, forecast, start_date, end_date):
-        fmt = "%d/%m/%Y"
-        try:
-            start = datetime.strptime(start_date, fmt)
-            end = datetime.strptime(end_date, fmt)
-        except ValueError:
-            print("Error: Invalid date format. Use 'DD/MM/YYYY'.")
+        window = parse_window(start_date, end_date)
+        if window is None:
             return []
         # Filter days within the range
-        return [
-            day for day in forecast
-            if start <= datetime.strptime(day['date'], fmt) <= end
-        ]
+        return [day for day in forecast if window[0] <= forecast_day(day) <= window[1]]
+
+    def plan_window(self, forecast, start_date, end_date, comfort=None):
+        """
+        filter_temp_range and get_best_day_to_go_out in one pass:
+        {"temperature_range": [...], "best_day": {...} or None}. `comfort`
+        maps a forecast day to a sort key, lowest wins (see default_comfort).
+        """
+        window = parse_window(start_date, end_date)
+        if window is None:
+            return {"temperature_range": [], "best_day": None}
+        in_range, best = self._scan(forecast or [], *window, comfort or default_comfort)
+        if best is None:
+            print("No forecast data available for the provided date range.")
+        return {"temperature_range": in_range, "best_day": best}
+
+    @staticmethod
+    def _scan(forecast, start, end, comfort):
+        in_range = []
+        best = best_key = None
+        for day in forecast:
+            if not start <= forecast_day(day) <= end:
+                continue
+            in_range.append(day)
+            key = comfort(day)
+            # Strict comparison keeps the earliest of equally good days
+            if best is None or key < best_key:
+                best, best_key = day, key
+        if best is None:
+            return in_range, None
+        return in_range, {
+            'best_date': best['date'],
+            'best_temperature_avg': best['temperature_avg'],
+            'best_wind_speed': best['wind_speed'],
+            'best_rain_probability': best['rain_probability'],
+            'day': forecast_day(best),
+        }
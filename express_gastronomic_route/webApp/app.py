@@ -1,9 +1,14 @@
 import streamlit as st
 import os
-import json
-import re
 from utils import pretty_forecast_lines, pretty_best_day, convert_dateinput_to_str
-from express_gastronomic_route.Services import LLMAPI, TopRestaurantsExtractor, SYSTEM_PROFILE, WeatherAPI, RestaurantSelection, RouteOptimizer, GastronomyPDF
+from express_gastronomic_route.Services import LLMAPI, WeatherAPI, RestaurantSelection, RouteOptimizer, RoutePlanner
+from express_gastronomic_route.Services import MemoryCache, SQLiteCache, TieredCache, GeocodeCache
+from express_gastronomic_route.Services.scoring import STRATEGIES
+from express_gastronomic_route.Services.persistence import JsonlSink
+from express_gastronomic_route.Services.pipeline import dispatch_events
+from express_gastronomic_route.Services.spatial_index import SpatialIndex
+from express_gastronomic_route.Services.snapshot import CitySnapshot, SnapshotSelector
+from express_gastronomic_route.Services.pdf_worker import PdfWorkerPool
 
 from dotenv import load_dotenv
 
@@ -12,95 +17,145 @@ load_dotenv()
 api_key_gmaps = os.getenv("API_GOOGLE_PLACES")
 api_key_weather = os.getenv("API_WEATHER_KEY")
 pdf_dir = os.getenv("PDF_OUTPUT_DIR", ".")
+save_pdfs = os.getenv("SAVE_PDFS", "false").lower() in ("1", "true", "yes")
 user_prefs_dir = os.getenv("USER_PREFS_DIR", ".")
 photo_dir = os.getenv("PHOTO_DIR")
+cache_dir = os.getenv("CACHE_DIR", user_prefs_dir)
+route_matrix_source = os.getenv("ROUTE_MATRIX_SOURCE", "haversine")
+llm_parallel = int(os.getenv("LLM_MAX_PARALLEL", "3"))
+llm_batched = os.getenv("LLM_BATCHED", "false").lower() in ("1", "true", "yes")
+snapshot_dir = os.getenv("SNAPSHOT_DIR")
+snapshot_reload = int(os.getenv("SNAPSHOT_RELOAD_SECONDS", "300"))
+search_keywords = [k.strip() for k in os.getenv("SEARCH_KEYWORDS", "").split(",") if k.strip()]
+search_radii = [int(r) for r in os.getenv("SEARCH_RADII", "").split(",") if r.strip()]
+search_max_pages = int(os.getenv("SEARCH_MAX_PAGES", "1"))
+search_index_ttl = int(os.getenv("SEARCH_INDEX_TTL", str(24 * 3600)))
+search_index_max_places = int(os.getenv("SEARCH_INDEX_MAX_PLACES", "50000"))
+save_details = os.getenv("SAVE_DETAILS", "true").lower() in ("1", "true", "yes")
+save_details_gzip = os.getenv("SAVE_DETAILS_GZIP", "false").lower() in ("1", "true", "yes")
+pdf_workers = int(os.getenv("PDF_WORKERS", "2"))
+pdf_max_queue = int(os.getenv("PDF_MAX_QUEUE", "8"))
+plan_cache_size = int(os.getenv("PLAN_CACHE_SIZE", "64"))
+plan_cache_ttl = int(os.getenv("PLAN_CACHE_TTL", str(30 * 60)))
 
-if "started" not in st.session_state:
-    st.session_state.started = False
 
-if not st.session_state.started:
-    st.markdown("""
-        <div style="text-align: center;">
-            <h1>Express Gastronomic Route</h1>
-            <h3>Master's Thesis</h3>
-            <p><b>Author:</b> José Manuel Muelas de la Linde</p>
-            <p><b>Master in Artificial Intelligence, Big Data and Data Engineering</b></p>
-        </div>
-    """, unsafe_allow_html=True)
-    st.image(os.path.join(photo_dir, "malagaPortada.jpg"), width=700)
+@st.cache_resource
+def get_details_cache():
+    """Place Details cache shared by every session of this process."""
+    return TieredCache(
+        MemoryCache(max_entries=2048),
+        SQLiteCache(os.path.join(cache_dir, "places_cache.sqlite3"), table="place_details", max_entries=50000),
+    )
 
 
-    col1, col2, col3 = st.columns([1.3, 2, 1])
-    with col2:
-        if st.button("Start the gastronomic experience 🍽️"):
-            st.session_state.started = True
-    st.stop()  
+@st.cache_resource
+def get_geocode_cache():
+    """Geocoding cache shared by RestaurantSelection and RouteOptimizer."""
+    return GeocodeCache(path=os.path.join(cache_dir, "places_cache.sqlite3"))
 
-st.sidebar.title("Route Parameters")
-address = st.sidebar.text_input("Address", value="Calle Larios")
-city = st.sidebar.text_input("City/Town", value="Málaga")
-start_date = st.sidebar.date_input("Start date", format="DD/MM/YYYY")
-end_date = st.sidebar.date_input("End date", format="DD/MM/YYYY")
-food_type = st.sidebar.text_input("Food type (optional)", value="")
 
+@st.cache_resource
+def get_distance_cache():
+    """Pairwise walking distance/duration store shared by every route."""
+    return TieredCache(
+        MemoryCache(max_entries=100000),
+        SQLiteCache(os.path.join(cache_dir, "places_cache.sqlite3"), table="distance_pairs", max_entries=500000),
+    )
 
-if st.sidebar.button("Search Restaurants and Plan Route"):
-    st.info("Cooking up your gastronomic route... 🍽️")
 
-    # 1. Restaurant Search
-    restaurant_selector = RestaurantSelection()
-    restaurant_list, restaurants_json_file = restaurant_selector.fetch_and_save(
-        address=address,
-        food_type=food_type or None,
-        out_file=os.path.join(user_prefs_dir, "restaurant_details.json")
+@st.cache_resource
+def get_spatial_index():
+    """Nearby Search results of this process, reused for searches in covered areas."""
+    return SpatialIndex(ttl=search_index_ttl, max_places=search_index_max_places)
+
+
+@st.cache_resource(ttl=snapshot_reload)
+def get_snapshot(city):
+    """
+    Newest offline snapshot of the city in SNAPSHOT_DIR, or None. Looked up
+    again every SNAPSHOT_RELOAD_SECONDS so new builds and refreshes are
+    picked up; a replaced snapshot's maps are released once no session
+    holds it any more.
+    """
+    if not snapshot_dir:
+        return None
+    return CitySnapshot.latest(snapshot_dir, city)
+
+
+@st.cache_resource
+def get_weather_api():
+    """One WeatherAPI per process so its forecast cache and in-flight requests are shared."""
+    return WeatherAPI(api_key_weather)
+
+
+@st.cache_resource
+def get_llm_cache():
+    """Completion cache: 32 MB in memory plus an on-disk store, one week TTL."""
+    ttl = 7 * 24 * 3600
+    return TieredCache(
+        MemoryCache(max_entries=None, max_bytes=32 * 1024 * 1024, ttl=ttl),
+        SQLiteCache(os.path.join(cache_dir, "llm_cache.sqlite3"), table="chat_completions", max_entries=20000, ttl=ttl),
     )
-    st.success(f"✅ {len(restaurant_list)} restaurants found.")
-
-    # 2. Load restaurants from JSON
-    with open(restaurants_json_file, "r", encoding="utf-8") as f:
-        lista = json.load(f)
-
-    # 3. Top 3 selection
-    extractor = TopRestaurantsExtractor(lista)
-    top3_restaurant = extractor.get_top_3(n=3)
-
-    # 4. LLM summaries 
-    llm = LLMAPI()
-    descriptions = []
-    for rest in top3_restaurant:
-        rest['best_day'] = None  
-        user_message = {
-            "role": "user",
-            "content": json.dumps(rest, ensure_ascii=False, indent=2)
-        }
-        messages = [SYSTEM_PROFILE, user_message]
-        data = {
-            "model": "microsoft/phi-4-mini-instruct",
-            "messages": messages,
-            "temperature": 0.2
-        }
-        response = llm.post_chat_completion(data)
-        try:
-            salida = response["choices"][0]["message"]["content"]
-        except Exception:
-            salida = str(response)
-        match = re.search(
-            r"Description:\s*[\(\[]*(.*?)[\)\]]*\s*(?:\n+Reviews:|\n+Weekly opening hours:|\Z)",
-            salida,
-            re.IGNORECASE | re.DOTALL
-        )
-        descripcion = match.group(1).strip() if match else salida.strip()
-        rest["llm_description"] = descripcion
-        descriptions.append(descripcion)
-
-    # 5. Show restaurants and nice descriptions
+
+
+@st.cache_resource
+def get_details_sink():
+    """Background writer of search results (one .jsonl file per day), or None."""
+    if not save_details:
+        return None
+    return JsonlSink(user_prefs_dir, prefix="restaurant_details", compress=save_details_gzip)
+
+
+@st.cache_resource
+def get_pdf_pool():
+    """Worker processes that render PDFs off the script thread, or None (PDF_WORKERS=0)."""
+    if pdf_workers <= 0:
+        return None
+    return PdfWorkerPool(max_workers=pdf_workers, max_queue=pdf_max_queue)
+
+
+@st.cache_resource
+def get_restaurant_selection():
+    """Places client shared by every session, with its caches and spatial index."""
+    return RestaurantSelection(details_cache=get_details_cache(), geocode_cache=get_geocode_cache(),
+                               spatial_index=get_spatial_index())
+
+
+@st.cache_resource
+def get_route_optimizer():
+    # The page links to Google Maps and never draws the polyline: skip Directions
+    return RouteOptimizer(api_key=api_key_gmaps, mode="walking", geocode_cache=get_geocode_cache(),
+                          use_directions=False, distance_cache=get_distance_cache(),
+                          matrix_source=route_matrix_source)
+
+
+@st.cache_resource
+def get_llm():
+    return LLMAPI(max_parallel=llm_parallel, cache=get_llm_cache())
+
+
+@st.cache_resource
+def get_plan_store():
+    """
+    Finished route plans (stage results and the PDF or its worker job) keyed by
+    RoutePlanner.plan_key; bounded by PLAN_CACHE_SIZE and expired after
+    PLAN_CACHE_TTL seconds so forecasts and opening hours stay current.
+    """
+    return MemoryCache(max_entries=plan_cache_size, ttl=plan_cache_ttl)
+
+
+def render_restaurants(city, top3_restaurant):
+    """Render the restaurant cards; returns one placeholder per LLM description."""
     st.markdown(
         f"<h2 style='text-align:center; font-size:2.5em;'>{'Gastronomic Route: ' + city}</h2>",
         unsafe_allow_html=True
     )
+    description_slots = []
     for i, r in enumerate(top3_restaurant):
         st.markdown(f"<span style='font-size:1.5em'><b>{r['name']}</b></span> — {r['address']}", unsafe_allow_html=True)
-        st.markdown(f"> {descriptions[i]}")
+        slot = st.empty()
+        slot.markdown("> _Writing description..._")
+        description_slots.append(slot)
         # Phone number
         phone = r.get('phone_number', 'Not available')
         st.write(f"Phone number: {phone}")
@@ -141,57 +196,193 @@ if st.sidebar.button("Search Restaurants and Plan Route"):
             st.write("Opening hours: Not available")
         st.markdown(f"<span style='font-size:1.5em'><b>Score: {r.get('score')}</b></span>", unsafe_allow_html=True)
         st.markdown("---")
+    return description_slots
 
-    # 6. Route Optimization
-    route_optimizer = RouteOptimizer(api_key=api_key_gmaps, mode="walking")
-    origin_coord, coords, route_coords = route_optimizer.optimize_route(
-        start=address,
-        restaurants=top3_restaurant
-    )
-    maps_url = route_optimizer.get_google_maps_url(address, top3_restaurant)
+
+def render_route(route):
     st.subheader("Optimized Route")
-    st.markdown(f"[View route in Google Maps]({maps_url})")
+    st.markdown(f"[View route in Google Maps]({route['maps_url']})")
 
-    # 7. Weather info 
-    weather = WeatherAPI(api_key_weather)
-    start_str = convert_dateinput_to_str(start_date)
-    end_str = convert_dateinput_to_str(end_date)
-    weather_info = weather.get_weather_info(city)
-    forecast = weather.get_weather_forecast(city)
-    temperature_range = weather.filter_temp_range(forecast, start_str, end_str)
-    best_day = weather.get_best_day_to_go_out(forecast, start_str, end_str)
 
+def render_weather(city, weather):
     st.markdown(f"## Weather summary: {city}")
     st.markdown(f"### Forecast for selected dates:")
-    for line in pretty_forecast_lines(temperature_range):
+    for line in pretty_forecast_lines(weather["temperature_range"]):
         st.markdown(f"- {line}")
     st.markdown(f"### Best day to eat:")
-    st.markdown(pretty_best_day(best_day))
+    st.markdown(pretty_best_day(weather["best_day"]))
 
-    pdf_filename = os.path.join(pdf_dir, f"gastronomic_route_{city.replace(' ', '_')}.pdf")
-    pdfgen = GastronomyPDF(
-        filename=pdf_filename,
-        title=f"Gastronomic Route: {city}",
-    )
-    pdfgen.generate(
-        top3_restaurant,
-        forecast=temperature_range,
-        best_day=best_day,
-        city=city,
-        maps_url=maps_url
-    )
-
-    with open(pdf_filename, "rb") as f:
-        pdf_bytes = f.read()
 
+def render_pdf(pdf):
     st.download_button(
         label="Download gastronomic route as PDF",
-        data=pdf_bytes,
-        file_name=os.path.basename(pdf_filename),
+        data=pdf["data"],
+        file_name=pdf["file_name"],
         mime="application/pdf"
     )
 
-    st.success("Your gastronomic route is ready! 🍽️")
+
+@st.fragment(run_every=1)
+def show_pdf():
+    """
+    Download button of st.session_state.pdf. A PDF still rendering in a
+    worker is polled by this fragment alone, so the script run never waits.
+    """
+    pdf = st.session_state.get("pdf")
+    if pdf is None:
+        return
+    job = pdf.get("job")
+    if job is None:
+        render_pdf(pdf)
+        return
+    if not job.done():
+        st.info("Preparing your PDF...")
+        return
+    try:
+        data = job.result()
+    except Exception as e:
+        st.error(f"Step 'pdf' failed: {e}")
+        # A plan without its PDF is not worth serving again
+        get_plan_store().delete(pdf["plan_key"])
+        return
+    render_pdf({"file_name": job.file_name, "data": data})
+    if job.render_time is not None:
+        st.caption(f"PDF: {job.queue_wait:.2f} s queued, {job.render_time:.2f} s rendering")
+
+
+if "started" not in st.session_state:
+    st.session_state.started = False
+
+if not st.session_state.started:
+    st.markdown("""
+        <div style="text-align: center;">
+            <h1>Express Gastronomic Route</h1>
+            <h3>Master's Thesis</h3>
+            <p><b>Author:</b> José Manuel Muelas de la Linde</p>
+            <p><b>Master in Artificial Intelligence, Big Data and Data Engineering</b></p>
+        </div>
+    """, unsafe_allow_html=True)
+    st.image(os.path.join(photo_dir, "malagaPortada.jpg"), width=700)
+
+
+    col1, col2, col3 = st.columns([1.3, 2, 1])
+    with col2:
+        if st.button("Start the gastronomic experience 🍽️"):
+            st.session_state.started = True
+    st.stop()  
+
+st.sidebar.title("Route Parameters")
+address = st.sidebar.text_input("Address", value="Calle Larios")
+city = st.sidebar.text_input("City/Town", value="Málaga")
+start_date = st.sidebar.date_input("Start date", format="DD/MM/YYYY")
+end_date = st.sidebar.date_input("End date", format="DD/MM/YYYY")
+food_type = st.sidebar.text_input("Food type (optional)", value="")
+ranking = st.sidebar.selectbox("Rank restaurants by", list(STRATEGIES), index=0)
+open_on_best_day = st.sidebar.checkbox("Only restaurants open on the best weather day", value=False)
+
+
+if st.sidebar.button("Search Restaurants and Plan Route"):
+    st.info("Cooking up your gastronomic route... 🍽️")
+
+    # Sections are laid out up front and filled as their stage finishes
+    found_slot = st.empty()
+    restaurants_area = st.container()
+    route_area = st.container()
+    weather_area = st.container()
+    pdf_area = st.container()
+    description_slots = []
+
+    plan_key = RoutePlanner.plan_key(address, city, convert_dateinput_to_str(start_date),
+                                     convert_dateinput_to_str(end_date), food_type or None, ranking,
+                                     open_on_best_day)
+    plan = get_plan_store().get(plan_key)
+    if plan is not None:
+        # Same inputs as a recent search: draw the stored plan without running anything
+        found_slot.success(f"✅ {plan['restaurants']['count']} restaurants found.")
+        with restaurants_area:
+            for slot, descripcion in zip(render_restaurants(city, plan["top"]), plan["descriptions"]):
+                slot.markdown(f"> {descripcion}")
+        with route_area:
+            render_route(plan["route"])
+        with weather_area:
+            render_weather(city, plan["weather"])
+        st.session_state.pdf = dict(plan["pdf"], plan_key=plan_key)
+        with pdf_area:
+            show_pdf()
+        st.success("Your gastronomic route is ready! 🍽️")
+        st.stop()
+
+    selector = get_restaurant_selection()
+    snapshot = get_snapshot(city)
+    if snapshot is not None:
+        # Serve candidates from the offline snapshot; the live client only geocodes
+        selector = SnapshotSelector(snapshot, geocoder=selector)
+    planner = RoutePlanner(
+        selector=selector,
+        optimizer=get_route_optimizer(),
+        weather=get_weather_api(),
+        llm=get_llm(),
+        pdf_dir=pdf_dir,
+        save_pdf=save_pdfs,
+        llm_batched=llm_batched,
+        sink=get_details_sink(),
+        search_options={"keywords": search_keywords, "radii": search_radii, "max_pages": search_max_pages},
+        pdf_pool=get_pdf_pool(),
+    )
+    pipeline = planner.build_pipeline(
+        address=address,
+        city=city,
+        start_date=convert_dateinput_to_str(start_date),
+        end_date=convert_dateinput_to_str(end_date),
+        food_type=food_type or None,
+        strategy=ranking,
+        open_on_best_day=open_on_best_day,
+    )
+
+    def show_partial(event):
+        # Streamed description text: (restaurant index, text so far)
+        idx, text = event.result
+        if idx < len(description_slots) and text:
+            description_slots[idx].markdown(f"> {text}▌")
+
+    def show_error(event):
+        st.error(f"Step '{event.name}' failed: {event.error}")
+
+    def show_result(event):
+        if event.name == "restaurants":
+            found_slot.success(f"✅ {event.result['count']} restaurants found.")
+        elif event.name == "top":
+            with restaurants_area:
+                description_slots[:] = render_restaurants(city, event.result)
+        elif event.name == "descriptions":
+            for slot, descripcion in zip(description_slots, event.result):
+                slot.markdown(f"> {descripcion}")
+        elif event.name == "route":
+            with route_area:
+                render_route(event.result)
+        elif event.name == "weather":
+            with weather_area:
+                render_weather(city, event.result)
+        elif event.name == "pdf":
+            # A PDF still rendering in a worker is shown by the fragment once ready
+            st.session_state.pdf = dict(event.result, plan_key=plan_key)
+            with pdf_area:
+                show_pdf()
+
+    plan, failed = dispatch_events(pipeline.iter_run(), show_result, on_partial=show_partial, on_error=show_error)
+
+    with st.expander("Stage timings"):
+        for name, seconds in pipeline.timings.items():
+            st.write(f"{name}: {seconds:.2f} s")
+        llm_cache = get_llm_cache().stats
+        st.write(f"LLM cache: {llm_cache.hits} hits / {llm_cache.misses} misses")
+        if get_pdf_pool() is not None:
+            pool = get_pdf_pool().stats()
+            st.write(f"PDF pool: {pool['pending']} pending, {pool['rejected']} rendered inline")
+
+    if not failed:
+        get_plan_store().set(plan_key, plan)
+        st.success("Your gastronomic route is ready! 🍽️")
 
 else:
-    st.info("Adjust parameters and click the button to generate your route.")
\ No newline at end of file
+    st.info("Adjust parameters and click the button to generate your route.")
@@ -1,14 +1,16 @@
-import requests
 import os
 from dotenv import load_dotenv
 
+from express_gastronomic_route.Services.http_client import get_http_client
+
 def check_api_key(api_url, api_key, test_endpoint="/status"):
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Accept": "application/json"
     }
     try:
-        response = requests.get(f"{api_url}{test_endpoint}", headers=headers, timeout=5)
+        # Status checks fail fast: short timeout, no retries
+        response = get_http_client("status").get(f"{api_url}{test_endpoint}", headers=headers, retry=False)
         return response.status_code == 200
     except Exception as e:
         print(f"Error comprobando la API KEY: {e}")
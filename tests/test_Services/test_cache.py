@@ -0,0 +1,101 @@
+# tests/services/test_cache.py
+
+import time
+import pytest
+
+from express_gastronomic_route.Services.cache import MemoryCache, SQLiteCache, TieredCache
+
+# --- MemoryCache tests ---
+
+def test_memory_cache_lru_eviction_and_stats():
+    """The least recently used key is evicted once max_entries is exceeded."""
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1          # "a" becomes most recently used
+    cache.set("c", 3)                   # evicts "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats.as_dict()["evictions"] == 1
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 1
+
+def test_memory_cache_ttl_expiry(monkeypatch):
+    """Entries past their TTL are dropped and counted as misses."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = MemoryCache(ttl=10)
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    now[0] += 11
+    assert cache.get("k", "default") == "default"
+    assert cache.stats.expirations == 1
+
+def test_memory_cache_max_bytes_bound():
+    """Total size stays under max_bytes; oversized values are not stored."""
+    cache = MemoryCache(max_entries=None, max_bytes=30)
+    cache.set("a", "x" * 10)   # 12 bytes as JSON
+    cache.set("b", "y" * 10)
+    cache.set("c", "z" * 10)   # evicts "a"
+    assert "a" not in cache and "b" in cache and "c" in cache
+    assert cache.total_bytes == 24
+    cache.set("huge", "w" * 100)
+    assert "huge" not in cache
+
+# --- SQLiteCache tests ---
+
+def test_sqlite_cache_persists_between_instances(tmp_path):
+    """Values survive reopening the database file."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path)
+    cache.set("place", {"name": "Café", "rating": 4.5})
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    assert reopened.get("place") == {"name": "Café", "rating": 4.5}
+    assert "place" in reopened
+
+def test_sqlite_cache_evicts_least_recently_accessed(tmp_path, monkeypatch):
+    """max_entries keeps only the most recently accessed rows."""
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    for key in ("a", "b"):
+        now[0] += 1
+        cache.set(key, key)
+    now[0] += 1
+    cache.get("a")
+    now[0] += 1
+    cache.set("c", "c")
+    assert len(cache) == 2
+    assert "b" not in cache
+    assert cache.stats.evictions == 1
+
+def test_sqlite_cache_counts_rows_only_when_over_cap(tmp_path):
+    """Writes do not scan the table; eviction goes a batch below the cap."""
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=100, evict_batch=10)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    for i in range(300):
+        cache.set(f"k{i}", i)
+    counts = sum("COUNT(*)" in statement for statement in statements)
+    # One count when first written, then one per batch of 11 new rows past the cap
+    assert counts <= 1 + 200 // 11 + 1
+    statements.clear()
+    for i in range(290, 300):
+        cache.set(f"k{i}", -i)
+    assert not any("COUNT(*)" in statement for statement in statements)
+    cache._conn.set_trace_callback(None)
+    assert 90 <= len(cache) <= 100
+    assert cache.get("k299") == -299 and "k0" not in cache
+
+# --- TieredCache tests ---
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    """A disk hit is copied into the memory tier."""
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    disk.set("k", [1, 2, 3], ttl=60)
+    cache = TieredCache(MemoryCache(), disk)
+    assert cache.get("k") == [1, 2, 3]
+    assert "k" in cache.memory
+    assert cache.stats.hits == 1
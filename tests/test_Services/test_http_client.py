@@ -0,0 +1,144 @@
+# tests/services/test_http_client.py
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from express_gastronomic_route.Services import http_client
+from express_gastronomic_route.Services.http_client import HttpClient, get_http_client
+
+# --- Fixtures & helpers ---
+
+class DummyResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class ScriptedSession:
+    """Session stand-in returning (or raising) a scripted sequence of outcomes."""
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+        self.adapters = {}
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """Record backoff delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(http_client.time, "sleep", delays.append)
+    return delays
+
+# --- retry tests ---
+
+def test_retries_on_429_and_5xx_then_succeeds(no_sleep):
+    """Retryable statuses are retried with backoff until a good response."""
+    session = ScriptedSession([DummyResponse(503), DummyResponse(429, {"Retry-After": "2"}), DummyResponse(200)])
+    client = HttpClient("places", session=session)
+    response = client.get("http://example.com", params={"a": 1})
+
+    assert response.status_code == 200
+    assert len(session.calls) == 3
+    assert session.calls[0][2]["timeout"] == http_client.SERVICE_TIMEOUTS["places"]
+    # Retry-After is honoured on the 429
+    assert no_sleep[1] == 2.0
+    stats = client.metrics.as_dict()
+    assert stats["requests"] == 3
+    assert stats["retries"] == 2
+    assert sum(stats["latency_histogram"].values()) == 3
+
+def test_gives_up_after_max_retries():
+    """The last retryable response is returned once retries are exhausted."""
+    session = ScriptedSession([DummyResponse(500)] * 3)
+    client = HttpClient(session=session, max_retries=2)
+    assert client.get("http://example.com").status_code == 500
+    assert client.metrics.errors == 1
+
+def test_connection_errors_are_retried_then_raised():
+    """Connection errors propagate after the final attempt."""
+    session = ScriptedSession([requests.ConnectionError("down")] * 2)
+    client = HttpClient(session=session, max_retries=1)
+    with pytest.raises(requests.ConnectionError):
+        client.get("http://example.com")
+    assert client.metrics.retries == 1
+
+def test_read_timeouts_are_not_retried_for_post():
+    """A POST that timed out reading is not re-submitted; connect failures are."""
+    session = ScriptedSession([requests.ReadTimeout("slow")])
+    client = HttpClient("llm", session=session)
+    with pytest.raises(requests.ReadTimeout):
+        client.post("http://example.com", json={})
+    assert len(session.calls) == 1 and client.metrics.retries == 0
+
+    session = ScriptedSession([requests.ConnectTimeout("no route"), DummyResponse(200)])
+    client = HttpClient("llm", session=session)
+    assert client.post("http://example.com", json={}).status_code == 200
+
+    session = ScriptedSession([requests.ReadTimeout("slow"), DummyResponse(200)])
+    client = HttpClient("places", session=session)
+    assert client.get("http://example.com").status_code == 200
+
+def test_post_retries_only_rejected_statuses():
+    """A POST is resent after 429/503 but not after a gateway error it may have reached."""
+    session = ScriptedSession([DummyResponse(429), DummyResponse(503), DummyResponse(200)])
+    client = HttpClient("llm", session=session)
+    assert client.post("http://example.com", json={}).status_code == 200
+    assert len(session.calls) == 3
+
+    for status in (500, 502, 504):
+        session = ScriptedSession([DummyResponse(status), DummyResponse(200)])
+        client = HttpClient("llm", session=session)
+        assert client.post("http://example.com", json={}).status_code == status
+        assert len(session.calls) == 1 and client.metrics.errors == 1
+
+def test_backoff_is_jittered_and_capped():
+    """Delays stay within [0, min(backoff_max, factor * 2**attempt)]."""
+    client = HttpClient(backoff_factor=0.5, backoff_max=3)
+    for attempt in range(6):
+        assert 0 <= client.backoff(attempt) <= min(3, 0.5 * 2 ** attempt)
+
+# --- pooling tests ---
+
+def test_keep_alive_connections_are_reused():
+    """Sequential requests to one host share a single pooled connection."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = HttpClient()
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        for _ in range(4):
+            assert client.get(url).text == "ok"
+        stats = client.stats()
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 3
+    finally:
+        server.shutdown()
+
+def test_get_http_client_is_shared_per_service():
+    """Each service gets one process-wide client."""
+    assert get_http_client("weather") is get_http_client("weather")
+    assert get_http_client("weather") is not get_http_client("llm")
@@ -0,0 +1,218 @@
+# tests/services/test_llmapi.py
+
+import json
+import threading
+
+from express_gastronomic_route.Services.LLMAPI import (
+    LLMAPI, DescriptionStream, completion_cache_key, extract_description,
+)
+from express_gastronomic_route.Services.cache import MemoryCache
+
+# --- Fixtures & helpers ---
+
+class DummyResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+def completion(content):
+    return {"choices": [{"message": {"content": content}}]}
+
+class FakeHttp:
+    """Answers chat completions through a callable and records the payloads."""
+    def __init__(self, answer):
+        self.answer = answer
+        self.payloads = []
+        self.lock = threading.Lock()
+
+    def post(self, url, json=None, **kwargs):
+        with self.lock:
+            self.payloads.append(json)
+        return DummyResponse(completion(self.answer(json)))
+
+def restaurant_name(payload):
+    """Name of the restaurant sent in the user message."""
+    return json.loads(payload["messages"][-1]["content"])["name"]
+
+# --- extract_description tests ---
+
+def test_extract_description_between_sections():
+    """Only the Description section is kept when present."""
+    text = "Description: [Cozy tapas bar.]\n\nReviews:\n- great"
+    assert extract_description(text) == "Cozy tapas bar."
+    assert extract_description("  free text  ") == "free text"
+
+# --- describe_restaurants tests ---
+
+def test_describe_restaurants_concurrent_keeps_order():
+    """Concurrent requests return descriptions in input order."""
+    http = FakeHttp(lambda payload: f"Description: About {restaurant_name(payload)}")
+    llm = LLMAPI(http=http, max_parallel=3)
+    restaurants = [{"name": name} for name in ("A", "B", "C")]
+
+    assert llm.describe_restaurants(restaurants) == ["About A", "About B", "About C"]
+    assert len(http.payloads) == 3
+    assert all(p["temperature"] == 0.2 and p["messages"][0]["role"] == "system" for p in http.payloads)
+
+def test_prompt_leaves_out_coordinates():
+    """The location tuple used for routing is not sent to the model."""
+    http = FakeHttp(lambda payload: "Description: ok")
+    llm = LLMAPI(http=http)
+    restaurant = {"name": "A", "location": (36.72, -4.42)}
+    llm.describe_restaurant(restaurant, use_cache=False)
+    sent = json.loads(http.payloads[0]["messages"][-1]["content"])
+    assert sent == {"name": "A"}
+    assert restaurant["location"] == (36.72, -4.42)
+
+def test_describe_restaurants_batched_single_completion():
+    """Batched mode parses every section out of one completion."""
+    answer = (
+        "### Restaurant 1\nDescription: First place.\nReviews:\n- ok\n\n"
+        "### Restaurant 2\nDescription: Second place."
+    )
+    http = FakeHttp(lambda payload: answer)
+    llm = LLMAPI(http=http)
+    assert llm.describe_restaurants([{"name": "A"}, {"name": "B"}], batched=True) == ["First place.", "Second place."]
+    assert len(http.payloads) == 1
+
+def test_describe_restaurants_batched_falls_back_for_missing_sections():
+    """Restaurants absent from the batched answer get individual requests."""
+    def answer(payload):
+        content = payload["messages"][-1]["content"]
+        if content.startswith("Write your usual answer"):
+            return "### Restaurant 2\nDescription: Batched B."
+        return f"Description: Single {json.loads(content)['name']}"
+
+    http = FakeHttp(answer)
+    llm = LLMAPI(http=http)
+    result = llm.describe_restaurants([{"name": "A"}, {"name": "B"}, {"name": "C"}], batched=True)
+    assert result == ["Single A", "Batched B.", "Single C"]
+    assert len(http.payloads) == 3
+
+# --- response cache tests ---
+
+def test_completion_cache_key_is_stable_and_param_sensitive():
+    """Key ignores dict order and 'stream' but not sampling params."""
+    a = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "temperature": 0.2}
+    b = {"temperature": 0.2, "stream": True, "messages": [{"role": "user", "content": "hi"}], "model": "m"}
+    assert completion_cache_key(a) == completion_cache_key(b)
+    assert completion_cache_key(a) != completion_cache_key({**a, "temperature": 0.7})
+
+def test_post_chat_completion_served_from_cache():
+    """Identical requests hit the cache; use_cache=False always calls the server."""
+    http = FakeHttp(lambda payload: "Description: cached")
+    cache = MemoryCache()
+    llm = LLMAPI(http=http, cache=cache)
+    restaurant = {"name": "A"}
+
+    assert llm.describe_restaurant(restaurant) == "cached"
+    assert llm.describe_restaurant(restaurant) == "cached"
+    assert len(http.payloads) == 1
+    assert llm.cache_stats()["hits"] == 1
+
+    llm.describe_restaurant(restaurant, use_cache=False)
+    assert len(http.payloads) == 2
+
+def test_failed_completions_are_not_cached():
+    """Error payloads without choices must not be replayed."""
+    class ErrorHttp(FakeHttp):
+        def post(self, url, json=None, **kwargs):
+            self.payloads.append(json)
+            return DummyResponse({"error": "model not loaded"})
+
+    http = ErrorHttp(None)
+    llm = LLMAPI(http=http, cache=MemoryCache())
+    data = {"model": "m", "messages": [], "temperature": 0.2}
+    llm.post_chat_completion(data)
+    llm.post_chat_completion(data)
+    assert len(http.payloads) == 2
+
+# --- streaming tests ---
+
+class StreamResponse:
+    """Server-sent events body of a streamed chat completion."""
+    def __init__(self, deltas):
+        self.lines = [": keep-alive", ""]
+        for delta in deltas:
+            self.lines.append("data: " + json.dumps({"choices": [{"delta": {"content": delta}}]}))
+            self.lines.append("")
+        self.lines.append("data: [DONE]")
+        self.closed = False
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self.lines)
+
+    def close(self):
+        self.closed = True
+
+class StreamHttp:
+    def __init__(self, deltas, body=None):
+        self.deltas = deltas
+        # Plain (non-SSE) body lines sent instead of the stream
+        self.body = body
+        self.payloads = []
+
+    def post(self, url, json=None, stream=False, **kwargs):
+        self.payloads.append((json, stream))
+        response = StreamResponse(self.deltas)
+        if self.body is not None:
+            response.lines = list(self.body)
+        return response
+
+def test_stream_chat_completion_yields_deltas_and_caches():
+    """SSE deltas are yielded in order and the full answer is cached."""
+    http = StreamHttp(["Hel", "lo", " world"])
+    llm = LLMAPI(http=http, cache=MemoryCache())
+    data = {"model": "m", "messages": [], "temperature": 0.2}
+
+    assert list(llm.stream_chat_completion(data)) == ["Hel", "lo", " world"]
+    payload, stream = http.payloads[0]
+    assert payload["stream"] is True and stream is True
+    # Replayed from the cache in one piece, for streamed and regular calls
+    assert list(llm.stream_chat_completion(data)) == ["Hello world"]
+    assert LLMAPI.completion_text(llm.post_chat_completion(data)) == "Hello world"
+    assert len(http.payloads) == 1
+
+def test_description_stream_matches_final_extraction():
+    """Partial descriptions grow monotonically and end as extract_description."""
+    answer = "Here you go.\nDescription: [Lovely terrace with sea views.]\n\nReviews:\n- nice"
+    stream = DescriptionStream()
+    seen = [stream.feed(answer[i:i + 7]) for i in range(0, len(answer), 7)]
+    assert seen[0] == ""
+    assert any(text and text != seen[-1] for text in seen)
+    assert seen[-1] == stream.result() == extract_description(answer) == "Lovely terrace with sea views."
+
+def test_describe_restaurants_reports_partial_updates():
+    """on_update receives (index, partial text) while streaming."""
+    http = StreamHttp(["Description: ", "Sea", "food ", "heaven"])
+    llm = LLMAPI(http=http)
+    updates = []
+    result = llm.describe_restaurants([{"name": "A"}], on_update=lambda idx, text: updates.append((idx, text)))
+    assert result == ["Seafood heaven"]
+    assert updates[0] == (0, "Sea")
+    assert updates[-1] == (0, "Seafood heaven")
+
+def test_stream_without_events_is_read_as_a_regular_reply():
+    """A server ignoring stream=True answers in one piece, which is yielded and cached."""
+    answer = json.dumps(completion("Description: Quiet courtyard."), indent=2)
+    http = StreamHttp([], body=answer.splitlines())
+    llm = LLMAPI(http=http, cache=MemoryCache())
+    updates = []
+    result = llm.describe_restaurants([{"name": "A"}], on_update=lambda idx, text: updates.append(text))
+    assert result == ["Quiet courtyard."] and updates == ["Quiet courtyard."]
+    data = http.payloads[0][0]
+    assert list(llm.stream_chat_completion({k: v for k, v in data.items() if k != "stream"})) == [
+        "Description: Quiet courtyard."]
+    assert len(http.payloads) == 1
+
+def test_stream_error_status_falls_back_like_regular_calls():
+    """Error replies become the description text instead of failing the stage, and are not cached."""
+    error = {"error": {"message": "model not loaded"}}
+    http = StreamHttp([], body=[json.dumps(error)])
+    llm = LLMAPI(http=http, cache=MemoryCache())
+    result = llm.describe_restaurants([{"name": "A"}], on_update=lambda idx, text: None)
+    assert result == [extract_description(LLMAPI.completion_text(error))]
+    llm.describe_restaurants([{"name": "A"}], on_update=lambda idx, text: None)
+    assert len(http.payloads) == 2
@@ -0,0 +1,96 @@
+# tests/services/test_models.py
+
+import pytest
+from express_gastronomic_route.Services.models import Restaurant, Review
+from express_gastronomic_route.Services.RestaurantInfoTop import TopRestaurantsExtractor
+
+
+def make_payload():
+    return {
+        "place_id": "abc",
+        "name": "El Pimpi",
+        "formatted_address": "Calle Granada 62, Málaga",
+        "geometry": {"location": {"lat": 36.7218, "lng": -4.4175}},
+        "rating": 4.5,
+        "user_ratings_total": 12000,
+        "price_level": 2,
+        "opening_hours": {"weekday_text": ["Monday: 12:00 PM – 12:00 AM"]},
+        "takeout": None,
+        "editorial_summary": {"overview": "Historic bodega"},
+        "reviews": [
+            {"author_name": "Ana", "rating": 5, "text": "Great", "time": 100, "language": "es"},
+            {"author_name": "Bob", "rating": 3, "text": "Busy", "time": 300},
+            {"author_name": "Cai", "rating": 4, "text": "Nice", "time": 200},
+        ],
+    }
+
+# --- conversion tests ---
+
+def test_round_trip_is_lossless():
+    """to_dict gives back the payload, including unknown keys and explicit None."""
+    payload = make_payload()
+    restaurant = Restaurant.from_dict(payload)
+    assert restaurant.to_dict() == payload
+    # Also after the reviews were materialized
+    restaurant.latest_reviews()
+    assert restaurant.to_dict() == payload
+
+
+def test_unusual_geometry_is_kept_verbatim():
+    """Geometry with a viewport is not reduced to lat/lng, but its location is still known."""
+    payload = {"name": "X", "geometry": {"location": {"lat": 1.0, "lng": 2.0}, "viewport": {}}}
+    restaurant = Restaurant.from_dict(payload)
+    assert restaurant.lat is None
+    assert restaurant.location == (1.0, 2.0)
+    assert restaurant.to_dict() == payload
+
+
+def test_slots_and_dict_style_access():
+    """Records have no per-instance __dict__ but still answer .get like the payload."""
+    restaurant = Restaurant.from_dict(make_payload())
+    assert not hasattr(restaurant, "__dict__")
+    assert not hasattr(restaurant.reviews[0], "__dict__")
+    assert restaurant.get("geometry") == {"location": {"lat": 36.7218, "lng": -4.4175}}
+    assert restaurant.get("editorial_summary") == {"overview": "Historic bodega"}
+    assert restaurant.get("takeout", False) is None
+    assert restaurant.get("website", "n/a") == "n/a"
+    assert Restaurant.from_dict(restaurant) is restaurant
+
+
+def test_records_read_like_their_payload():
+    """Subscript, membership, equality and JSON encoding follow the payload dict."""
+    import json
+    from express_gastronomic_route.Services.persistence import dumps_line
+
+    payload = make_payload()
+    restaurant = Restaurant.from_dict(payload)
+    assert restaurant["name"] == "El Pimpi"
+    assert "takeout" in restaurant and "website" not in restaurant
+    with pytest.raises(KeyError):
+        restaurant["website"]
+    assert restaurant == payload
+    assert json.loads(dumps_line({"restaurants": [restaurant]}, use_orjson=False)) == {"restaurants": [payload]}
+    assert json.loads(dumps_line([restaurant])) == [payload]
+
+
+def test_reviews_are_built_and_sorted_lazily():
+    restaurant = Restaurant.from_dict(make_payload())
+    assert restaurant._reviews is None
+    latest = restaurant.latest_reviews(2)
+    assert [review.author_name for review in latest] == ["Bob", "Cai"]
+    assert restaurant.latest_reviews(2)[0] is latest[0]
+    assert restaurant.reviews[0].extra == {"language": "es"}
+    assert Review.from_dict({"author_name": "Ana"}).to_dict() == {"author_name": "Ana"}
+
+
+def test_unknown_constructor_field():
+    with pytest.raises(TypeError):
+        Restaurant(name="X", colour="red")
+
+# --- extractor integration ---
+
+def test_extractor_accepts_records():
+    """Ranking a list of Restaurant records gives the same top list as dicts."""
+    payloads = [make_payload(), {**make_payload(), "name": "Other", "rating": 3.0, "reviews": []}]
+    records = [Restaurant.from_dict(p) for p in payloads]
+    assert TopRestaurantsExtractor(records).get_top_3() == TopRestaurantsExtractor(payloads).get_top_3()
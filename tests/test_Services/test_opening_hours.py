@@ -0,0 +1,103 @@
+# tests/services/test_opening_hours.py
+
+from datetime import date, datetime
+import pytest
+from express_gastronomic_route.Services.opening_hours import (
+    OpeningSchedule, format_lines, DAY_MINUTES, WEEK_MINUTES
+)
+from express_gastronomic_route.Services.RestaurantInfoTop import TopRestaurantsExtractor
+
+WEEKDAY_TEXT = [
+    "Monday: Closed",
+    "Tuesday: 1:00 – 4:00 PM, 8:00 – 11:30 PM",
+    "Wednesday: 12:00 PM – 1:00 AM",
+    "Thursday: Open 24 hours",
+    "Friday: 9:00 AM – 5:00 PM",
+    "Saturday: 11:00 – 2:00 PM",
+    "Sunday: 10:00 PM – 2:00 AM",
+]
+
+# --- parsing tests ---
+
+def test_weekday_text_intervals():
+    """weekday_text becomes merged week-minute intervals."""
+    schedule = OpeningSchedule.from_weekday_text(WEEKDAY_TEXT)
+    tue, wed, thu, fri, sat, sun = (d * DAY_MINUTES for d in range(1, 7))
+    assert schedule.intervals == (
+        (0, 120),                               # Sunday night spill-over
+        (tue + 13 * 60, tue + 16 * 60),
+        (tue + 20 * 60, tue + 23 * 60 + 30),
+        (wed + 12 * 60, fri),                   # Wed noon -> 1 AM, then 24h Thursday
+        (fri + 9 * 60, fri + 17 * 60),
+        (sat + 11 * 60, sat + 14 * 60),
+        (sun + 22 * 60, WEEK_MINUTES),
+    )
+
+
+def test_periods_match_weekday_text():
+    """Places periods (Sunday = 0, "HHMM") give the same intervals."""
+    periods = [
+        {"open": {"day": 5, "time": "0900"}, "close": {"day": 5, "time": "1700"}},
+        {"open": {"day": 0, "time": "2200"}, "close": {"day": 1, "time": "0200"}},
+    ]
+    expected = OpeningSchedule.from_weekday_text([
+        "Friday: 9:00 AM – 5:00 PM", "Sunday: 10:00 PM – 2:00 AM"
+    ])
+    assert OpeningSchedule.from_periods(periods) == expected
+
+
+def test_open_without_close_is_always_open():
+    schedule = OpeningSchedule.from_periods([{"open": {"day": 0, "time": "0000"}}])
+    assert schedule.intervals == ((0, WEEK_MINUTES),)
+
+
+def test_from_place_unknown_hours():
+    """No hours, or text that cannot be parsed, is unknown (None)."""
+    assert OpeningSchedule.from_place({}) is None
+    assert OpeningSchedule.from_place({"opening_hours": {"weekday_text": ["lunes: 9–17"]}}) is None
+    closed = OpeningSchedule.from_place({"opening_hours": {"weekday_text": ["Monday: Closed"]}})
+    assert closed is not None and not closed.intervals
+
+# --- query tests ---
+
+def test_is_open_at_and_during():
+    schedule = OpeningSchedule.from_weekday_text(WEEKDAY_TEXT)
+    assert schedule.is_open_at(datetime(2025, 6, 6, 9, 0))       # Friday 09:00
+    assert not schedule.is_open_at(datetime(2025, 6, 6, 17, 0))  # closing minute excluded
+    assert schedule.is_open_at((0, 60))                           # Monday 01:00, Sunday spill
+    assert schedule.is_open_during(datetime(2025, 6, 6, 7), datetime(2025, 6, 6, 10))
+    assert not schedule.is_open_during(datetime(2025, 6, 6, 7), datetime(2025, 6, 6, 10), fully=True)
+    # Sunday 23:00 -> Monday 01:00 wraps around the week
+    assert schedule.is_open_during(datetime(2025, 6, 8, 23), datetime(2025, 6, 9, 1), fully=True)
+
+
+def test_is_open_on_day():
+    schedule = OpeningSchedule.from_weekday_text(WEEKDAY_TEXT)
+    assert schedule.is_open_on(date(2025, 6, 6))      # Friday
+    assert schedule.is_open_on(0)                     # Monday, via Sunday's late hours
+    closed_monday = OpeningSchedule.from_weekday_text(["Monday: Closed", "Friday: 9:00 AM – 5:00 PM"])
+    assert not closed_monday.is_open_on(date(2025, 6, 2))
+
+# --- formatting and ranking ---
+
+@pytest.mark.parametrize("line", [
+    "Mon: 09:00AM–05:00PM",
+    "Tue: 10:30AM– 06:45PM",
+    "Monday: 1:00 – 4:00 PM, 8:00 – 11:30 PM",
+    "Thursday: Open 24 hours",
+    "Sunday: Closed",
+])
+def test_format_lines_matches_extractor(line):
+    """format_lines is what TopRestaurantsExtractor.format_opening_hours returns."""
+    assert TopRestaurantsExtractor([]).format_opening_hours([line]) == format_lines([line])
+
+
+def test_rank_open_on_skips_closed_restaurants():
+    restaurants = [
+        {"name": "Closed Monday", "rating": 5.0, "user_ratings_total": 1000,
+         "opening_hours": {"weekday_text": ["Monday: Closed", "Tuesday: 9:00 AM – 5:00 PM"]}},
+        {"name": "Unknown Hours", "rating": 4.0, "user_ratings_total": 100},
+    ]
+    extractor = TopRestaurantsExtractor(restaurants)
+    assert [r["name"] for r, _ in extractor.rank(2)] == ["Closed Monday", "Unknown Hours"]
+    assert [r["name"] for r, _ in extractor.rank(2, open_on=date(2025, 6, 2))] == ["Unknown Hours"]
@@ -103,3 +103,21 @@ def test_generate_method_produces_pdf_file(tmp_path, monkeypatch):
     # Check that the file starts with the PDF signature
     with open(output_file, "rb") as f:
         assert f.read().startswith(b"%PDF")
+
+def test_render_returns_pdf_bytes_without_writing(tmp_path, monkeypatch, fake_photo_dir):
+    """render() builds the document in memory; the file sink is optional."""
+    from PIL import Image
+    from express_gastronomic_route.Services import pdf_generators
+    Image.new("RGB", (40, 30), "white").save(fake_photo_dir / "malagaPortada.jpg")
+    monkeypatch.setattr(pdf_generators, "photo_dir", str(fake_photo_dir))
+    monkeypatch.chdir(tmp_path)
+
+    restaurants = [{"name": "Testaurant", "address": "123 Fake Street", "reviews": []}]
+    data = GastronomyPDF(title="Test Title").render(restaurants, city="TestCity")
+    assert isinstance(data, bytes)
+    assert data.startswith(b"%PDF")
+    assert list(tmp_path.iterdir()) == [fake_photo_dir]
+
+    sink = tmp_path / "copy.pdf"
+    again = GastronomyPDF(title="Test Title").render(restaurants, city="TestCity", path=str(sink))
+    assert sink.read_bytes() == again
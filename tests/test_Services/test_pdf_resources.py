@@ -0,0 +1,76 @@
+# tests/services/test_pdf_resources.py
+
+import os
+
+from PIL import Image
+
+from express_gastronomic_route.Services.pdf_resources import ResourcePool
+
+
+def _photo(path, size=(3000, 2000)):
+    Image.effect_noise(size, 64).convert("RGB").save(path, format="JPEG", quality=95)
+    return str(path)
+
+
+# --- Images ---
+
+def test_image_is_downscaled_to_placed_width_and_smaller(tmp_path):
+    """A large photo is resized to the placement width at the pool's dpi."""
+    source = _photo(tmp_path / "cover.jpg")
+    pool = ResourcePool(dpi=150, cache_dir=str(tmp_path / "cache"))
+    prepared = pool.image(source, 150)
+    assert prepared != source
+    with Image.open(prepared) as img:
+        assert img.width == round(150 / 25.4 * 150)
+    assert os.path.getsize(prepared) < os.path.getsize(source)
+
+
+def test_image_is_prepared_once_and_reused(tmp_path):
+    """The second request for the same image and width is a cache hit."""
+    source = _photo(tmp_path / "cover.jpg")
+    pool = ResourcePool(cache_dir=str(tmp_path / "cache"))
+    first = pool.image(source, 150)
+    second = pool.image(source, 150)
+    assert first == second
+    assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 1
+
+
+def test_undecodable_or_missing_image_falls_back_to_original(tmp_path):
+    """Files PIL cannot read, and missing files, are returned unchanged."""
+    fake = tmp_path / "fake.jpg"
+    fake.write_bytes(b"FAKEJPEG")
+    pool = ResourcePool(cache_dir=str(tmp_path / "cache"))
+    assert pool.image(str(fake), 150) == str(fake)
+    assert pool.image(str(tmp_path / "missing.jpg"), 150) == str(tmp_path / "missing.jpg")
+
+
+def test_fallback_to_original_is_remembered(tmp_path, capsys):
+    """Undecodable and already compact images are prepared only once."""
+    fake = tmp_path / "fake.jpg"
+    fake.write_bytes(b"FAKEJPEG")
+    small = str(tmp_path / "small.jpg")
+    Image.new("RGB", (8, 8), "white").save(small, format="JPEG", quality=10, optimize=True)
+    pool = ResourcePool(cache_dir=str(tmp_path / "cache"))
+    for _ in range(3):
+        assert pool.image(str(fake), 150) == str(fake)
+        assert pool.image(small, 150) == small
+    assert pool.stats()["misses"] == 2 and pool.stats()["hits"] == 4
+    assert capsys.readouterr().out.count("Could not prepare image") == 1
+    # Evicting a remembered original never deletes it
+    prepared = pool.image(_photo(tmp_path / "big.jpg"), 150)
+    pool.max_bytes = 1
+    pool.image(_photo(tmp_path / "other.jpg"), 150)
+    assert not os.path.exists(prepared)
+    assert fake.exists() and os.path.exists(small)
+
+
+def test_byte_cap_evicts_least_recently_used(tmp_path):
+    """Beyond max_bytes the oldest prepared image is dropped and deleted."""
+    a = _photo(tmp_path / "a.jpg")
+    b = _photo(tmp_path / "b.jpg")
+    pool = ResourcePool(cache_dir=str(tmp_path / "cache"))
+    first = pool.image(a, 150)
+    pool.max_bytes = int(os.path.getsize(first) * 1.5)
+    pool.image(b, 150)
+    assert pool.stats()["images"] == 1
+    assert not os.path.exists(first)
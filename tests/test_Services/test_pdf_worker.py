@@ -0,0 +1,104 @@
+# tests/services/test_pdf_worker.py
+
+import pytest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from express_gastronomic_route.Services.pdf_worker import PdfWorkerPool, render_pdf_document
+
+RESTAURANTS = [{"name": "Testaurant", "address": "123 Fake Street", "reviews": []}]
+
+
+class BrokenExecutor:
+    """Executor whose worker died: submit() raises or the future fails."""
+
+    def __init__(self, fail_on_submit):
+        self.fail_on_submit = fail_on_submit
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        if self.fail_on_submit:
+            raise BrokenProcessPool("A child process terminated abruptly")
+        future = Future()
+        future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return future
+
+    def shutdown(self, wait=True):
+        self.shut_down = True
+
+
+@pytest.fixture
+def pool():
+    pool = PdfWorkerPool(max_workers=1, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+
+# --- inline rendering ---
+
+def test_render_pdf_document_returns_pdf_bytes(tmp_path, monkeypatch):
+    """The job function renders bytes and optionally writes the same bytes to disk."""
+    monkeypatch.delenv("PHOTO_DIR", raising=False)
+    path = tmp_path / "route.pdf"
+    data = render_pdf_document(RESTAURANTS, city="TestCity", title="Test", path=str(path))
+    assert data.startswith(b"%PDF")
+    assert path.read_bytes() == data
+
+
+# --- worker pool ---
+
+def test_submitted_job_returns_pdf_and_records_metrics(pool):
+    """A job runs in a worker process; its handle yields the bytes and timings."""
+    job = pool.submit(file_name="route.pdf", restaurants=RESTAURANTS, city="TestCity", title="Test")
+    data = job.result(timeout=60)
+    assert data.startswith(b"%PDF")
+    assert job.file_name == "route.pdf"
+    assert job.queue_wait >= 0 and job.render_time > 0
+    pool.shutdown()  # waits for the completion callbacks
+    stats = pool.stats()
+    assert stats["completed"] == 1 and stats["pending"] == 0
+    assert stats["render_time_max"] >= stats["render_time_avg"] > 0
+
+
+def test_submit_returns_none_when_queue_is_full(pool):
+    """Beyond max_queue pending jobs submit() refuses instead of queueing."""
+    first = pool.submit(restaurants=RESTAURANTS, title="Test")
+    assert pool.submit(restaurants=RESTAURANTS, title="Test") is None
+    assert pool.stats()["rejected"] == 1
+    first.result(timeout=60)
+    assert pool.submit(restaurants=RESTAURANTS, title="Test") is not None
+
+
+def test_failed_job_raises_from_result(pool):
+    """Errors in the worker are re-raised by result() and counted."""
+    job = pool.submit(restaurants=[{"address": "no name"}], title="Test")
+    with pytest.raises(KeyError):
+        job.result(timeout=60)
+    pool.shutdown()
+    assert pool.stats()["failed"] == 1
+
+
+def test_broken_pool_is_replaced_and_job_rendered_inline(pool, monkeypatch):
+    """A dead worker drops the executor; submit() returns None so the caller renders inline."""
+    monkeypatch.delenv("PHOTO_DIR", raising=False)
+    broken = BrokenExecutor(fail_on_submit=True)
+    pool._executor = broken
+    assert pool.submit(restaurants=RESTAURANTS, title="Test") is None
+    assert broken.shut_down and pool._executor is None
+    assert pool.stats()["failed"] == 1
+    job = pool.submit(restaurants=RESTAURANTS, title="Test")
+    assert job.result(timeout=60).startswith(b"%PDF")
+
+
+def test_job_whose_worker_died_renders_inline(pool, monkeypatch):
+    """A future failing with BrokenProcessPool falls back to rendering in the caller."""
+    monkeypatch.delenv("PHOTO_DIR", raising=False)
+    broken = BrokenExecutor(fail_on_submit=False)
+    pool._executor = broken
+    job = pool.submit(restaurants=RESTAURANTS, city="TestCity", title="Test")
+    data = job.result()
+    assert data.startswith(b"%PDF")
+    assert job.result() is data  # rendered once, however often it is polled
+    assert job.render_time is None
+    assert broken.shut_down and pool._executor is None
+    assert pool.stats()["failed"] == 1
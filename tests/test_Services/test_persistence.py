@@ -0,0 +1,67 @@
+# tests/services/test_persistence.py
+
+import json
+import threading
+from datetime import datetime
+from express_gastronomic_route.Services import persistence
+from express_gastronomic_route.Services.persistence import JsonlSink, dumps_line, read_jsonl
+
+# --- encoding ---
+
+def test_dumps_line_is_compact_and_encoder_independent():
+    """orjson and json produce the same compact line."""
+    record = {"name": "Café", "rating": 4.5, "tags": [1, 2]}
+    line = dumps_line(record, use_orjson=False)
+    assert line == '{"name":"Café","rating":4.5,"tags":[1,2]}\n'.encode("utf-8")
+    assert json.loads(dumps_line(record)) == record
+
+# --- JsonlSink ---
+
+def test_sink_appends_daily_file(tmp_path):
+    """Records are appended to one file per day, in submit order."""
+    sink = JsonlSink(str(tmp_path))
+    assert sink.submit({"n": 1}) and sink.submit({"n": 2})
+    sink.close()
+    path = sink.path_for(datetime.now())
+    assert path.endswith(f"restaurant_details_{datetime.now():%Y%m%d}.jsonl")
+    assert read_jsonl(path) == [{"n": 1}, {"n": 2}]
+    assert sink.stats()["written"] == 2
+    assert not sink.submit({"n": 3})
+
+
+def test_sink_gzip_survives_several_writes(tmp_path):
+    """Appending gzip members keeps the file readable as a whole."""
+    sink = JsonlSink(str(tmp_path), compress=True)
+    for n in range(3):
+        sink.submit({"n": n})
+        sink.flush()
+    sink.close()
+    assert read_jsonl(sink.path_for(datetime.now())) == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+
+def test_sink_drops_when_queue_is_full(tmp_path, monkeypatch):
+    """A stalled writer never blocks submit; overflow is counted."""
+    release = threading.Event()
+    original = JsonlSink._write
+
+    def slow_write(self, record):
+        release.wait(5)
+        original(self, record)
+
+    monkeypatch.setattr(JsonlSink, "_write", slow_write)
+    sink = JsonlSink(str(tmp_path), max_queue=2)
+    accepted = [sink.submit({"n": n}) for n in range(6)]
+    assert accepted.count(False) >= 3
+    assert sink.stats()["dropped"] == accepted.count(False)
+    release.set()
+    sink.close()
+    assert sink.stats()["written"] == accepted.count(True)
+
+
+def test_sink_counts_write_errors(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(persistence, "dumps_line", lambda record, use_orjson: 1 / 0)
+    sink = JsonlSink(str(tmp_path))
+    sink.submit({"n": 1})
+    sink.close()
+    assert sink.stats()["errors"] == 1
+    assert "Error saving details" in capsys.readouterr().out
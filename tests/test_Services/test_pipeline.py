@@ -0,0 +1,109 @@
+# tests/services/test_pipeline.py
+
+import threading
+import time
+import pytest
+
+from express_gastronomic_route.Services.pipeline import Pipeline, StageEvent, dispatch_events
+
+# --- execution tests ---
+
+def test_dependencies_receive_results_as_kwargs():
+    """Each stage gets its dependencies' results as keyword arguments."""
+    pipeline = Pipeline()
+    pipeline.add_stage("a", lambda: 2)
+    pipeline.add_stage("b", lambda a: a * 10, deps=["a"])
+    pipeline.add_stage("c", lambda a, b: a + b, deps=["a", "b"])
+    assert pipeline.run() == {"a": 2, "b": 20, "c": 22}
+    assert set(pipeline.timings) == {"a", "b", "c"}
+
+def test_independent_stages_run_concurrently():
+    """Independent stages overlap instead of running one after another."""
+    barrier = threading.Barrier(3, timeout=2)
+    pipeline = Pipeline(max_workers=3)
+    for name in ("x", "y", "z"):
+        # Would time out if the stages did not run at the same time
+        pipeline.add_stage(name, lambda: barrier.wait())
+    start = time.perf_counter()
+    pipeline.run()
+    assert time.perf_counter() - start < 1
+
+def test_events_arrive_in_completion_order():
+    """iter_run yields a fast stage before a slow independent one."""
+    pipeline = Pipeline(max_workers=2)
+    pipeline.add_stage("slow", lambda: time.sleep(0.2) or "slow")
+    pipeline.add_stage("fast", lambda: "fast")
+    names = [event.name for event in pipeline.iter_run()]
+    assert names == ["fast", "slow"]
+
+def test_progress_stage_yields_partial_events():
+    """progress() payloads arrive as partial events before the final one."""
+    def counting(progress):
+        for i in range(3):
+            progress(i)
+        return "done"
+
+    pipeline = Pipeline()
+    pipeline.add_stage("count", counting, progress=True)
+    events = list(pipeline.iter_run())
+    assert [e.result for e in events if e.partial] == [0, 1, 2]
+    assert events[-1].result == "done" and not events[-1].partial
+    assert pipeline.run() == {"count": "done"}
+
+# --- failure handling tests ---
+
+def test_failed_stage_skips_dependents_only():
+    """Dependents of a failed stage are skipped; unrelated stages still run."""
+    def boom():
+        raise RuntimeError("boom")
+
+    pipeline = Pipeline()
+    pipeline.add_stage("bad", boom)
+    pipeline.add_stage("after_bad", lambda bad: bad, deps=["bad"])
+    pipeline.add_stage("good", lambda: "ok")
+    events = {event.name: event for event in pipeline.iter_run()}
+    assert isinstance(events["bad"].error, RuntimeError)
+    assert events["after_bad"].skipped
+    assert events["good"].ok and events["good"].result == "ok"
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+
+def test_invalid_graphs_are_rejected():
+    """Unknown dependencies and cycles raise ValueError before running."""
+    unknown = Pipeline().add_stage("a", lambda missing: 1, deps=["missing"])
+    with pytest.raises(ValueError):
+        unknown.run()
+    cycle = Pipeline()
+    cycle.add_stage("a", lambda b: 1, deps=["b"])
+    cycle.add_stage("b", lambda a: 1, deps=["a"])
+    with pytest.raises(ValueError):
+        cycle.run()
+
+# --- event dispatch tests ---
+
+def test_dispatch_keeps_partial_events_out_of_results():
+    """Streamed payloads only reach on_partial; on_result gets each final result once."""
+    events = [
+        StageEvent("top", result=["a", "b"]),
+        StageEvent("descriptions", result=(1, "Par"), partial=True),
+        StageEvent("descriptions", result=(0, "Hal"), partial=True),
+        StageEvent("route", error=RuntimeError("boom")),
+        StageEvent("pdf", skipped=True),
+        StageEvent("descriptions", result=["Half", "Part"]),
+    ]
+    finals, partials, errors = [], [], []
+    results, failed = dispatch_events(events, lambda e: finals.append((e.name, e.result)),
+                                      on_partial=lambda e: partials.append(e.result),
+                                      on_error=lambda e: errors.append(e.name))
+    assert finals == [("top", ["a", "b"]), ("descriptions", ["Half", "Part"])]
+    assert partials == [(1, "Par"), (0, "Hal")]
+    assert errors == ["route"] and failed
+    assert results == {"top": ["a", "b"], "descriptions": ["Half", "Part"]}
+
+def test_dispatch_partial_only_stream_leaves_no_result():
+    """A stage that streams and then fails leaves nothing in the results."""
+    events = [StageEvent("descriptions", result=(0, "Hal"), partial=True),
+              StageEvent("descriptions", error=RuntimeError("LLM down"))]
+    seen = []
+    results, failed = dispatch_events(events, seen.append)
+    assert results == {} and seen == [] and failed
@@ -121,3 +121,28 @@ def test_get_top_3_filters_and_sorts_correctly():
     assert len(entry["reviews"]) == 2
     times = [rev["time"] for rev in entry["reviews"]]
     assert times == sorted(times, reverse=True)
+
+def test_rank_matches_stable_sort_reference_with_ties():
+    """
+    The vectorized top-N must equal the old compute_score + stable sort
+    ranking, including ties (earlier restaurants first) and missing data.
+    """
+    import random
+    rng = random.Random(7)
+    restaurants = [
+        {"name": f"R{i}",
+         "rating": rng.choice([None, 3.0, 4.0, 4.5, 5.0]),
+         "user_ratings_total": rng.choice([None, 0, 9, 99, 999])}
+        for i in range(300)
+    ]
+    scored = [(TopRestaurantsExtractor.compute_score(r["rating"], r["user_ratings_total"]), r)
+              for r in restaurants]
+    scored = [(s, r) for s, r in scored if s >= 0]
+    lo, hi = min(s for s, _ in scored), max(s for s, _ in scored)
+    reference = sorted(((10 * (s - lo) / (hi - lo), r) for s, r in scored),
+                       key=lambda x: x[0], reverse=True)
+
+    extractor = TopRestaurantsExtractor(restaurants)
+    for n in (1, 3, 10, 500):
+        ranked = extractor.rank(n)
+        assert [(r["name"], s) for r, s in ranked] == [(r["name"], s) for s, r in reference[:n]]
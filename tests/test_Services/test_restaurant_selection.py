@@ -8,6 +8,8 @@ from types import SimpleNamespace
 
 import requests
 from express_gastronomic_route.Services.restaurant_selection import RestaurantSelection
+from express_gastronomic_route.Services.http_client import HttpClient
+from express_gastronomic_route.Services.models import Restaurant
 
 # --- Fixtures & helpers ---
 
@@ -57,8 +59,8 @@ def test_get_coordinates_success(monkeypatch):
         ]
     }
     monkeypatch.setenv("API_GOOGLE_PLACES", "ENV_KEY")
-    monkeypatch.setattr(requests, "get",
-                        lambda url, params: DummyResponse(200, dummy_data))
+    monkeypatch.setattr(HttpClient, "get",
+                        lambda self, url, params: DummyResponse(200, dummy_data))
 
     sel = RestaurantSelection()
     lat, lng = sel.get_coordinates("Some Address")
@@ -69,8 +71,8 @@ def test_get_coordinates_non_ok_status(monkeypatch, capsys):
     """Non‑OK status should print an error and return (None, None)."""
     monkeypatch.setenv("API_GOOGLE_PLACES", "ENV_KEY")
     bad_data = {"status": "ZERO_RESULTS", "results": []}
-    monkeypatch.setattr(requests, "get",
-                        lambda url, params: DummyResponse(200, bad_data))
+    monkeypatch.setattr(HttpClient, "get",
+                        lambda self, url, params: DummyResponse(200, bad_data))
 
     sel = RestaurantSelection()
     lat, lng = sel.get_coordinates("Nowhere")
@@ -78,6 +80,54 @@ def test_get_coordinates_non_ok_status(monkeypatch, capsys):
     assert "Geocoding error: ZERO_RESULTS" in captured.out
     assert (lat, lng) == (None, None)
 
+# --- get_all_restaurant_details ---
+
+def test_get_all_restaurant_details_concurrent_keeps_order(monkeypatch):
+    """
+    Concurrent fetching should keep the search order, skip results without
+    place_id or details, and retain only the desired fields.
+    """
+    import time
+
+    def fake_details(place_id, use_cache=True):
+        # Later place_ids answer first to shuffle completion order
+        time.sleep(0.01 * (5 - int(place_id[1:])))
+        if place_id == "P2":
+            return None
+        return {"name": place_id, "rating": 4.0, "icon": "x"}
+
+    sel = RestaurantSelection(api_key="KEY", max_workers=4)
+    monkeypatch.setattr(sel, "get_restaurant_details", fake_details)
+    found = [{"place_id": f"P{i}"} for i in range(5)] + [{"name": "no id"}]
+
+    details = sel.get_all_restaurant_details(found)
+    assert [d["name"] for d in details] == ["P0", "P1", "P3", "P4"]
+    assert details[0] == {"name": "P0", "rating": 4.0}
+    assert all(isinstance(d, Restaurant) for d in details)
+    # Sequential mode must produce the same output
+    assert sel.get_all_restaurant_details(found, max_workers=1) == details
+
+def test_get_all_restaurant_details_only_fetches_cold_places(monkeypatch):
+    """Places with fresh cached details must not hit the network."""
+    from express_gastronomic_route.Services.cache import MemoryCache
+
+    calls = []
+    def fake_get(self, url, params):
+        calls.append(params["place_id"])
+        return DummyResponse(200, {
+            "status": "OK",
+            "result": {"name": params["place_id"], "rating": 4.2, "icon": "x"},
+        })
+    monkeypatch.setattr(HttpClient, "get", fake_get)
+
+    sel = RestaurantSelection(api_key="KEY", max_workers=1, details_cache=MemoryCache())
+    found = [{"place_id": "P1"}, {"place_id": "P2"}]
+    first = sel.get_all_restaurant_details(found)
+    second = sel.get_all_restaurant_details(found + [{"place_id": "P3"}])
+
+    assert calls == ["P1", "P2", "P3"]
+    assert second[:2] == first == [{"name": "P1", "rating": 4.2}, {"name": "P2", "rating": 4.2}]
+
 # --- save_details_to_json ---
 
 def test_save_details_to_json_creates_timestamped_file(tmp_path):
@@ -120,3 +170,81 @@ def test_fetch_and_save_calls_all_steps(monkeypatch, tmp_path):
     result_details, result_file = sel.fetch_and_save("Addr", food_type="pizza", out_file="ignored.json")
     assert result_details == dummy_details
     assert result_file == saved_file
+
+
+def test_fetch_returns_details_without_writing(monkeypatch, tmp_path):
+    """fetch chains the same steps as fetch_and_save but never touches disk."""
+    sel = RestaurantSelection(api_key="KEY")
+    monkeypatch.setattr(sel, "get_coordinates", lambda addr: (1.1, 2.2))
+    monkeypatch.setattr(sel, "search_restaurants", lambda lat, lng, food_type=None: [{"place_id": "P1"}])
+    monkeypatch.setattr(sel, "get_all_restaurant_details", lambda lst: [{"name": "X"}])
+    monkeypatch.setattr(sel, "save_details_to_json", lambda details, fn: pytest.fail("unexpected write"))
+
+    assert sel.fetch("Addr", food_type="pizza") == [{"name": "X"}]
+
+# --- paginated harvesting ---
+
+def test_search_all_pages_follows_tokens(monkeypatch):
+    """Pages are requested with next_page_token, retrying a token that is not ready yet."""
+    sel = RestaurantSelection(api_key="KEY")
+    monkeypatch.setattr(RestaurantSelection, "PAGE_TOKEN_DELAY", 0)
+    answers = [
+        {"status": "OK", "results": [{"place_id": "A"}], "next_page_token": "T1"},
+        {"status": "INVALID_REQUEST"},
+        {"status": "OK", "results": [{"place_id": "B"}], "next_page_token": "T2"},
+        {"status": "OK", "results": [{"place_id": "C"}]},
+    ]
+    seen_params = []
+
+    def fake_get(self, url, params=None, **kwargs):
+        seen_params.append(params)
+        return DummyResponse(200, answers.pop(0))
+
+    monkeypatch.setattr(HttpClient, "get", fake_get)
+    results = sel.search_all_pages(1.0, 2.0, food_type="tapas", max_pages=3)
+    assert [r["place_id"] for r in results] == ["A", "B", "C"]
+    assert seen_params[0]["keyword"] == "tapas"
+    assert seen_params[1] == seen_params[2] == {"pagetoken": "T1", "key": "KEY"}
+    assert seen_params[3]["pagetoken"] == "T2"
+
+
+def test_search_all_pages_does_not_wait_for_unused_token(monkeypatch):
+    """At the page limit a pending next_page_token is ignored without sleeping."""
+    from express_gastronomic_route.Services import restaurant_selection
+    sel = RestaurantSelection(api_key="KEY")
+    sleeps = []
+    monkeypatch.setattr(restaurant_selection.time, "sleep", sleeps.append)
+    monkeypatch.setattr(HttpClient, "get", lambda self, url, params=None, **kwargs: DummyResponse(
+        200, {"status": "OK", "results": [{"place_id": "A"}], "next_page_token": "T1"}))
+    assert [r["place_id"] for r in sel.search_all_pages(1.0, 2.0, max_pages=1)] == ["A"]
+    assert sleeps == []
+
+
+def test_harvest_merges_queries_without_duplicates(monkeypatch):
+    """Every keyword x radius query runs once and shared place_ids are kept once."""
+    sel = RestaurantSelection(api_key="KEY")
+    calls = []
+
+    def fake_pages(lat, lng, radius=5000, food_type=None, max_pages=3):
+        calls.append((food_type, radius))
+        return [{"place_id": f"{food_type}"}, {"place_id": "shared"}]
+
+    monkeypatch.setattr(sel, "search_all_pages", fake_pages)
+    merged = sel.harvest_restaurants(1.0, 2.0, keywords=[None, "tapas"], radii=[1000, 5000])
+    assert sorted(calls, key=str) == sorted([(None, 1000), ("tapas", 1000), ("tapas", 5000)], key=str)
+    assert [r["place_id"] for r in merged] == ["None", "shared", "tapas"]
+
+
+def test_fetch_uses_harvest_when_asked(monkeypatch):
+    sel = RestaurantSelection(api_key="KEY")
+    monkeypatch.setattr(sel, "get_coordinates", lambda addr: (1.1, 2.2))
+    captured = {}
+
+    def fake_harvest(lat, lng, keywords, radii, max_pages, max_results):
+        captured.update(keywords=keywords, radii=radii, max_pages=max_pages)
+        return [{"place_id": "P1"}]
+
+    monkeypatch.setattr(sel, "harvest_restaurants", fake_harvest)
+    monkeypatch.setattr(sel, "get_all_restaurant_details", lambda lst: lst)
+    assert sel.fetch("Addr", food_type="pizza", keywords=["pizza", "pasta"], max_pages=3) == [{"place_id": "P1"}]
+    assert captured == {"keywords": ["pizza", "pasta"], "radii": (5000,), "max_pages": 3}
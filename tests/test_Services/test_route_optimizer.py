@@ -80,6 +80,102 @@ def test_optimize_route_returns_expected_coords(monkeypatch):
     # route_coords built from dummy_decode_polyline
     assert route == [(1.1, 2.2), (3.3, 4.4)]
 
+def test_optimize_route_reuses_known_and_cached_coordinates(monkeypatch):
+    """Known locations and cached addresses must not be geocoded again."""
+    from express_gastronomic_route.Services.cache import GeocodeCache
+
+    cache = GeocodeCache()
+    cache.set("Calle Larios, Málaga", 36.72, -4.42)
+    optimizer = RouteOptimizer(api_key="KEY", geocode_cache=cache)
+    calls = []
+    original = optimizer.gmaps.geocode
+    monkeypatch.setattr(optimizer.gmaps, "geocode", lambda address: calls.append(address) or original(address))
+
+    restaurants = [
+        {"address": "A", "location": (36.71, -4.41)},
+        {"address": "B", "geometry": {"location": {"lat": 36.73, "lng": -4.43}}},
+        {"address": "C"},
+    ]
+    origin, coords, _ = optimizer.optimize_route("calle larios  malaga", restaurants)
+    assert origin == (36.72, -4.42)
+    assert coords == [(36.71, -4.41), (36.73, -4.43), (10.0, 20.0)]
+    assert calls == ["C"]
+    # "C" is now cached as well
+    optimizer.geocode("c")
+    assert calls == ["C"]
+
+def test_optimize_route_orders_locally_without_directions(monkeypatch):
+    """With use_directions=False the route is solved offline, stops in visiting order."""
+    optimizer = RouteOptimizer(api_key="KEY", use_directions=False)
+    monkeypatch.setattr(optimizer.gmaps, "directions",
+                        lambda **kwargs: pytest.fail("Directions must not be called"))
+    # Start at one corner of a square; the diagonal corner must be visited second
+    origin = (36.72, -4.42)
+    restaurants = [
+        {"address": "diagonal", "location": (36.73, -4.41)},
+        {"address": "north", "location": (36.73, -4.42)},
+        {"address": "east", "location": (36.72, -4.41)},
+    ]
+    _, coords, route = optimizer.optimize_route("Start", restaurants, origin_coord=origin)
+    # coords keep the input order, the route follows the solved order
+    assert coords == [(36.73, -4.41), (36.73, -4.42), (36.72, -4.41)]
+    order = optimizer.optimize_order(origin, coords)
+    assert order in ([1, 0, 2], [2, 0, 1])
+    assert route == [origin] + [coords[i] for i in order] + [origin]
+
+def test_travel_matrix_batches_missing_pairs_and_caches(monkeypatch):
+    """Missing pairs go to the Distance Matrix API once; repeats need no request."""
+    requests_made = []
+
+    def fake_distance_matrix(origins, destinations, mode):
+        assert len(origins) <= 25 and len(destinations) <= 25
+        assert len(origins) * len(destinations) <= 100
+        requests_made.append((len(origins), len(destinations)))
+        return {"rows": [
+            {"elements": [{"status": "OK", "distance": {"value": 100}, "duration": {"value": 80}}
+                          for _ in destinations]}
+            for _ in origins
+        ]}
+
+    optimizer = RouteOptimizer(api_key="KEY", matrix_source="api")
+    monkeypatch.setattr(optimizer.gmaps, "distance_matrix", fake_distance_matrix, raising=False)
+
+    points = [(36.72 + i * 0.001, -4.42) for i in range(3)]
+    distances, durations = optimizer.travel_matrix(points)
+    assert requests_made == [(3, 3)]
+    assert distances[0][1] == 100 and durations[2][0] == 80 and durations[1][1] == 0
+
+    optimizer.travel_matrix(points)
+    assert len(requests_made) == 1
+    assert optimizer.matrix_stats()["hits"] == 6
+
+    # 30 points: every block respects the element limit
+    many = [(36.70 + i * 0.001, -4.40) for i in range(30)]
+    optimizer.travel_matrix(many)
+    assert sum(o * d for o, d in requests_made[1:]) >= 30 * 29 - 6
+
+def test_travel_matrix_does_not_cache_estimates(monkeypatch):
+    """Pairs the API failed to return are estimated but fetched again next time."""
+    calls = []
+
+    def failing_distance_matrix(origins, destinations, mode):
+        calls.append(1)
+        raise RuntimeError("quota")
+
+    optimizer = RouteOptimizer(api_key="KEY", matrix_source="api")
+    monkeypatch.setattr(optimizer.gmaps, "distance_matrix", failing_distance_matrix, raising=False)
+    points = [(36.72, -4.42), (36.73, -4.42)]
+    distances, _ = optimizer.travel_matrix(points)
+    assert 1000 < distances[0][1] < 1200
+    optimizer.travel_matrix(points)
+    assert len(calls) == 2
+    assert len(optimizer.distance_cache._data) == 0
+
+    # The haversine source never touches the cache
+    local = RouteOptimizer(api_key="KEY")
+    local.travel_matrix(points)
+    assert local.matrix_stats()["hits"] == 0 and local.matrix_stats()["misses"] == 0
+
 # --- plot_route tests ---
 
 def test_plot_route_returns_html_path(tmp_path):
@@ -128,3 +224,19 @@ def test_save_route_json_creates_file(tmp_path, capsys):
     assert data["route_coords"] == [[1, 2], [3, 4]]
         # Print message confirms save
     assert "Route data saved as" in captured.out
+
+def test_optimize_route_returns_the_order_it_solved(monkeypatch):
+    """with_order=True hands back the visiting order so callers need not solve again."""
+    optimizer = RouteOptimizer(api_key="KEY", use_directions=False)
+    solved = []
+    original = optimizer.optimize_order
+    monkeypatch.setattr(optimizer, "optimize_order", lambda *args: solved.append(1) or original(*args))
+    origin = (36.72, -4.42)
+    restaurants = [
+        {"address": "diagonal", "location": (36.73, -4.41)},
+        {"address": "north", "location": (36.73, -4.42)},
+        {"address": "east", "location": (36.72, -4.41)},
+    ]
+    _, coords, route, order = optimizer.optimize_route("Start", restaurants, origin_coord=origin, with_order=True)
+    assert len(solved) == 1
+    assert route == [origin] + [coords[i] for i in order] + [origin]
@@ -0,0 +1,137 @@
+# tests/services/test_route_planner.py
+
+from datetime import date
+
+import pytest
+
+from express_gastronomic_route.Services.route_planner import RoutePlanner
+from express_gastronomic_route.Services.scoring import STRATEGIES
+
+ORIGIN = (36.7213, -4.4214)
+MONDAY = date(2025, 6, 2)
+
+
+def place(name, rating, total, closed_monday=False):
+    return {
+        "name": name,
+        "formatted_address": f"{name} street",
+        "rating": rating,
+        "user_ratings_total": total,
+        "geometry": {"location": {"lat": ORIGIN[0] + rating / 1000, "lng": ORIGIN[1]}},
+        "opening_hours": {"weekday_text": ["Monday: Closed" if closed_monday else "Monday: 9:00 AM – 5:00 PM"]},
+    }
+
+
+class FakeSelector:
+    def fetch(self, address, food_type=None, **search_options):
+        self.search_options = search_options
+        return [place("Closed Monday", 5.0, 5000, closed_monday=True), place("Bar A", 4.8, 900),
+                place("Bar B", 4.5, 800), place("Bar C", 4.2, 700), place("Bar D", 3.0, 10)]
+
+    def get_coordinates(self, address):
+        return ORIGIN
+
+
+class FakeLLM:
+    def describe_restaurants(self, top, batched=False, on_update=None):
+        for idx, r in enumerate(top):
+            if on_update is not None:
+                on_update(idx, r["name"][:3])
+        return [f"About {r['name']}" for r in top]
+
+
+class FakeWeather:
+    def get_weather_forecast(self, city):
+        return [{"date": "02/06/2025", "day": MONDAY, "temperature_avg": 24.0, "wind_speed": 2.0,
+                 "rain_probability": 0}]
+
+    def plan_window(self, forecast, start_date, end_date):
+        return {"temperature_range": forecast,
+                "best_day": {"best_date": "02/06/2025", "best_temperature_avg": 24.0, "best_wind_speed": 2.0,
+                             "best_rain_probability": 0, "day": MONDAY}}
+
+
+class FakeOptimizer:
+    def optimize_route(self, start, restaurants, origin_coord=None, with_order=False):
+        # Visit the stops in reverse ranking order
+        order = list(reversed(range(len(restaurants))))
+        return origin_coord, [r["location"] for r in restaurants], [], order
+
+    def get_google_maps_url(self, origin, restaurants):
+        return "maps:" + "|".join(r["name"] for r in restaurants)
+
+
+class FakeSink:
+    def __init__(self):
+        self.records = []
+
+    def submit(self, record):
+        self.records.append(record)
+
+
+def planner(**kwargs):
+    return RoutePlanner(FakeSelector(), FakeOptimizer(), FakeWeather(), FakeLLM(), **kwargs)
+
+
+# --- plan keys ---
+
+def test_plan_key_ignores_case_accents_and_spacing():
+    """Equivalent sidebar inputs map to the same hashable key."""
+    a = RoutePlanner.plan_key("Calle Larios", "Málaga", "01/06/2025", "03/06/2025", "Tapas", "popularity")
+    b = RoutePlanner.plan_key("  calle   LARIOS ", "malaga", "01/06/2025", "03/06/2025", "tapas ",
+                              STRATEGIES["popularity"])
+    assert a == b
+    assert hash(a) == hash(b)
+
+
+def test_plan_key_changes_with_every_input():
+    """Dates, food type, ranking and the open-day filter all produce distinct plans."""
+    base = ("Calle Larios", "Málaga", "01/06/2025", "03/06/2025", None, "popularity", False)
+    variants = [
+        ("Calle Granada",) + base[1:],
+        base[:2] + ("02/06/2025",) + base[3:],
+        base[:4] + ("sushi",) + base[5:],
+        base[:5] + ("nearby",) + base[6:],
+        base[:6] + (True,),
+    ]
+    keys = {RoutePlanner.plan_key(*args) for args in variants}
+    assert RoutePlanner.plan_key(*base) not in keys
+    assert len(keys) == len(variants)
+
+
+# --- pipeline ---
+
+def test_pipeline_runs_every_stage(monkeypatch):
+    """Each stage gets its dependencies' results; the PDF is rendered inline without a pool."""
+    monkeypatch.delenv("PHOTO_DIR", raising=False)
+    sink = FakeSink()
+    route_planner = planner(sink=sink, search_options={"max_pages": 2})
+    pipeline = route_planner.build_pipeline("Calle Larios", "Málaga", "01/06/2025", "03/06/2025")
+    events = list(pipeline.iter_run())
+    results = pipeline.results
+
+    assert set(results) == {"restaurants", "top", "descriptions", "route", "weather", "pdf"}
+    assert results["restaurants"]["count"] == 5
+    names = [r["name"] for r in results["top"]]
+    assert names == ["Closed Monday", "Bar A", "Bar B"]
+    assert results["descriptions"] == [f"About {name}" for name in names]
+    assert [r["llm_description"] for r in results["top"]] == results["descriptions"]
+    assert [e.result for e in events if e.partial] == [(0, "Clo"), (1, "Bar"), (2, "Bar")]
+    assert results["route"]["order"] == [2, 1, 0]
+    assert results["route"]["maps_url"] == "maps:Bar B|Bar A|Closed Monday"
+    assert results["weather"]["best_day"]["day"] == MONDAY
+    assert results["pdf"]["file_name"] == "gastronomic_route_Málaga.pdf"
+    assert results["pdf"]["data"].startswith(b"%PDF")
+    assert route_planner.selector.search_options == {"max_pages": 2}
+    assert len(sink.records) == 1 and len(sink.records[0]["restaurants"]) == 5
+
+
+@pytest.mark.parametrize("open_on_best_day", [False, True])
+def test_open_on_best_day_ranks_after_weather(monkeypatch, open_on_best_day):
+    """Only the open-day filter makes ranking wait for the weather and drop closed places."""
+    monkeypatch.delenv("PHOTO_DIR", raising=False)
+    pipeline = planner().build_pipeline("Calle Larios", "Málaga", "01/06/2025", "03/06/2025",
+                                        open_on_best_day=open_on_best_day)
+    assert ("weather" in pipeline.stages["top"][1]) == open_on_best_day
+    names = [r["name"] for r in pipeline.run()["top"]]
+    assert ("Closed Monday" in names) != open_on_best_day
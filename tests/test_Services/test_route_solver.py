@@ -0,0 +1,58 @@
+# tests/services/test_route_solver.py
+
+import itertools
+import random
+import pytest
+
+from express_gastronomic_route.Services.geo import haversine_m
+from express_gastronomic_route.Services.route_solver import (
+    distance_matrix, held_karp, nearest_neighbour, solve_tour, tour_length, two_opt,
+)
+
+# --- Fixtures & helpers ---
+
+def random_points(n, seed):
+    rng = random.Random(seed)
+    return [(36.70 + rng.random() * 0.05, -4.45 + rng.random() * 0.05) for _ in range(n)]
+
+def brute_force_length(matrix):
+    stops = range(1, len(matrix))
+    return min(tour_length(matrix, [0] + list(p)) for p in itertools.permutations(stops))
+
+# --- geometry tests ---
+
+def test_haversine_known_distance():
+    """Málaga to Madrid is roughly 418 km as the crow flies."""
+    assert haversine_m(36.7213, -4.4214, 40.4168, -3.7038) == pytest.approx(418_000, rel=0.01)
+    assert haversine_m(1.0, 2.0, 1.0, 2.0) == 0
+
+# --- solver tests ---
+
+@pytest.mark.parametrize("n", [1, 2, 4, 7])
+def test_held_karp_matches_brute_force(n):
+    """Held-Karp returns an optimal tour starting at the depot."""
+    matrix = distance_matrix(random_points(n + 1, seed=n))
+    tour = held_karp(matrix)
+    assert tour[0] == 0 and sorted(tour) == list(range(n + 1))
+    assert tour_length(matrix, tour) == pytest.approx(brute_force_length(matrix))
+
+def test_heuristic_improves_on_nearest_neighbour():
+    """Beyond the exact limit, 2-opt/Or-opt never lose to the greedy tour."""
+    matrix = distance_matrix(random_points(30, seed=42))
+    tour = solve_tour(matrix)
+    assert tour[0] == 0 and sorted(tour) == list(range(30))
+    assert tour_length(matrix, tour) <= tour_length(matrix, nearest_neighbour(matrix))
+
+def test_heuristic_is_near_optimal_on_small_instances():
+    """Forcing the heuristic path on small inputs stays close to optimal."""
+    for seed in range(5):
+        matrix = distance_matrix(random_points(8, seed=seed))
+        heuristic = tour_length(matrix, solve_tour(matrix, exact_limit=0))
+        assert heuristic <= brute_force_length(matrix) * 1.05
+
+def test_two_opt_removes_crossing():
+    """A self-crossing square tour is uncrossed."""
+    square = [(0, 0), (0, 0.01), (0.01, 0.01), (0.01, 0)]
+    matrix = distance_matrix(square)
+    crossed = [0, 2, 1, 3]
+    assert tour_length(matrix, two_opt(matrix, crossed)) < tour_length(matrix, crossed)
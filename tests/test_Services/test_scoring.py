@@ -0,0 +1,89 @@
+# tests/services/test_scoring.py
+
+import math
+import numpy as np
+import pytest
+from express_gastronomic_route.Services.RestaurantInfoTop import TopRestaurantsExtractor
+from express_gastronomic_route.Services.scoring import (
+    FeatureTable, ScoringStrategy, DEFAULT_STRATEGY, STRATEGIES, popularity_scores
+)
+
+ORIGIN = (36.72, -4.42)
+
+
+def make_restaurants():
+    return [
+        {"name": "Far Famous", "rating": 4.8, "user_ratings_total": 2000, "price_level": 4,
+         "geometry": {"location": {"lat": 36.80, "lng": -4.42}},
+         "opening_hours": {"open_now": False}, "wheelchair_accessible_entrance": False},
+        {"name": "Near Tapas", "rating": 4.4, "user_ratings_total": 300, "price_level": 1,
+         "geometry": {"location": {"lat": 36.7205, "lng": -4.4205}},
+         "opening_hours": {"open_now": True}, "wheelchair_accessible_entrance": True,
+         "reviews": [{"text": "Great paella and tapas"}]},
+        {"name": "No Rating", "user_ratings_total": 50,
+         "geometry": {"location": {"lat": 36.72, "lng": -4.42}}},
+    ]
+
+# --- FeatureTable tests ---
+
+def test_feature_table_columns():
+    """Features are extracted once into aligned float columns."""
+    table = FeatureTable.from_restaurants(make_restaurants(), origin=ORIGIN, food_type="Paella")
+    assert len(table) == 3
+    assert table["popularity"][0] == 4.8 * math.log10(2001)
+    assert np.isnan(table["popularity"][2])
+    assert table.valid.tolist() == [True, True, False]
+    assert table["proximity"][1] > table["proximity"][0]
+    assert table["affordability"].tolist()[:2] == [0.0, 0.75]
+    assert table["open_now"].tolist()[:2] == [0.0, 1.0]
+    assert table["food_match"].tolist() == [0.0, 1.0, 0.0]
+    assert table["wheelchair"][1] == 1.0 and np.isnan(table["wheelchair"][2])
+
+
+def test_feature_table_without_origin_has_no_proximity():
+    """Without a start point the proximity column is all missing."""
+    table = FeatureTable.from_restaurants(make_restaurants())
+    assert np.isnan(table["proximity"]).all()
+    assert np.isnan(table["food_match"]).all()
+
+# --- ScoringStrategy tests ---
+
+def test_default_strategy_matches_compute_score():
+    """The default strategy reproduces the legacy popularity score exactly."""
+    restaurants = make_restaurants()
+    scores = DEFAULT_STRATEGY.score(FeatureTable.from_restaurants(restaurants))
+    expected = [TopRestaurantsExtractor.compute_score(r.get("rating"), r.get("user_ratings_total"))
+                for r in restaurants]
+    assert scores.tolist() == expected
+
+
+def test_strategy_rejects_unknown_feature():
+    """Typos in feature names fail loudly."""
+    with pytest.raises(ValueError):
+        ScoringStrategy({"popularityy": 1.0})
+
+
+def test_switching_strategies_reuses_feature_table(monkeypatch):
+    """Ranking again with other weights does not rebuild the features."""
+    extractor = TopRestaurantsExtractor(make_restaurants(), origin=ORIGIN)
+    assert extractor.rank(1)[0][0]["name"] == "Far Famous"
+    calls = []
+    monkeypatch.setattr(FeatureTable, "from_restaurants", classmethod(lambda cls, *a: calls.append(a)))
+    assert extractor.rank(1, STRATEGIES["nearby"])[0][0]["name"] == "Near Tapas"
+    assert extractor.rank(1, STRATEGIES["budget"])[0][0]["name"] == "Near Tapas"
+    assert calls == []
+
+
+def test_negative_weights_keep_every_valid_restaurant():
+    """Validity comes from the feature table, not from the sign of the score."""
+    extractor = TopRestaurantsExtractor(make_restaurants(), origin=ORIGIN)
+    penalize_price = ScoringStrategy({"popularity": 1.0, "affordability": -20.0})
+    ranked = extractor.rank(3, penalize_price)
+    assert [r["name"] for r, _ in ranked] == ["Far Famous", "Near Tapas"]
+
+
+def test_popularity_scores_missing_values():
+    """Missing rating or review count gives NaN."""
+    scores = popularity_scores(np.array([4.0, np.nan, 3.0]), np.array([9.0, 5.0, np.nan]))
+    assert scores[0] == 4.0
+    assert np.isnan(scores[1:]).all()
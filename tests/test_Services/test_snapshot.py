@@ -0,0 +1,101 @@
+# tests/services/test_snapshot.py
+
+import os
+import numpy as np
+import pytest
+from express_gastronomic_route.Services.snapshot import (
+    CitySnapshot, SnapshotSelector, build_snapshot, refresh_snapshot, write_snapshot, MANIFEST
+)
+
+ORIGIN = (36.7213, -4.4214)
+
+
+def record(place_id, lat, lng, rating=4.0, total=100, name=None):
+    return {
+        "place_id": place_id,
+        "name": name or place_id,
+        "geometry": {"location": {"lat": lat, "lng": lng}},
+        "rating": rating,
+        "user_ratings_total": total,
+        "opening_hours": {"weekday_text": ["Monday: 9:00 AM – 5:00 PM"]},
+    }
+
+
+class FakeSelector:
+    """Records what the snapshot builder asks for."""
+
+    def __init__(self):
+        self.detail_requests = []
+
+    def get_coordinates(self, address):
+        return ORIGIN
+
+    def harvest_restaurants(self, lat, lng, keywords, radii, max_pages):
+        return [{"place_id": f"P{i}"} for i in range(3)]
+
+    def get_all_restaurant_details(self, found, with_place_id=False, use_cache=True):
+        self.detail_requests.append([f["place_id"] for f in found])
+        return [record(f["place_id"], ORIGIN[0] + 0.001 * int(f["place_id"][1:]), ORIGIN[1],
+                       name=f"{f['place_id']} v{len(self.detail_requests)}") for f in found]
+
+# --- write / load ---
+
+def test_write_and_load_round_trip(tmp_path):
+    """Columns are memory-mapped and details come back line by line."""
+    details = [record("A", 36.72, -4.42, 4.5, 1000), {"place_id": "B", "name": "No geometry"}]
+    path = write_snapshot(str(tmp_path), "Málaga", "Calle Larios", ORIGIN, details)
+    snapshot = CitySnapshot(path)
+    assert len(snapshot) == 2
+    assert isinstance(snapshot["lat"], np.memmap)
+    assert snapshot.restaurants() == details
+    assert np.isnan(snapshot["lat"][1])
+    assert set(snapshot.manifest["columns"]) == {"lat", "lng", "fetched_at", "details_offsets"}
+    snapshot.close()
+
+
+def test_latest_skips_unfinished_versions(tmp_path):
+    first = write_snapshot(str(tmp_path), "Málaga", "Calle Larios", ORIGIN, [record("A", 36.72, -4.42)])
+    second = write_snapshot(str(tmp_path), "Málaga", "Calle Larios", ORIGIN, [record("B", 36.72, -4.42)])
+    assert CitySnapshot.latest(str(tmp_path), "malaga").path == second
+    os.remove(os.path.join(second, MANIFEST))
+    assert CitySnapshot.latest(str(tmp_path), "Málaga").path == first
+    assert CitySnapshot.latest(str(tmp_path), "Sevilla") is None
+
+
+def test_nearest(tmp_path):
+    details = [record(f"P{i}", ORIGIN[0] + 0.002 * i, ORIGIN[1]) for i in range(5)]
+    snapshot = CitySnapshot(write_snapshot(str(tmp_path), "X", "x", ORIGIN, details))
+    assert snapshot.nearest(ORIGIN[0] + 0.0041, ORIGIN[1], 3) == [2, 3, 1]
+
+# --- build / refresh / serve ---
+
+def test_build_refresh_only_stale(tmp_path):
+    """Refresh refetches only places older than max_age and writes a new version."""
+    selector = FakeSelector()
+    path = build_snapshot(selector, "Málaga", "Calle Larios", str(tmp_path))
+    snapshot = CitySnapshot(path)
+    assert len(snapshot) == 3
+
+    fetched_at = np.array(snapshot["fetched_at"])
+    now = fetched_at[0] + 10
+    # Pretend P1 was fetched long ago
+    np.save(os.path.join(path, "fetched_at.npy"), np.array([now, now - 1000, now]))
+    snapshot = CitySnapshot(path)
+    new_path = refresh_snapshot(selector, snapshot, str(tmp_path), max_age=100, now=now)
+    assert selector.detail_requests[-1] == ["P1"]
+    refreshed = CitySnapshot(new_path)
+    assert [r["name"] for r in refreshed.restaurants()] == ["P0 v1", "P1 v2", "P2 v1"]
+    assert refreshed.stale(100, now) == []
+
+
+def test_snapshot_selector_serves_fetch(tmp_path):
+    details = [record("A", ORIGIN[0] + 0.01, ORIGIN[1], name="Pizzeria Roma"),
+               record("B", ORIGIN[0] + 0.001, ORIGIN[1], name="Tapas Bar")]
+    snapshot = CitySnapshot(write_snapshot(str(tmp_path), "Málaga", "Calle Larios", ORIGIN, details))
+    selector = SnapshotSelector(snapshot, max_results=10)
+    assert selector.get_coordinates("calle larios") == ORIGIN
+    assert [r["name"] for r in selector.fetch("Calle Larios")] == ["Tapas Bar", "Pizzeria Roma"]
+    assert [r["name"] for r in selector.fetch("Calle Larios", food_type="Pizzeria")] == ["Pizzeria Roma"]
+    assert "place_id" not in selector.fetch("Calle Larios")[0]
+    with pytest.raises(Exception):
+        selector.fetch("Somewhere else")
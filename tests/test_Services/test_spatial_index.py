@@ -0,0 +1,162 @@
+# tests/services/test_spatial_index.py
+
+import random
+import pytest
+from express_gastronomic_route.Services.geo import haversine_m
+from express_gastronomic_route.Services.spatial_index import SpatialIndex
+from express_gastronomic_route.Services.restaurant_selection import RestaurantSelection
+from express_gastronomic_route.Services.http_client import HttpClient
+
+ORIGIN = (36.7213, -4.4214)
+
+
+def place(place_id, lat, lng):
+    return {"place_id": place_id, "name": place_id, "geometry": {"location": {"lat": lat, "lng": lng}}}
+
+
+def random_places(count, seed=7):
+    rng = random.Random(seed)
+    return [place(f"P{i}", ORIGIN[0] + rng.uniform(-0.05, 0.05), ORIGIN[1] + rng.uniform(-0.05, 0.05))
+            for i in range(count)]
+
+# --- queries ---
+
+def test_within_and_nearest_match_brute_force():
+    """Radius and kNN answers equal a full haversine scan."""
+    places = random_places(500)
+    index = SpatialIndex(cell_deg=0.005)
+    index.add(places)
+    by_distance = sorted(places, key=lambda p: (haversine_m(*ORIGIN, *index._places[p["place_id"]][1]),
+                                                p["place_id"]))
+    distances = [haversine_m(*ORIGIN, p["geometry"]["location"]["lat"], p["geometry"]["location"]["lng"])
+                 for p in by_distance]
+
+    inside = [p for p, d in zip(by_distance, distances) if d <= 1500]
+    assert [item for item, _ in index.within(*ORIGIN, 1500)] == inside
+    nearest = index.nearest(*ORIGIN, 15)
+    assert [item for item, _ in nearest] == by_distance[:15]
+    assert [d for _, d in nearest] == pytest.approx(distances[:15])
+
+
+def test_keyword_filter_and_reindexing():
+    """Keyword queries only see places returned for that keyword; re-adding moves a place."""
+    index = SpatialIndex()
+    index.add([place("A", 36.72, -4.42)])
+    index.add([place("B", 36.7201, -4.4201)], keyword="Pizza")
+    assert [item["place_id"] for item, _ in index.within(36.72, -4.42, 100, keyword="pizza")] == ["B"]
+    index.add([place("A", 40.0, -3.7)])
+    assert [item["place_id"] for item, _ in index.within(36.72, -4.42, 100)] == ["B"]
+    assert len(index) == 2
+
+
+def test_coverage_circles():
+    index = SpatialIndex()
+    index.mark_covered(*ORIGIN, 5000, keyword="tapas")
+    assert index.is_covered(ORIGIN[0] + 0.01, ORIGIN[1], 3000, keyword="tapas")
+    assert not index.is_covered(ORIGIN[0] + 0.01, ORIGIN[1], 4500, keyword="tapas")
+    assert not index.is_covered(*ORIGIN, 1000)
+
+# --- RestaurantSelection integration ---
+
+def test_search_served_from_index_after_first_call(monkeypatch):
+    """A keyword search inside a covered circle does not call the API again."""
+    calls = []
+    results = [place("far", ORIGIN[0] + 0.02, ORIGIN[1]), place("near", ORIGIN[0] + 0.001, ORIGIN[1])]
+
+    class Resp:
+        status_code = 200
+        def raise_for_status(self): pass
+        def json(self): return {"status": "OK", "results": results}
+
+    def fake_get(self, url, params=None, **kwargs):
+        calls.append(params)
+        return Resp()
+
+    monkeypatch.setattr(HttpClient, "get", fake_get)
+    sel = RestaurantSelection(api_key="KEY", spatial_index=SpatialIndex())
+    first = sel.search_restaurants(*ORIGIN, radius=5000, food_type="tapas")
+    # Sorted by haversine distance, nearest first
+    assert [r["place_id"] for r in first] == ["near", "far"]
+    second = sel.search_restaurants(ORIGIN[0] + 0.001, ORIGIN[1], radius=1000, food_type="tapas")
+    assert [r["place_id"] for r in second] == ["near"]
+    assert len(calls) == 1
+    # Another keyword is not covered
+    sel.search_restaurants(*ORIGIN, radius=1000, food_type="sushi")
+    assert len(calls) == 2
+
+
+def test_rankby_distance_coverage(monkeypatch):
+    """A full page of nearest results covers the circle up to the farthest one."""
+    page = [place(f"P{i}", ORIGIN[0] + 0.001 * (i + 1), ORIGIN[1]) for i in range(20)]
+    calls = []
+
+    class Resp:
+        status_code = 200
+        def raise_for_status(self): pass
+        def json(self): return {"status": "OK", "results": page, "next_page_token": "T"}
+
+    monkeypatch.setattr(HttpClient, "get", lambda self, url, params=None, **kw: calls.append(params) or Resp())
+    sel = RestaurantSelection(api_key="KEY", spatial_index=SpatialIndex())
+    assert sel.search_restaurants(*ORIGIN) == page
+    # Same point: the 20 nearest are known
+    assert sel.search_restaurants(*ORIGIN) == page
+    assert len(calls) == 1
+    # Moved away: the nearest set may include unknown places
+    sel.search_restaurants(ORIGIN[0] + 0.05, ORIGIN[1])
+    assert len(calls) == 2
+
+
+def test_capped_harvest_is_not_full_coverage(monkeypatch):
+    """Three full pages without a final token only cover up to the farthest result."""
+    monkeypatch.setattr(RestaurantSelection, "PAGE_TOKEN_DELAY", 0)
+    pages = [[place(f"P{p}{i}", ORIGIN[0] + 0.0001 * (20 * p + i + 1), ORIGIN[1]) for i in range(20)]
+             for p in range(3)]
+    answers = [{"status": "OK", "results": pages[0], "next_page_token": "T1"},
+               {"status": "OK", "results": pages[1], "next_page_token": "T2"},
+               {"status": "OK", "results": pages[2]}]
+    calls = []
+
+    class Resp:
+        status_code = 200
+        def __init__(self, data): self.data = data
+        def raise_for_status(self): pass
+        def json(self): return self.data
+
+    def fake_get(self, url, params=None, **kwargs):
+        calls.append(params)
+        return Resp(answers.pop(0) if answers else {"status": "OK", "results": []})
+
+    monkeypatch.setattr(HttpClient, "get", fake_get)
+    sel = RestaurantSelection(api_key="KEY", spatial_index=SpatialIndex())
+    assert len(sel.search_all_pages(*ORIGIN, max_pages=3)) == 60
+    # 20 km away is outside the ~660 m the harvest actually covered
+    sel.search_restaurants(ORIGIN[0] + 0.18, ORIGIN[1])
+    assert len(calls) == 4
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    """Places and coverage older than ttl are ignored, so a live search runs again."""
+    from express_gastronomic_route.Services import spatial_index
+    clock = [1000.0]
+    monkeypatch.setattr(spatial_index.time, "time", lambda: clock[0])
+    index = SpatialIndex(ttl=60)
+    index.add([place("A", *ORIGIN)])
+    index.mark_covered(*ORIGIN, 500)
+    assert index.is_covered(*ORIGIN, 100) and len(index.within(*ORIGIN, 100)) == 1
+    clock[0] += 61
+    assert not index.is_covered(*ORIGIN, 100)
+    assert index.within(*ORIGIN, 100) == [] and index.nearest(*ORIGIN, 1) == []
+    index.add([place("B", *ORIGIN)])
+    assert len(index) == 1 and index.stats()["coverage_circles"] == 0
+
+
+def test_size_cap_evicts_oldest_places_and_their_coverage():
+    """Beyond max_places the oldest places go, with every circle that may need them."""
+    index = SpatialIndex(max_places=3)
+    index.add([place("A", *ORIGIN), place("B", ORIGIN[0] + 0.001, ORIGIN[1])])
+    index.mark_covered(*ORIGIN, 200)
+    index.add([place("C", ORIGIN[0] + 0.01, ORIGIN[1]), place("D", ORIGIN[0] + 0.011, ORIGIN[1])])
+    index.mark_covered(ORIGIN[0] + 0.01, ORIGIN[1], 200)
+    assert len(index) == 3 and "A" not in index._places
+    assert not index.is_covered(*ORIGIN, 100)
+    assert index.is_covered(ORIGIN[0] + 0.01, ORIGIN[1], 100)
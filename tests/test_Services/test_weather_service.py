@@ -0,0 +1,139 @@
+# tests/services/test_weather_service.py
+
+import threading
+import time
+import pytest
+from express_gastronomic_route.Services import weather_service
+from express_gastronomic_route.Services.weather_service import WeatherAPI, next_update
+
+
+def make_api(monkeypatch, answer=None, delay=0.0):
+    """WeatherAPI whose provider call is counted instead of sent."""
+    api = WeatherAPI("KEY")
+    calls = []
+
+    def fake_fetch(city):
+        calls.append(city)
+        time.sleep(delay)
+        return answer if answer is not None else [{"date": "01/06/2025", "temperature_avg": 24}]
+
+    monkeypatch.setattr(api, "fetch_weather_forecast", fake_fetch)
+    return api, calls
+
+# --- expiry ---
+
+def test_next_update_aligns_to_interval():
+    assert next_update(3 * 3600 * 10 + 5) == 3 * 3600 * 11
+    assert next_update(3 * 3600 * 11) == 3 * 3600 * 12
+
+# --- caching ---
+
+def test_forecast_cached_per_city_and_day(monkeypatch):
+    api, calls = make_api(monkeypatch)
+    first = api.get_weather_forecast("Málaga")
+    assert api.get_weather_forecast(" malaga ") == first
+    assert calls == ["Málaga"]
+    api.get_weather_forecast("Sevilla")
+    assert calls == ["Málaga", "Sevilla"]
+    assert WeatherAPI.forecast_key("Málaga", "2025-06-01") == "forecast:malaga:2025-06-01"
+
+
+def test_forecast_expires_at_provider_update(monkeypatch):
+    api, calls = make_api(monkeypatch)
+    now = [3 * 3600 * 100 + 60]
+    monkeypatch.setattr(weather_service.time, "time", lambda: now[0])
+    api.get_weather_forecast("Málaga")
+    entry = api.cache.get_entry(WeatherAPI.forecast_key("Málaga"))
+    assert entry[1] == 3 * 3600 * 101
+
+
+def test_failed_forecast_not_cached(monkeypatch):
+    api, calls = make_api(monkeypatch)
+    monkeypatch.setattr(api, "fetch_weather_forecast", lambda city: calls.append(city))
+    assert api.get_weather_forecast("Málaga") is None
+    assert api.get_weather_forecast("Málaga") is None
+    assert len(calls) == 2
+
+# --- coalescing ---
+
+def test_concurrent_calls_share_one_request(monkeypatch):
+    """Callers arriving while a request is in flight wait for it instead of sending their own."""
+    api, calls = make_api(monkeypatch, delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(api.get_weather_forecast("Málaga")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["Málaga"]
+    assert len(results) == 8 and all(r is results[0] for r in results)
+
+
+def test_inflight_error_reaches_waiters(monkeypatch):
+    api = WeatherAPI("KEY")
+    started = threading.Event()
+
+    def failing(city):
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(api, "fetch_weather_forecast", failing)
+    errors = []
+
+    def call():
+        try:
+            api.get_weather_forecast("Málaga")
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join()
+    follower.join()
+    assert len(errors) == 2
+    assert api._inflight == {}
+
+# --- window planning ---
+
+def sample_forecast():
+    return [
+        {"date": "01/06/2025", "temperature_avg": 30.0, "wind_speed": 2.0, "rain_probability": 0},
+        {"date": "02/06/2025", "temperature_avg": 24.0, "wind_speed": 5.0, "rain_probability": 0},
+        {"date": "03/06/2025", "temperature_avg": 25.0, "wind_speed": 1.0, "rain_probability": 0.4},
+        {"date": "04/06/2025", "temperature_avg": 24.0, "wind_speed": 5.0, "rain_probability": 0},
+    ]
+
+
+def test_plan_window_matches_separate_calls():
+    """One pass gives the same range and best day as the two older methods."""
+    api = WeatherAPI("KEY")
+    forecast = sample_forecast()
+    plan = api.plan_window(forecast, "02/06/2025", "04/06/2025")
+    assert plan["temperature_range"] == api.filter_temp_range(forecast, "02/06/2025", "04/06/2025")
+    assert plan["best_day"] == api.get_best_day_to_go_out(forecast, "02/06/2025", "04/06/2025")
+    # Ties keep the earliest day
+    assert plan["best_day"]["best_date"] == "02/06/2025"
+    assert plan["best_day"]["day"] == weather_service.parse_date("02/06/2025")
+
+
+def test_plan_window_custom_comfort_and_parsed_days():
+    """Entries carrying a 'day' date are compared without parsing 'date'."""
+    api = WeatherAPI("KEY")
+    forecast = [{**day, "day": weather_service.parse_date(day["date"]), "date": "display only"}
+                for day in sample_forecast()]
+    warmest = api.plan_window(forecast, "01/06/2025", "04/06/2025", comfort=lambda d: -d["temperature_avg"])
+    assert warmest["best_day"]["best_temperature_avg"] == 30.0
+    assert len(warmest["temperature_range"]) == 4
+
+
+def test_plan_window_bad_input(capsys):
+    api = WeatherAPI("KEY")
+    assert api.plan_window(sample_forecast(), "2025-06-01", "04/06/2025") == {"temperature_range": [], "best_day": None}
+    assert api.plan_window(sample_forecast(), "01/07/2025", "04/07/2025")["best_day"] is None
+    out = capsys.readouterr().out
+    assert "Invalid date format" in out and "No forecast data available" in out